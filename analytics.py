@@ -0,0 +1,222 @@
+import argparse  # Импорт разбора аргументов командной строки
+import json  # Импорт записи результатов в машиночитаемом виде
+import math  # Импорт логарифма для корзин гистограммы
+import time  # Импорт модуля для работы со временем
+from array import array  # Импорт компактных массивов чисел
+
+import records  # Импорт хранилища рекордов
+from merge import valid  # Импорт проверки рекорда на правдоподобие (та же, что при слиянии таблиц)
+
+BUCKET_RATIO = 1.05  # отношение границ соседних корзин гистограммы времен (погрешность процентилей до 5%)
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+HISTOGRAM_BINS = 12  # количество столбцов гистограммы в выводе
+BAR_WIDTH = 40  # длина самого длинного столбца гистограммы в символах
+NO_PERIOD = "неизвестно"  # период рекордов старого формата, для которых момент завершения не сохранялся
+
+LOG_RATIO = math.log(BUCKET_RATIO)
+
+
+def bucket_of(time_taken):
+    # Номер корзины гистограммы для времени: корзина b содержит времена от RATIO^b до RATIO^(b+1)
+    return math.floor(math.log(max(time_taken, 0.001)) / LOG_RATIO)
+
+
+def bucket_bound(bucket):
+    # Верхняя граница корзины
+    return BUCKET_RATIO ** (bucket + 1)
+
+
+class Summary:
+    # Сводка по множеству времен с ограниченной памятью: количество, лучшее, среднее и логарифмическая гистограмма
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.best = math.inf
+        self.worst = 0.0
+        self.buckets = {}  # Номер корзины -> количество (корзин немного: их число растет как логарифм разброса)
+
+    def add_many(self, times):
+        # Учет массива времен одного блока
+        if not times:
+            return
+        self.count += len(times)
+        self.total += sum(times)
+        self.best = min(self.best, min(times))
+        self.worst = max(self.worst, max(times))
+        buckets = self.buckets
+        for time_taken in times:
+            bucket = bucket_of(time_taken)
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+
+    def merge(self, other):
+        # Добавление другой сводки (без повторного разбора времен)
+        self.count += other.count
+        self.total += other.total
+        self.best = min(self.best, other.best)
+        self.worst = max(self.worst, other.worst)
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+
+    def percentile(self, percent):
+        # Верхняя граница корзины, в которую попадает процентиль (не больше худшего времени)
+        target = self.count * percent / 100
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(self.worst, max(self.best, bucket_bound(bucket)))
+        return self.worst
+
+    def histogram(self, bins=HISTOGRAM_BINS):
+        # Гистограмма из bins столбцов равной ширины в логарифмическом масштабе: [(от, до, количество)]
+        if not self.count:
+            return []
+        low, high = min(self.buckets), max(self.buckets) + 1
+        step = max(1, math.ceil((high - low) / bins))
+        columns = {}
+        for bucket, count in self.buckets.items():
+            column = (bucket - low) // step
+            columns[column] = columns.get(column, 0) + count
+        return [(max(self.best, BUCKET_RATIO ** (low + column * step)),
+                 min(self.worst, BUCKET_RATIO ** (low + (column + 1) * step)), columns.get(column, 0))
+                for column in range((high - low + step - 1) // step)]
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "best": self.best if self.count else None,
+            "mean": self.total / self.count if self.count else None,
+            "worst": self.worst if self.count else None,
+            "percentiles": {f"p{percent}": self.percentile(percent) for percent in PERCENTILES},
+            "histogram": self.histogram(),
+        }
+
+
+class ModeStats:
+    # Статистика одного режима: сводка по всем рекордам и по периодам (месяцам) завершения
+    def __init__(self):
+        self.summary = Summary()
+        self.periods = {}  # Период "ГГГГ-ММ" -> (количество, лучшее время, сумма времен)
+
+    def add_period(self, period, times):
+        count, best, total = self.periods.get(period, (0, math.inf, 0.0))
+        self.periods[period] = (count + len(times), min(best, min(times)), total + sum(times))
+
+    def trend(self):
+        # Динамика по периодам: [(период, количество, лучшее, среднее)]; неизвестный период - в конце
+        periods = sorted(self.periods.items(), key=lambda item: (item[0] == NO_PERIOD, item[0]))
+        return [(period, count, best, total / count) for period, (count, best, total) in periods]
+
+
+class Analytics:
+    # Потоковый разбор файла рекордов: блоки рекордов разбираются целиком в массивы столбцов,
+    # а в памяти остаются только сводки, размер которых не зависит от количества рекордов
+    def __init__(self):
+        self.modes = {}  # (ширина, высота, мины) -> ModeStats
+        self.period_names = {}  # Номер дня -> период (один вызов strftime на день вместо одного на рекорд)
+        self.rejected = 0  # Отброшено поврежденных рекордов (NaN, бесконечное или неположительное время и т.п.)
+
+    def period(self, finished_at):
+        if not finished_at:
+            return NO_PERIOD
+        day = int(finished_at // 86400)
+        name = self.period_names.get(day)
+        if name is None:
+            name = self.period_names[day] = time.strftime("%Y-%m", time.localtime(finished_at))
+        return name
+
+    def add_chunk(self, chunk):
+        # Разбор блока рекордов в столбцы и группировка времен по режимам и периодам
+        # Поврежденные рекорды отбрасываются и подсчитываются: один такой рекорд не прерывает разбор файла
+        widths, heights, mines, times, finished = list(zip(*chunk))[:5]
+        groups = {}  # Режим -> период -> массив времен
+        now = time.time()
+        for width, height, mines_count, time_taken, finished_at in zip(widths, heights, mines, times, finished):
+            if not valid(width, height, mines_count, time_taken, finished_at, now):
+                self.rejected += 1
+                continue
+            periods = groups.get((width, height, mines_count))
+            if periods is None:
+                periods = groups[(width, height, mines_count)] = {}
+            period = self.period(finished_at)
+            group = periods.get(period)
+            if group is None:
+                group = periods[period] = array('d')
+            group.append(time_taken)
+        for mode, periods in groups.items():
+            stats = self.modes.get(mode)
+            if stats is None:
+                stats = self.modes[mode] = ModeStats()
+            for period, group in periods.items():
+                stats.summary.add_many(group)
+                stats.add_period(period, group)
+
+    def overall(self):
+        # Сводка по всем режимам
+        summary = Summary()
+        for stats in self.modes.values():
+            summary.merge(stats.summary)
+        return summary
+
+    def to_dict(self):
+        return {
+            "overall": self.overall().to_dict(),
+            "rejected": self.rejected,
+            "modes": [{
+                "mode": list(mode),
+                **stats.summary.to_dict(),
+                "trend": [{"period": period, "count": count, "best": best, "mean": mean}
+                          for period, count, best, mean in stats.trend()],
+            } for mode, stats in sorted(self.modes.items())],
+        }
+
+
+def analyze(path=records.WINS_FILE, chunk_records=records.CHUNK_RECORDS):
+    # Статистика по всему файлу рекордов
+    analytics = Analytics()
+    for chunk in records.read_chunks(path, chunk_records):
+        analytics.add_chunk(chunk)
+    return analytics
+
+
+def print_report(analytics):
+    # Вывод статистики по режимам: процентили, гистограмма и динамика по месяцам
+    overall = analytics.overall()
+    if analytics.rejected:
+        print(f"Отброшено поврежденных рекордов: {analytics.rejected}")
+    if not overall.count:
+        print("Рекордов нет")
+        return
+    print(f"Всего рекордов: {overall.count}, режимов: {len(analytics.modes)}, "
+          f"медиана {overall.percentile(50):.2f}с")
+    for (width, height, mines_count), stats in sorted(analytics.modes.items()):
+        summary = stats.summary
+        print(f"\n{width}x{height}, {mines_count} мин: {summary.count} побед, лучшее {summary.best:.2f}с, "
+              f"среднее {summary.total / summary.count:.2f}с")
+        print("  " + ", ".join(f"p{percent} {summary.percentile(percent):.2f}с" for percent in PERCENTILES))
+        histogram = summary.histogram()
+        peak = max(count for _, _, count in histogram)
+        for low, high, count in histogram:
+            print(f"  {low:8.2f}-{high:<8.2f} {'#' * round(count / peak * BAR_WIDTH):<{BAR_WIDTH}} {count}")
+        for period, count, best, mean in stats.trend():
+            print(f"  {period:<10} {count:>8} побед, лучшее {best:8.2f}с, среднее {mean:8.2f}с")
+
+
+def main():
+    # Запуск из командной строки: python analytics.py [файл рекордов] [-o файл JSON] [-c рекордов в блоке]
+    parser = argparse.ArgumentParser(description="Статистика по файлу рекордов Сапера")
+    parser.add_argument("path", nargs="?", default=records.WINS_FILE, help="файл рекордов")
+    parser.add_argument("-o", "--output", help="файл для статистики в формате JSON")
+    parser.add_argument("-c", "--chunk", type=int, default=records.CHUNK_RECORDS, help="рекордов в блоке чтения")
+    args = parser.parse_args()
+    started = time.perf_counter()
+    analytics = analyze(args.path, args.chunk)
+    print_report(analytics)
+    print(f"\nОбработано за {time.perf_counter() - started:.2f}с")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(analytics.to_dict(), file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
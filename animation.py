@@ -0,0 +1,115 @@
+import heapq  # Импорт очереди с приоритетом для отложенных действий
+import time  # Импорт модуля для работы со временем
+from functools import lru_cache  # Импорт кэширования результатов функций
+
+FRAME_MS = 16  # интервал между кадрами анимации в миллисекундах (около 60 кадров в секунду)
+FRAME_BUDGET = 0.008  # максимальное время обработки одного кадра в секундах
+
+
+def parse_color(color):
+    # Преобразование цвета в формате HEX (#rrggbb) в компоненты RGB без обращения к Tk
+    return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+
+
+@lru_cache(maxsize=None)
+def gradient(start_color, end_color, steps):
+    # Таблица цветов перехода от начального цвета к конечному (steps + 1 значений), вычисляется один раз
+    start_r, start_g, start_b = parse_color(start_color)
+    end_r, end_g, end_b = parse_color(end_color)
+    colors = []
+    for i in range(steps + 1):
+        factor = i / steps
+        r = int(start_r + (end_r - start_r) * factor)
+        g = int(start_g + (end_g - start_g) * factor)
+        b = int(start_b + (end_b - start_b) * factor)
+        colors.append(f'#{r:02x}{g:02x}{b:02x}')
+    return tuple(colors)
+
+
+class Animator:
+    def __init__(self, master, apply, frame_ms=FRAME_MS, budget=FRAME_BUDGET):
+        self.master = master  # Окно, через которое планируются кадры
+        self.apply = apply  # Функция apply(key, color), применяющая цвет к элементу
+        self.frame_ms = frame_ms
+        self.budget = budget
+        # Активные переходы цвета: ключ -> [таблица цветов, шаг в мс, время начала, текущий шаг, callback, apply]
+        self.fades = {}
+        self.delayed = []  # Отложенные действия: (время выполнения, порядковый номер, функция, аргументы)
+        self.counter = 0  # Порядковый номер для отложенных действий с одинаковым временем
+        self.cursor = 0  # Позиция, с которой продолжается обработка переходов в следующем кадре
+        self.tick_id = None  # Идентификатор запланированного кадра
+
+    def fade(self, key, start_color, end_color, steps=10, step_ms=50, callback=None, apply=None):
+        # Запуск плавного перехода цвета элемента; повторный запуск для того же ключа заменяет предыдущий
+        # apply заменяет общую функцию применения цвета для этого перехода (например, для группы элементов)
+        self.fades[key] = [gradient(start_color, end_color, steps), step_ms, time.perf_counter(), -1, callback,
+                           apply or self.apply]
+        self.start()
+
+    def schedule(self, delay_ms, func, *args):
+        # Выполнение действия через заданное время в общем цикле кадров
+        self.counter += 1
+        heapq.heappush(self.delayed, (time.perf_counter() + delay_ms / 1000, self.counter, func, args))
+        self.start()
+
+    def pending(self):
+        # Количество активных переходов и отложенных действий
+        return len(self.fades) + len(self.delayed)
+
+    def start(self):
+        # Планирование следующего кадра, если он еще не запланирован
+        if self.tick_id is None:
+            self.tick_id = self.master.after(self.frame_ms, self.tick)
+
+    def cancel_all(self):
+        # Отмена всех анимаций и отложенных действий
+        if self.tick_id is not None:
+            self.master.after_cancel(self.tick_id)
+            self.tick_id = None
+        self.fades.clear()
+        self.delayed.clear()
+        self.cursor = 0
+
+    def cancel(self, keys):
+        # Отмена переходов цвета заданных элементов (остальные анимации продолжаются)
+        for key in [key for key in self.fades if key in keys]:
+            del self.fades[key]
+
+    def tick(self):
+        # Один кадр: продвижение всех активных переходов и выполнение наступивших отложенных действий
+        self.tick_id = None
+        now = time.perf_counter()
+        deadline = now + self.budget
+
+        # Выполнение отложенных действий, время которых наступило
+        while self.delayed and self.delayed[0][0] <= now and time.perf_counter() < deadline:
+            _, _, func, args = heapq.heappop(self.delayed)
+            func(*args)
+
+        # Продвижение переходов цвета; если бюджет кадра исчерпан, обработка продолжится с этого места
+        keys = list(self.fades)
+        if keys:
+            start = self.cursor % len(keys)
+            finished = []
+            processed = 0
+            for key in keys[start:] + keys[:start]:
+                fade = self.fades[key]
+                colors, step_ms, started, last_step, callback, apply = fade
+                step = min(len(colors) - 1, int((now - started) * 1000 / step_ms))
+                if step != last_step:
+                    fade[3] = step
+                    apply(key, colors[step])
+                if step == len(colors) - 1:
+                    finished.append(key)
+                processed += 1
+                # Проверка бюджета каждые 64 элемента, чтобы не вызывать таймер слишком часто
+                if processed % 64 == 0 and time.perf_counter() >= deadline:
+                    break
+            self.cursor = start + processed
+            for key in finished:
+                callback = self.fades.pop(key)[4]
+                if callback:
+                    callback()
+
+        if self.fades or self.delayed:
+            self.start()
@@ -0,0 +1,175 @@
+import argparse  # Импорт разбора аргументов командной строки
+import json  # Импорт записи результатов в машиночитаемом виде
+import os  # Импорт функций для работы с файлами и количеством процессоров
+import platform  # Импорт сведений о версии Python и системе
+import random  # Импорт модуля для генерации случайных чисел
+import time  # Импорт модуля для работы со временем
+import tracemalloc  # Импорт отслеживания выделений памяти
+from array import array  # Импорт компактных массивов чисел
+from concurrent.futures import ProcessPoolExecutor  # Импорт пула процессов
+
+from board import Board, FLAG, REVEALED  # Импорт игрового поля и флагов состояния ячеек
+from solver import deduce  # Импорт логических правил решателя для автоматического игрока
+
+# Конфигурации по умолчанию: ширина, высота, количество мин
+DEFAULT_CONFIGS = [(13, 13, 10), (16, 16, 40), (30, 16, 99), (100, 100, 1500)]
+OPERATIONS = ("place_mines", "reveal_cell", "click", "adjacent_mines", "chord", "check_win")
+PERCENTILES = (50, 90, 99)
+GAMES_PER_JOB = 10  # количество игр в одном задании пула процессов
+
+
+class Timings:
+    # Длительности вызовов операций поля в наносекундах
+    def __init__(self):
+        self.samples = {name: array('Q') for name in OPERATIONS}
+
+    def measure(self, name, func, *args):
+        # Вызов функции с замером длительности; возвращает ее результат
+        started = time.perf_counter_ns()
+        result = func(*args)
+        self.samples[name].append(time.perf_counter_ns() - started)
+        return result
+
+    def merge(self, other):
+        for name in OPERATIONS:
+            self.samples[name].extend(other.samples[name])
+
+
+def play_game(width, height, mines_count, seed, timings):
+    # Одна игра автоматического игрока: ходы по логическим правилам, а если их нет - случайная закрытая ячейка
+    # Возвращает True при победе
+    board = Board(width, height, mines_count, seed=seed)
+    rng = random.Random(seed)
+    row, col = height // 2, width // 2
+    timings.measure("place_mines", board.place_mines, row, col)
+    timings.measure("reveal_cell", board.reveal_cell, row, col)
+    known_mines = set()
+    while not timings.measure("check_win", board.check_win):
+        safe, mines = deduce(board, known_mines)
+        for index in mines:
+            board.toggle_flag(*board.coords(index))
+        known_mines |= mines
+        for index in safe:
+            if board.cells[index] & (REVEALED | FLAG):
+                continue
+            # Безопасная ячейка открывается аккордом с соседней цифры, если флажки вокруг нее уже расставлены
+            for neighbor in board.neighbor_indices(index):
+                r, c = board.coords(neighbor)
+                if board.cells[neighbor] & REVEALED and \
+                        timings.measure("adjacent_mines", board.adjacent_mines, r, c) == board.flags_around(r, c):
+                    timings.measure("chord", board.chord, r, c)
+                    break
+            else:
+                timings.measure("reveal_cell", board.reveal_cell, *board.coords(index))
+        if safe or mines:
+            continue
+        # Логических ходов нет - открытие случайной закрытой ячейки без флажка
+        hidden = [index for index in range(board.size) if not board.cells[index] & (REVEALED | FLAG)]
+        timings.measure("click", board.click, *board.coords(rng.choice(hidden)))
+        if board.lost:
+            return False
+    return True
+
+
+def run_job(width, height, mines_count, seeds):
+    # Задание для процесса пула: игры с заданными зернами; возвращает (побед, длительности, время работы)
+    timings = Timings()
+    started = time.perf_counter()
+    wins = sum(play_game(width, height, mines_count, seed, timings) for seed in seeds)
+    return wins, timings, time.perf_counter() - started
+
+
+def measure_memory(width, height, mines_count, seed):
+    # Пиковое потребление памяти одной игрой (отдельный прогон, так как отслеживание замедляет игру)
+    tracemalloc.start()
+    try:
+        play_game(width, height, mines_count, seed, Timings())
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(samples):
+    # Количество вызовов, среднее и процентили длительности в микросекундах
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    result = {"count": len(ordered), "mean_us": sum(ordered) / len(ordered) / 1000}
+    for percentile in PERCENTILES:
+        position = min(len(ordered) - 1, len(ordered) * percentile // 100)
+        result[f"p{percentile}_us"] = ordered[position] / 1000
+    result["max_us"] = ordered[-1] / 1000
+    return result
+
+
+def benchmark(width, height, mines_count, games, pool, base_seed):
+    # Прогон игр одной конфигурации в пуле процессов
+    seeds = [base_seed + i for i in range(games)]
+    jobs = [seeds[i:i + GAMES_PER_JOB] for i in range(0, games, GAMES_PER_JOB)]
+    started = time.perf_counter()
+    futures = [pool.submit(run_job, width, height, mines_count, job) for job in jobs]
+    memory = pool.submit(measure_memory, width, height, mines_count, base_seed)
+    timings = Timings()
+    wins = 0
+    cpu_time = 0.0
+    for future in futures:
+        job_wins, job_timings, job_time = future.result()
+        wins += job_wins
+        timings.merge(job_timings)
+        cpu_time += job_time
+    elapsed = time.perf_counter() - started
+    return {
+        "width": width,
+        "height": height,
+        "mines": mines_count,
+        "games": games,
+        "wins": wins,
+        "elapsed_s": elapsed,
+        "games_per_sec": games / elapsed,
+        "games_per_sec_per_process": games / cpu_time if cpu_time else None,
+        "peak_memory_bytes": memory.result(),
+        "operations": {name: summarize(timings.samples[name]) for name in OPERATIONS},
+    }
+
+
+def parse_config(text):
+    # Разбор конфигурации вида ШИРИНАxВЫСОТАxМИНЫ
+    try:
+        width, height, mines_count = (int(value) for value in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидается ШИРИНАxВЫСОТАxМИНЫ, получено {text!r}")
+    return width, height, mines_count
+
+
+def main():
+    # Запуск из командной строки: python benchmark.py [-g игр] [-w процессов] [-o файл] [конфигурации...]
+    parser = argparse.ArgumentParser(description="Замер производительности игрового поля без интерфейса")
+    parser.add_argument("configs", nargs="*", type=parse_config, help="конфигурации ШИРИНАxВЫСОТАxМИНЫ")
+    parser.add_argument("-g", "--games", type=int, default=200, help="количество игр на конфигурацию")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="количество процессов")
+    parser.add_argument("-s", "--seed", type=int, default=1, help="зерно первой игры")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="файл результатов")
+    args = parser.parse_args()
+
+    results = []
+    with ProcessPoolExecutor(args.workers) as pool:
+        for width, height, mines_count in args.configs or DEFAULT_CONFIGS:
+            result = benchmark(width, height, mines_count, args.games, pool, args.seed)
+            results.append(result)
+            operations = result["operations"]
+            print(f"{width}x{height}/{mines_count}: {result['games_per_sec']:.1f} игр/с, "
+                  f"побед {result['wins']}/{args.games}, память {result['peak_memory_bytes'] / 1024:.0f} КБ, "
+                  f"reveal_cell p99 {operations['reveal_cell'].get('p99_us', 0):.1f} мкс")
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump({
+            "created_at": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "workers": args.workers,
+            "results": results,
+        }, file, ensure_ascii=False, indent=2)
+    print(f"Результаты записаны в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
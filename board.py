@@ -0,0 +1,483 @@
+import random  # Импорт модуля для генерации случайных чисел
+import re  # Импорт поиска серий ячеек в строке поля
+from array import array  # Импорт компактных массивов чисел
+from collections import deque  # Импорт очереди для поиска в ширину
+from itertools import compress  # Импорт выборки элементов по маске
+
+# Битовые флаги состояния ячейки
+MINE = 1  # в ячейке мина
+REVEALED = 2  # ячейка открыта
+FLAG = 4  # на ячейке установлен флажок
+
+# Типы действий для пакетного применения (значения совпадают с кодами в записи ходов)
+ACTION_REVEAL = 0  # открытие закрытой ячейки (в том числе первый клик)
+ACTION_FLAG = 1  # установка или снятие флажка
+ACTION_CHORD = 2  # открытие соседей открытой цифры
+
+MINE_TABLE = bytes(value & MINE for value in range(256))  # таблица для выделения бита мины из состояния ячейки
+FLAG_TABLE = bytes(1 if value & FLAG else 0 for value in range(256))  # таблица для выделения бита флажка
+HIDDEN_TABLE = bytes(0 if value & REVEALED else 1 for value in range(256))  # 1 для закрытых ячеек
+# Таблица открытия всех ячеек без мин и флажков (используется в конце игры)
+REVEAL_ALL_TABLE = bytes(value if value & (MINE | FLAG) else value | REVEALED for value in range(256))
+NO_MINE_TABLE = bytes(value & ~MINE for value in range(256))  # таблица для удаления бита мины
+REVEALED_MASK_TABLE = bytes(255 if value & REVEALED else 0 for value in range(256))  # маска открытых ячеек
+ZERO_TABLE = bytes(1 if value == 0 else 0 for value in range(256))  # 1 для нулевых значений (пустых ячеек)
+NOT_ZERO_TABLE = bytes(0 if value == 0 else 1 for value in range(256))  # 1 для ненулевых значений
+NOT_MINE_TABLE = bytes(0 if value & MINE else 1 for value in range(256))  # 1 для ячеек без мины
+RUN = re.compile(b"\x01+")  # серия подряд идущих отмеченных ячеек в строке маски
+RECOUNT_FRACTION = 64  # при изменении больше 1/64 ячеек счетчики пересчитываются по всему полю
+
+
+class Board:
+    def __init__(self, width, height, mines_count, label_regions=True, seed=None):
+        # Размеры поля и количество мин (хотя бы одна ячейка - первый клик - должна остаться без мины)
+        if width < 1 or height < 1 or not 0 <= mines_count < width * height:
+            raise ValueError(f"недопустимые параметры поля: {width}x{height}, {mines_count} мин")
+        self.width = width
+        self.height = height
+        self.mines_count = mines_count
+        self.size = width * height  # Общее количество ячеек
+        # Зерно генератора случайных чисел: одно и то же зерно и первый клик дают одинаковую расстановку мин
+        self.seed = random.randrange(2 ** 63) if seed is None else seed
+        # Смещения индексов соседей для ячеек, не лежащих на краю поля
+        self.offsets = [dr * width + dc for dr in (-1, 0, 1) for dc in (-1, 0, 1)]
+        # Компактный массив состояний ячеек: один байт на ячейку с битами MINE/REVEALED/FLAG
+        self.cells = bytearray(self.size)
+        # Таблицы счетчиков по квадрату 3x3 вокруг каждой ячейки (включая саму ячейку)
+        self.mine_counts = bytearray(self.size)  # количество мин, заполняется при расстановке мин
+        self.flag_counts = bytearray(self.size)  # количество флажков, обновляется при каждом флажке
+        self.hidden_counts = bytearray(self.size)  # количество закрытых ячеек, обновляется при открытии
+        # Заполнение таблицы закрытых ячеек построчно по готовым шаблонам (строка имеет 1, 2 или 3 строки соседей)
+        cols_around = [min(width, col + 2) - max(0, col - 1) for col in range(width)]
+        row_templates = {rows: bytes(rows * n for n in cols_around) for rows in (1, 2, 3)}
+        for row in range(height):
+            rows_around = min(height, row + 2) - max(0, row - 1)
+            self.hidden_counts[row * width:(row + 1) * width] = row_templates[rows_around]
+        self.mines = []  # Индексы ячеек с минами
+        # Разметка пустых областей (связных компонент ячеек без мин вокруг), строится при расстановке мин
+        self.label_regions = label_regions
+        self.region_labels = None  # Номер пустой области для каждой ячейки (0 - ячейка не пустая)
+        self.regions = [None]  # Список ячеек, открываемых вместе с каждой областью (сама область и ее граница)
+        self.region_flags = [0]  # Количество флажков внутри каждой пустой области
+        self.regions_pending = False  # Разметка отложена до первого открытия пустой ячейки (после restore)
+        self.revealed_count = 0  # Количество открытых ячеек
+        self.flags_count = 0  # Количество установленных флажков
+        self.first_click = True  # Флаг, показывающий, был ли совершен первый клик
+        self.lost = False  # Флаг поражения (была открыта мина)
+        # Журнал изменений для отмены ходов (None - не ведется): индексы открытых ячеек и ~индексы ячеек,
+        # на которых переключался флажок, в порядке изменения
+        self.journal = None
+        # Сложность поля: 3BV (наименьшее число кликов для прохождения поля), количество пустых областей
+        # и количество островов (групп цифр, не граничащих с пустыми областями); None - еще не вычислялась
+        self.metrics = None
+
+    def reset(self, seed=None):
+        # Подготовка поля того же размера к новой игре без выделения новых массивов (для повторного использования)
+        self.seed = random.randrange(2 ** 63) if seed is None else seed
+        self.cells[:] = bytes(self.size)
+        self.mine_counts[:] = bytes(self.size)
+        self.flag_counts[:] = bytes(self.size)
+        self.hidden_counts[:] = self.square_sums(HIDDEN_TABLE)  # Все ячейки закрыты
+        self.mines.clear()
+        self.region_labels = None
+        self.regions = [None]
+        self.region_flags = [0]
+        self.regions_pending = False
+        self.revealed_count = 0
+        self.flags_count = 0
+        self.first_click = True
+        self.lost = False
+        self.journal = None
+        self.metrics = None
+
+    def visible_copy(self):
+        # Копия поля, содержащая только то, что видит игрок: открытые ячейки, их цифры и флажки
+        # (используется анализом позиции в другом потоке, чтобы он не мог подсмотреть мины)
+        copy = Board.__new__(Board)
+        copy.__dict__.update(self.__dict__)
+        copy.cells = self.cells.translate(NO_MINE_TABLE)
+        mask = int.from_bytes(self.cells.translate(REVEALED_MASK_TABLE), 'little')
+        copy.mine_counts = bytearray((int.from_bytes(self.mine_counts, 'little') & mask).to_bytes(self.size, 'little'))
+        copy.flag_counts = bytearray(self.flag_counts)
+        copy.hidden_counts = bytearray(self.hidden_counts)
+        copy.mines = []
+        copy.seed = None  # По зерну можно восстановить расстановку мин
+        copy.region_labels = None
+        copy.regions = [None]
+        copy.region_flags = [0]
+        copy.regions_pending = False
+        copy.journal = None
+        return copy
+
+    def index(self, row, col):
+        # Преобразование координат (row, col) в индекс ячейки в массиве
+        return row * self.width + col
+
+    def coords(self, index):
+        # Преобразование индекса ячейки обратно в координаты (row, col)
+        return divmod(index, self.width)
+
+    def neighbors(self, row, col):
+        # Перебор координат ячейки и ее соседей в пределах поля (квадрат 3x3)
+        for r in range(max(0, row - 1), min(self.height, row + 2)):
+            for c in range(max(0, col - 1), min(self.width, col + 2)):
+                yield r, c
+
+    def neighbor_indices(self, index):
+        # Индексы ячейки и ее соседей в пределах поля (квадрат 3x3)
+        row, col = divmod(index, self.width)
+        # Для внутренних ячеек используются заранее вычисленные смещения
+        if 0 < row < self.height - 1 and 0 < col < self.width - 1:
+            return [index + offset for offset in self.offsets]
+        left, right = max(0, col - 1), min(self.width, col + 2)
+        return [base + c for base in range(max(0, row - 1) * self.width, min(self.height, row + 2) * self.width,
+                                           self.width) for c in range(left, right)]
+
+    def is_mine(self, row, col):
+        # Проверка, есть ли мина в ячейке
+        return self.cells[row * self.width + col] & MINE != 0
+
+    def is_revealed(self, row, col):
+        # Проверка, открыта ли ячейка
+        return self.cells[row * self.width + col] & REVEALED != 0
+
+    def is_flagged(self, row, col):
+        # Проверка, установлен ли флажок в ячейке
+        return self.cells[row * self.width + col] & FLAG != 0
+
+    def place_mines(self, start_row, start_col):
+        # Определение безопасной зоны вокруг начального хода; при высокой плотности мин защищен только сам ход
+        start = start_row * self.width + start_col
+        safe_zone = self.neighbor_indices(start)
+        if self.mines_count > self.size - len(safe_zone):
+            safe_zone = [start]
+
+        # Выбор мин без повторений среди ячеек вне безопасной зоны: ячейки нумеруются подряд с пропуском
+        # безопасной зоны, и случайно выбирается mines_count различных номеров (время не зависит от плотности)
+        rng = random.Random(self.seed)
+        for index in rng.sample(range(self.size - len(safe_zone)), self.mines_count):
+            for safe in safe_zone:  # Безопасная зона отсортирована по возрастанию индексов
+                if safe <= index:
+                    index += 1
+                else:
+                    break
+            self.cells[index] |= MINE
+            self.mines.append(index)
+        self.mines.sort()  # Мины по возрастанию индексов для последовательного обхода памяти
+        self.count_mines()
+        self.metrics = None  # Сложность вычисляется при первом запросе, а не на первом клике
+        if self.label_regions:
+            self.find_regions()
+        self.first_click = False
+
+    def square_sums(self, table, source=None):
+        # Суммы по квадрату 3x3 вокруг каждой ячейки значений table[состояние ячейки] (0 или 1) за один проход:
+        # поле представляется одним большим целым числом по байту на ячейку, а суммы считаются сдвигами
+        # и сложениями этого числа (значения не превышают 9, поэтому переносов между байтами не бывает)
+        # Вместо состояний ячеек можно передать другой массив по байту на ячейку (например, счетчики мин)
+        width, size = self.width, self.size
+        values = int.from_bytes((self.cells if source is None else source).translate(table), 'little')
+        # Маски, не дающие значениям крайних столбцов перейти на соседнюю строку при сдвиге
+        not_last_col = int.from_bytes(bytes([255] * (width - 1) + [0]) * self.height, 'little')
+        not_first_col = int.from_bytes(bytes([0] + [255] * (width - 1)) * self.height, 'little')
+        rows = values + ((values & not_last_col) << 8) + ((values & not_first_col) >> 8)
+        counts = rows + (rows << 8 * width) + (rows >> 8 * width)
+        return (counts & ((1 << 8 * size) - 1)).to_bytes(size, 'little')
+
+    def count_mines(self):
+        # Заполнение таблицы количества мин по всему полю
+        self.mine_counts[:] = self.square_sums(MINE_TABLE)
+
+    def difficulty(self):
+        # Сложность поля (3BV, количество пустых областей, количество островов); вычисляется при первом запросе
+        # (обычно при сохранении рекорда): на больших полях вычисление заметно по времени, и первый клик его
+        # не ждет; до расстановки мин сложность неизвестна - (0, 0, 0)
+        if self.first_click:
+            return 0, 0, 0
+        if self.metrics is None:
+            self.metrics = self.measure()
+        return self.metrics
+
+    def measure(self):
+        # Вычисление 3BV, количества пустых областей и островов по счетчикам мин без обхода ячеек по одной:
+        # маски строятся переводом таблиц и сумм по квадрату 3x3, а связные компоненты считаются по сериям
+        # ячеек в строках (время линейно по размеру поля, а работа в Python - по количеству серий)
+        zero = self.mine_counts.translate(ZERO_TABLE)  # Пустые ячейки (без мин вокруг и в самой ячейке)
+        near_zero = self.square_sums(ZERO_TABLE, self.mine_counts)  # Ненулевое значение рядом с пустой областью
+        # Цифры, которые не откроются вместе с пустыми областями: каждую нужно открыть отдельным кликом
+        isolated = (int.from_bytes(self.cells.translate(NOT_MINE_TABLE), 'little')
+                    & ~int.from_bytes(near_zero.translate(NOT_ZERO_TABLE), 'little')).to_bytes(self.size, 'little')
+        openings = self.count_components(zero)
+        return openings + isolated.count(1), openings, self.count_components(isolated)
+
+    def count_components(self, mask):
+        # Количество связных (по 8 направлениям) компонент ячеек, отмеченных в маске единицей: серии в соседних
+        # строках, касающиеся хотя бы по диагонали, объединяются через систему непересекающихся множеств
+        width = self.width
+        parent = []  # Родитель каждой серии в системе непересекающихся множеств
+        components = 0
+        previous = []  # Серии предыдущей строки: (начало, конец, номер серии)
+
+        def root(run):
+            while parent[run] != run:
+                parent[run] = parent[parent[run]]
+                run = parent[run]
+            return run
+
+        for start in range(0, self.size, width):
+            current = []
+            for match in RUN.finditer(mask, start, start + width):
+                current.append((match.start() - start, match.end() - start, len(parent)))
+                parent.append(len(parent))
+            components += len(current)
+            i = j = 0
+            while i < len(previous) and j < len(current):
+                previous_start, previous_end, previous_run = previous[i]
+                current_start, current_end, current_run = current[j]
+                # Серии касаются, если расстояние между их ячейками по горизонтали не больше одной
+                if previous_start <= current_end and current_start <= previous_end:
+                    a, b = root(previous_run), root(current_run)
+                    if a != b:
+                        parent[b] = a
+                        components -= 1
+                if previous_end < current_end:
+                    i += 1
+                else:
+                    j += 1
+            previous = current
+        return components
+
+    def restore(self, cells, metrics=None):
+        # Восстановление начатой игры по состояниям ячеек (мины уже расставлены); производные таблицы
+        # и счетчики пересчитываются по состояниям, сложность поля берется из сохранения (None - вычисляется
+        # при первом запросе), а пустые области размечаются при первом открытии пустой ячейки
+        if len(cells) != self.size:
+            raise ValueError("размер состояния не совпадает с размером поля")
+        self.cells[:] = cells
+        self.mines = list(compress(range(self.size), self.cells.translate(MINE_TABLE)))
+        if len(self.mines) != self.mines_count:
+            raise ValueError("количество мин не совпадает с заголовком")
+        self.count_mines()
+        self.metrics = metrics
+        self.flag_counts[:] = self.square_sums(FLAG_TABLE)
+        self.hidden_counts[:] = self.square_sums(HIDDEN_TABLE)
+        self.revealed_count = self.size - self.cells.translate(HIDDEN_TABLE).count(1)
+        self.flags_count = self.cells.translate(FLAG_TABLE).count(1)
+        self.regions = [None]
+        self.region_flags = [0]
+        self.region_labels = None
+        self.regions_pending = self.label_regions
+        self.first_click = False
+        self.lost = False
+
+    def label_pending_regions(self):
+        # Отложенная разметка пустых областей восстановленной игры с подсчетом уже стоящих в них флажков
+        self.regions_pending = False
+        self.find_regions()
+        for index in compress(range(self.size), self.cells.translate(FLAG_TABLE)):
+            if self.region_labels[index]:
+                self.region_flags[self.region_labels[index]] += 1
+
+    def find_regions(self):
+        # Разметка всех пустых областей за один линейный проход (каждая ячейка посещается один раз)
+        counts = self.mine_counts
+        labels = array('i', bytes(4 * self.size))
+        border_mark = array('i', bytes(4 * self.size))  # Номер последней области, к границе которой отнесена ячейка
+        for start in range(self.size):
+            if counts[start] or labels[start] or self.cells[start] & MINE:
+                continue
+            label = len(self.regions)
+            labels[start] = label
+            region = [start]
+            queue = deque(region)
+            while queue:
+                index = queue.popleft()
+                for neighbor in self.neighbor_indices(index):
+                    if counts[neighbor]:
+                        # Ячейка с цифрой открывается вместе с областью, но не продолжает ее
+                        if border_mark[neighbor] != label:
+                            border_mark[neighbor] = label
+                            region.append(neighbor)
+                    elif not labels[neighbor]:
+                        labels[neighbor] = label
+                        region.append(neighbor)
+                        queue.append(neighbor)
+            self.regions.append(region)
+            self.region_flags.append(0)
+        self.region_labels = labels
+
+    def adjacent_mines(self, row, col):
+        # Возвращает количество мин, соседствующих с ячейкой по координатам (row, col)
+        return self.mine_counts[row * self.width + col]
+
+    def flags_around(self, row, col):
+        # Возвращает количество флажков вокруг ячейки по координатам (row, col)
+        return self.flag_counts[row * self.width + col]
+
+    def hidden_around(self, row, col):
+        # Возвращает количество закрытых ячеек вокруг ячейки по координатам (row, col)
+        return self.hidden_counts[row * self.width + col]
+
+    def is_impossible(self, row, col):
+        # Проверка, что флажков вокруг ячейки больше, чем мин (заведомо неверная расстановка флажков)
+        index = row * self.width + col
+        return self.flag_counts[index] > self.mine_counts[index]
+
+    def toggle_flag(self, row, col):
+        # Установка или снятие флажка; возвращает True, если флажок установлен, False - если снят,
+        # None - если действие невозможно (первый клик или ячейка уже открыта)
+        index = row * self.width + col
+        if self.first_click or self.cells[index] & REVEALED:
+            return None
+        self.cells[index] ^= FLAG
+        placed = self.cells[index] & FLAG != 0
+        # Обновление счетчиков флажков у ячейки и ее соседей
+        delta = 1 if placed else -1
+        for neighbor in self.neighbor_indices(index):
+            self.flag_counts[neighbor] += delta
+        self.flags_count += delta
+        # Флажок внутри пустой области прерывает ее открытие целиком
+        if self.region_labels is not None and self.region_labels[index]:
+            self.region_flags[self.region_labels[index]] += delta
+        if self.journal is not None:
+            self.journal.append(~index)
+        return placed
+
+    def open_cell(self, index, opened):
+        # Отметка одной ячейки как открытой и обновление счетчиков закрытых ячеек у соседей
+        self.cells[index] |= REVEALED
+        self.revealed_count += 1
+        for neighbor in self.neighbor_indices(index):
+            self.hidden_counts[neighbor] -= 1
+        if self.journal is not None:
+            self.journal.append(index)
+        row, col = divmod(index, self.width)
+        opened.append((row, col, self.mine_counts[index]))
+
+    def set_revealed(self, indexes, revealed):
+        # Открытие или закрытие заданных ячеек без поиска в ширину (отмена и повтор ходов, в журнал не попадает)
+        # Если ячеек много, счетчики закрытых ячеек пересчитываются целиком, а не по соседям каждой ячейки
+        cells = self.cells
+        if revealed:
+            for index in indexes:
+                cells[index] |= REVEALED
+        else:
+            for index in indexes:
+                cells[index] &= ~REVEALED
+        self.revealed_count += len(indexes) if revealed else -len(indexes)
+        if len(indexes) > self.size // RECOUNT_FRACTION:
+            self.hidden_counts[:] = self.square_sums(HIDDEN_TABLE)
+            return
+        delta = -1 if revealed else 1
+        for index in indexes:
+            for neighbor in self.neighbor_indices(index):
+                self.hidden_counts[neighbor] += delta
+
+    def reveal_cell(self, row, col):
+        # Открытие ячейки и, если рядом нет мин, всех соседних пустых ячеек
+        # Возвращает список (row, col, mines_count) для каждой вновь открытой ячейки
+        opened = []
+        start = row * self.width + col
+        # Если клетка уже открыта или на ней установлен флаг, ничего не делать
+        if self.cells[start] & (REVEALED | FLAG):
+            return opened
+
+        # Если клетка принадлежит заранее размеченной пустой области без флажков, открыть всю область сразу
+        if self.regions_pending and not self.mine_counts[start]:
+            self.label_pending_regions()
+        label = self.region_labels[start] if self.region_labels is not None else 0
+        if label and not self.region_flags[label]:
+            for index in self.regions[label]:
+                if not self.cells[index] & (REVEALED | FLAG):
+                    self.open_cell(index, opened)
+            return opened
+
+        # Поиск в ширину: ячейка отмечается открытой при добавлении в очередь, поэтому посещается не более одного раза
+        self.open_cell(start, opened)
+        queue = deque([start])
+        while queue:
+            index = queue.popleft()
+            # Если рядом с клеткой нет мин, открыть соседние клетки и продолжить поиск от них
+            if self.mine_counts[index] == 0:
+                for neighbor in self.neighbor_indices(index):
+                    if not self.cells[neighbor] & (REVEALED | FLAG):
+                        self.open_cell(neighbor, opened)
+                        queue.append(neighbor)
+        return opened
+
+    def reveal_all(self):
+        # Открытие всех ячеек без мин и флажков за один проход (показ поля в конце игры); счетчики закрытых
+        # ячеек пересчитываются целиком, а не по соседям каждой открытой ячейки
+        self.cells[:] = self.cells.translate(REVEAL_ALL_TABLE)
+        self.hidden_counts[:] = self.square_sums(HIDDEN_TABLE)
+        self.revealed_count = self.size - self.cells.translate(HIDDEN_TABLE).count(1)
+
+    def click(self, row, col):
+        # Обработка нажатия на закрытую ячейку; возвращает список вновь открытых ячеек
+        if self.first_click:
+            # Разместить мины после первого клика и открыть клетку, на которой был сделан первый клик
+            self.place_mines(row, col)
+            return self.reveal_cell(row, col)
+        index = row * self.width + col
+        if self.cells[index] & (REVEALED | FLAG):
+            return []
+        if self.cells[index] & MINE:  # Если на клетке есть мина, игра заканчивается поражением
+            self.lost = True
+            return []
+        return self.reveal_cell(row, col)
+
+    def chord(self, row, col):
+        # Открытие всех нефлажкованных ячеек вокруг открытой цифры, если число флажков равно числу мин
+        # Возвращает список вновь открытых ячеек; при попадании на мину устанавливает флаг поражения
+        opened = []
+        index = row * self.width + col
+        # Нечего открывать, если число флажков не совпадает с числом мин или все закрытые соседи помечены флажками
+        if self.mine_counts[index] != self.flag_counts[index] or self.hidden_counts[index] == self.flag_counts[index]:
+            return opened
+        for r, c in self.neighbors(row, col):
+            index = r * self.width + c
+            if not self.cells[index] & FLAG:
+                # Если обнаружена мина, игра заканчивается
+                if self.cells[index] & MINE:
+                    self.lost = True
+                    return opened
+                opened.extend(self.reveal_cell(r, c))
+        return opened
+
+    def apply(self, actions):
+        # Применение списка действий (тип, row, col) за один проход; действия после конца игры пропускаются
+        # Возвращает (вновь открытые ячейки, множество индексов ячеек, вид которых изменился): кроме открытых
+        # ячеек и ячеек с флажками сюда попадают соседи флажков, у которых могла измениться отметка невозможности
+        opened = []
+        changed = set()
+        for action, row, col in actions:
+            if self.lost or (not self.first_click and self.check_win()):
+                break
+            if action == ACTION_REVEAL:
+                new = self.click(row, col)
+            elif action == ACTION_CHORD:
+                new = self.chord(row, col) if self.cells[row * self.width + col] & REVEALED else []
+            elif action == ACTION_FLAG:
+                new = []
+                if self.toggle_flag(row, col) is not None:
+                    changed.update(self.neighbor_indices(row * self.width + col))
+            else:
+                raise ValueError(f"неизвестное действие {action}")
+            opened.extend(new)
+            changed.update(r * self.width + c for r, c, _ in new)
+        return opened, changed
+
+    def check_win(self):
+        # Проверка, что количество открытых ячеек равно общему числу ячеек минус количество мин
+        return not self.lost and self.revealed_count == self.size - self.mines_count
+
+
+def generate_boards(width, height, mines_count, count, first_click=None, seed=None, label_regions=False):
+    # Пакетная генерация полей с расставленными минами для тестов и замеров производительности
+    # Зерна полей выводятся из общего зерна, поэтому весь набор воспроизводим
+    rng = random.Random(seed)
+    start_row, start_col = first_click if first_click is not None else (height // 2, width // 2)
+    for _ in range(count):
+        board = Board(width, height, mines_count, label_regions=label_regions, seed=rng.randrange(2 ** 63))
+        board.place_mines(start_row, start_col)
+        yield board
@@ -0,0 +1,328 @@
+import math  # Импорт модуля для математических операций (биномиальные коэффициенты)
+import queue  # Импорт потокобезопасной очереди для обмена с потоком анализа
+import threading  # Импорт потоков для анализа позиции в фоне
+import time  # Импорт модуля для работы со временем
+from collections import OrderedDict  # Импорт словаря с порядком для кэша перебора
+
+from solver import constraints, deduce, global_rule  # Импорт логических правил решателя
+
+HINT_DEADLINE = 0.05  # целевое время анализа позиции в секундах; перебор прерывается по его истечении
+SOLUTIONS_CACHE_SIZE = 1024  # сколько результатов перебора групп хранится в кэше
+
+# Кэш результатов перебора: группа ограничений -> результат; между соседними ходами большинство групп
+# не меняется, и повторный перебор для них не нужен
+solutions_cache = OrderedDict()
+
+
+class DeadlineExceeded(Exception):
+    # Перебор вариантов не уложился в отведенное время
+    pass
+
+
+class Hint:
+    # Результат анализа позиции
+    def __init__(self):
+        self.safe = set()  # Заведомо безопасные ячейки
+        self.mines = set()  # Заведомые мины
+        self.probabilities = {}  # Вероятность мины для закрытых ячеек на границе открытой области
+        self.interior_probability = None  # Вероятность мины для любой закрытой ячейки вне границы
+        self.complete = True  # False, если анализ был прерван по времени и вероятности части ячеек приближенные
+        self.error = None  # Описание ошибки, если анализ завершился исключением
+        self.elapsed = 0.0  # Время анализа в секундах
+
+    def best_guess(self):
+        # Ячейка с наименьшей вероятностью мины на границе и эта вероятность; None, если вероятностей нет
+        if not self.probabilities:
+            return None
+        return min(self.probabilities.items(), key=lambda item: item[1])
+
+
+def components(rules):
+    # Разбиение ограничений на независимые группы, не имеющие общих неизвестных ячеек (система непересекающихся
+    # множеств по ячейкам)
+    parent = {}
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for unknown, _ in rules:
+        cells = iter(unknown)
+        first = next(cells)
+        parent.setdefault(first, first)
+        for cell in cells:
+            parent.setdefault(cell, cell)
+            root_a, root_b = find(first), find(cell)
+            if root_a != root_b:
+                parent[root_b] = root_a
+    groups = {}
+    for rule in rules:
+        groups.setdefault(find(next(iter(rule[0]))), []).append(rule)
+    return list(groups.values())
+
+
+def count_solutions(key, deadline):
+    # Перебор всех расстановок мин в группе ограничений с отсечениями (с кэшированием по группе)
+    # key - кортеж ограничений (отсортированные ячейки, количество мин)
+    # Возвращает (ячейки, {число мин: количество расстановок}, {число мин: [расстановок с миной в каждой ячейке]})
+    result = solutions_cache.get(key)
+    if result is not None:
+        solutions_cache.move_to_end(key)
+        return result
+    result = enumerate_solutions(key, deadline)
+    solutions_cache[key] = result
+    if len(solutions_cache) > SOLUTIONS_CACHE_SIZE:
+        solutions_cache.popitem(last=False)
+    return result
+
+
+def enumerate_solutions(key, deadline):
+    # Перебор с возвратом: ячейки рассматриваются по очереди, и значение отбрасывается, как только какое-либо
+    # ограничение становится невыполнимым; при превышении времени выбрасывается DeadlineExceeded
+    # Перебор идет без рекурсии (стек - номер текущей ячейки и выбранные значения), поэтому длина границы
+    # не ограничена глубиной рекурсии Python
+    cells = sorted({cell for unknown, _ in key for cell in unknown})
+    position = {cell: i for i, cell in enumerate(cells)}
+    rules = [([position[cell] for cell in unknown], remaining) for unknown, remaining in key]
+    # Для каждой ячейки - ограничения, в которые она входит
+    cell_rules = [[] for _ in cells]
+    for rule_index, (members, _) in enumerate(rules):
+        for member in members:
+            cell_rules[member].append(rule_index)
+    placed = [0] * len(rules)  # Сколько мин уже поставлено в каждом ограничении
+    left = [len(members) for members, _ in rules]  # Сколько ячеек ограничения еще не рассмотрено
+    assignment = [-1] * len(cells)  # Значение каждой ячейки (-1 - ячейка еще не получила значения)
+    totals = {}
+    per_cell = {}
+    steps = 0
+
+    def possible(i, value):
+        # Проверка, что значение не нарушает ни одно ограничение с этой ячейкой
+        for rule_index in cell_rules[i]:
+            new_placed = placed[rule_index] + value
+            remaining = rules[rule_index][1]
+            if new_placed > remaining or new_placed + left[rule_index] - 1 < remaining:
+                return False
+        return True
+
+    i = mines = 0
+    while i >= 0:
+        steps += 1
+        if steps % 4096 == 0 and time.perf_counter() > deadline:
+            raise DeadlineExceeded
+        if i == len(cells):
+            # Расстановка найдена: учет и возврат к последней ячейке за следующим значением
+            totals[mines] = totals.get(mines, 0) + 1
+            counts = per_cell.setdefault(mines, [0] * len(cells))
+            for j, value in enumerate(assignment):
+                counts[j] += value
+            i -= 1
+            continue
+        value = assignment[i]
+        if value >= 0:
+            # Отмена предыдущего значения ячейки перед следующим
+            for rule_index in cell_rules[i]:
+                placed[rule_index] -= value
+                left[rule_index] += 1
+            mines -= value
+        value += 1
+        while value <= 1 and not possible(i, value):
+            value += 1
+        if value > 1:
+            # Значения ячейки исчерпаны: возврат к предыдущей ячейке
+            assignment[i] = -1
+            i -= 1
+            continue
+        for rule_index in cell_rules[i]:
+            placed[rule_index] += value
+            left[rule_index] -= 1
+        assignment[i] = value
+        mines += value
+        i += 1
+    return cells, totals, per_cell
+
+
+def convolve(first, second):
+    # Свертка распределений количества мин (списков весов по числу мин) двух независимых частей поля;
+    # результат делится на наибольший вес: для вероятностей важны только отношения весов, а числа с плавающей
+    # точкой не переполняются и на сотнях групп
+    result = [0.0] * (len(first) + len(second) - 1)
+    for mines_a, ways_a in enumerate(first):
+        if ways_a:
+            for mines_b, ways_b in enumerate(second):
+                result[mines_a + mines_b] += ways_a * ways_b
+    return normalized(result)
+
+
+def normalized(weights):
+    # Веса, деленные на наибольший (нулевые веса остаются нулевыми)
+    largest = max(weights)
+    return [weight / largest for weight in weights] if largest else weights
+
+
+def as_weights(distribution):
+    # Распределение {число мин: количество расстановок} в виде списка весов по числу мин
+    weights = [0.0] * (max(distribution) + 1)
+    for mines, ways in distribution.items():
+        weights[mines] = float(ways)
+    return normalized(weights)
+
+
+def interior_weights(interior, mines_left, frontier_max):
+    # Вес каждого общего числа мин на границе t (от 0 до frontier_max) - число способов разместить оставшиеся
+    # mines_left - t мин во внутренних ячейках; биномиальные коэффициенты считаются один раз для каждого
+    # остатка через логарифм гамма-функции и делятся на наибольший (огромные целые не нужны)
+    logs = [math.lgamma(interior + 1) - math.lgamma(rest + 1) - math.lgamma(interior - rest + 1)
+            if 0 <= rest <= interior else None
+            for rest in (mines_left - mines for mines in range(frontier_max + 1))]
+    largest = max((value for value in logs if value is not None), default=None)
+    return [math.exp(value - largest) if value is not None else 0.0 for value in logs]
+
+
+def analyze(position, deadline=HINT_DEADLINE):
+    # Анализ позиции: заведомо безопасные ячейки и мины по логическим правилам, затем вероятности мин
+    # перебором независимых групп ограничений на границе открытой области
+    started = time.perf_counter()
+    deadline_at = started + deadline
+    hint = Hint()
+
+    # Логические правила применяются, пока они дают новые выводы (и пока не истекло время анализа:
+    # уже найденные выводы верны и без остальных)
+    while True:
+        if time.perf_counter() > deadline_at:
+            hint.complete = False
+            break
+        safe, mines = deduce(position, hint.mines, hint.safe)
+        if not safe and not mines:
+            safe, mines = global_rule(position, hint.mines, hint.safe)
+        if not safe and not mines:
+            break
+        hint.safe |= safe
+        hint.mines |= mines
+
+    # Перебор расстановок для каждой независимой группы ограничений; группы, перебор которых не уложился
+    # во время (или начался после его истечения и не нашелся в кэше), остаются без перебора
+    rules = constraints(position, hint.mines, hint.safe)
+    groups = []
+    unfinished = set()  # Ячейки групп без перебора
+    for group in components(rules):
+        key = tuple(sorted((tuple(sorted(unknown)), remaining) for unknown, remaining in set(group)))
+        try:
+            groups.append(count_solutions(key, deadline_at))
+        except DeadlineExceeded:
+            hint.complete = False
+            unfinished.update(cell for unknown, _ in key for cell in unknown)
+
+    # Ячейки вне границы: закрытые, не входящие ни в одно ограничение и не определенные правилами
+    # Ячейки групп без перебора приближенно считаются такими же: их ограничения не учитываются, и вероятность
+    # мины в них равна средней плотности оставшихся мин
+    frontier = {cell for unknown, _ in rules for cell in unknown} - unfinished
+    # Граница, мины и безопасные ячейки из правил не пересекаются и состоят из закрытых ячеек
+    interior = position.size - position.revealed_count - len(frontier) - len(hint.mines) - len(hint.safe)
+    mines_left = position.mines_count - len(hint.mines)
+
+    if groups:
+        combine(hint, groups, interior, mines_left, deadline_at, unfinished)
+    elif interior:
+        hint.interior_probability = mines_left / interior
+    if unfinished:
+        # Приближенная вероятность для ячеек групп без перебора (помечена неполным результатом): вероятность
+        # внутренних ячеек, а если ее нет - средняя плотность оставшихся мин во всех неопределенных ячейках
+        approximate = hint.interior_probability
+        if approximate is None:
+            approximate = mines_left / (interior + len(frontier))
+        for cell in unfinished:
+            hint.probabilities[cell] = approximate
+
+    hint.elapsed = time.perf_counter() - started
+    return hint
+
+
+def combine(hint, groups, interior, mines_left, deadline_at, unfinished):
+    # Вероятности мин по результатам перебора групп: вес каждого общего числа мин на границе - число
+    # расстановок на границе, умноженное на число способов разместить оставшиеся мины во внутренних ячейках
+    # Для ячеек группы i нужны распределения всех остальных групп: они собираются из свертки групп до i
+    # (prefix) и весов, уже учитывающих группы после i и внутренние ячейки (suffix), поэтому время линейно
+    # по числу групп; при истечении времени ячейки необработанных групп попадают в unfinished
+    distributions = [as_weights(totals) for _, totals, _ in groups]
+    prefixes = [[1.0]]  # prefixes[i] - свертка распределений групп до i
+    for distribution in distributions:
+        if time.perf_counter() > deadline_at:
+            break
+        prefixes.append(convolve(prefixes[-1], distribution))
+    else:
+        total = prefixes[-1]
+        weights = interior_weights(interior, mines_left, len(total) - 1)
+        all_weight = sum(ways * weight for ways, weight in zip(total, weights))
+        if not all_weight:
+            return  # Позиция противоречива (неверные флажки не учитываются, но числа несовместимы)
+        if interior:
+            hint.interior_probability = sum(ways * weight * (mines_left - mines) for mines, (ways, weight)
+                                            in enumerate(zip(total, weights))) / all_weight / interior
+        # suffix[t] - вес того, что в группах до i вместе t мин, с учетом всех групп после i и внутренних ячеек
+        suffix = weights
+        for i in range(len(groups) - 1, -1, -1):
+            if time.perf_counter() > deadline_at:
+                break
+            cells, totals, per_cell = groups[i]
+            prefix = prefixes[i]
+            # Вес каждого числа мин в этой группе с учетом всех остальных групп и внутренних ячеек
+            factors = {mines: sum(ways * suffix[other + mines] for other, ways in enumerate(prefix) if ways)
+                       for mines in totals}
+            group_weight = sum(ways * factors[mines] for mines, ways in totals.items())
+            if group_weight:
+                mine_weight = [0.0] * len(cells)
+                for mines, counts in per_cell.items():
+                    factor = factors[mines]
+                    for j, count in enumerate(counts):
+                        mine_weight[j] += count * factor
+                for cell, value in zip(cells, mine_weight):
+                    hint.probabilities[cell] = value / group_weight
+            # Перенос группы i в suffix для следующей (меньшей) группы
+            distribution = distributions[i]
+            suffix = normalized([sum(ways * suffix[t + mines] for mines, ways in enumerate(distribution) if ways)
+                                 for t in range(len(prefix))])
+        else:
+            return
+    hint.complete = False
+    unfinished.update(cell for cells, _, _ in groups for cell in cells if cell not in hint.probabilities)
+
+
+class HintEngine:
+    # Анализ позиций в фоновом потоке; главный цикл Tk забирает готовые результаты из очереди
+    def __init__(self, deadline=HINT_DEADLINE):
+        self.deadline = deadline
+        self.requests = queue.Queue(maxsize=1)  # Хранится только последняя запрошенная позиция
+        self.results = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def request(self, position, token=None):
+        # Запрос анализа позиции (копии поля без мин); более старый необработанный запрос отбрасывается
+        try:
+            self.requests.get_nowait()
+        except queue.Empty:
+            pass
+        self.requests.put((position, token))
+
+    def poll(self):
+        # Готовый результат (token, Hint) или None; вызывается из главного потока
+        try:
+            return self.results.get_nowait()
+        except queue.Empty:
+            return None
+
+    def run(self):
+        # Цикл потока анализа; ошибка анализа одной позиции возвращается как результат с описанием ошибки,
+        # а поток продолжает работать
+        while True:
+            position, token = self.requests.get()
+            try:
+                hint = analyze(position, self.deadline)
+            except Exception as error:
+                hint = Hint()
+                hint.complete = False
+                hint.error = str(error) or type(error).__name__
+            self.results.put((token, hint))
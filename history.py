@@ -0,0 +1,97 @@
+from array import array  # Импорт компактных массивов чисел
+
+
+class Version:
+    # Версия позиции в дереве версий: хранит только изменения относительно родительской версии, а все
+    # остальное состояние разделяет с родителем, поэтому память на версию пропорциональна числу измененных ячеек
+    def __init__(self, parent, opened, flags, lost):
+        self.parent = parent
+        self.opened = opened  # Индексы ячеек, открытых в этой версии
+        self.flags = flags  # Индексы ячеек, на которых переключался флажок (в порядке переключения)
+        self.lost = lost  # Флаг поражения в этой версии
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.next = None  # Последняя версия, сделанная из этой (для повтора отмененного хода)
+
+
+class History:
+    # История позиций одной игры: дерево версий поверх журнала изменений поля
+    # Поле хранится в одном экземпляре и переводится между версиями применением и откатом изменений,
+    # поэтому переход на соседнюю версию стоит столько же, сколько сам ход, а не размер поля
+    # Из любой версии можно сделать новый ход: отмененные ветви остаются в дереве и доступны через checkout
+    def __init__(self, board):
+        self.board = board
+        self.root = self.current = Version(None, array('i'), array('i'), board.lost)
+        board.journal = []
+
+    def commit(self):
+        # Оформление изменений поля после текущей версии в новую версию; возвращает ее (None - изменений нет)
+        board = self.board
+        journal = board.journal
+        if not journal and board.lost == self.current.lost:
+            return None
+        version = Version(self.current, array('i', (index for index in journal if index >= 0)),
+                          array('i', (~index for index in journal if index < 0)), board.lost)
+        journal.clear()
+        self.current.next = version
+        self.current = version
+        return version
+
+    def can_undo(self):
+        return self.current.parent is not None
+
+    def can_redo(self):
+        return self.current.next is not None
+
+    def undo(self):
+        # Отмена хода; возвращает множество индексов изменившихся ячеек (None - отменять нечего)
+        if not self.can_undo():
+            return None
+        return self.checkout(self.current.parent)
+
+    def redo(self):
+        # Повтор отмененного хода; возвращает множество индексов изменившихся ячеек (None - повторять нечего)
+        if not self.can_redo():
+            return None
+        return self.checkout(self.current.next)
+
+    def checkout(self, target):
+        # Переход к любой версии дерева (точке ветвления для анализа позиции): откат до общего предка
+        # и применение изменений от него до нужной версии
+        # Возвращает множество индексов ячеек, вид которых изменился (включая соседей переключенных флажков)
+        self.commit()  # Изменения, сделанные после текущей версии, не теряются
+        changed = set()
+        forward = []
+        version = target
+        while version.depth > self.current.depth:
+            forward.append(version)
+            version = version.parent
+        while self.current.depth > version.depth:
+            self.step(self.current, False, changed)
+            self.current = self.current.parent
+        while self.current is not version:
+            self.step(self.current, False, changed)
+            self.current = self.current.parent
+            forward.append(version)
+            version = version.parent
+        for version in reversed(forward):
+            self.step(version, True, changed)
+            version.parent.next = version
+            self.current = version
+        self.board.lost = self.current.lost
+        return changed
+
+    def step(self, version, forward, changed):
+        # Применение (forward) или откат изменений одной версии
+        # Флажок переключается только на закрытой ячейке, поэтому при откате ячейки сначала закрываются,
+        # а при применении открываются после переключения флажков
+        board = self.board
+        journal, board.journal = board.journal, None
+        if not forward:
+            board.set_revealed(version.opened, False)
+        for index in version.flags if forward else reversed(version.flags):
+            board.toggle_flag(*board.coords(index))
+            changed.update(board.neighbor_indices(index))
+        if forward:
+            board.set_revealed(version.opened, True)
+        board.journal = journal
+        changed.update(version.opened)
@@ -0,0 +1,191 @@
+import os  # Импорт функций для работы с файлами
+import random  # Импорт модуля для генерации случайных чисел
+import shutil  # Импорт удаления каталога кэша
+from collections import OrderedDict, deque  # Импорт словаря с порядком для вытеснения и очереди для обхода
+from functools import lru_cache  # Импорт кэширования результатов функций
+
+from board import FLAG, MINE, REVEALED  # Импорт битовых флагов состояния ячейки
+
+CHUNK = 32  # сторона квадратного фрагмента поля в ячейках
+CHUNK_MINES = 160  # количество мин во фрагменте (около 16% ячеек)
+MAX_CHUNKS = 256  # сколько фрагментов с состоянием хранится в памяти, прежде чем вытеснять давно не использованные
+CACHE_DIR = "infinite_cache"  # каталог, в который вытесняются измененные фрагменты
+FLOOD_LIMIT = 100000  # максимальное количество ячеек, открываемых одним ходом
+
+SIDE = CHUNK + 2  # сторона фрагмента вместе с рамкой из соседних ячеек шириной в одну ячейку
+SPILL_TABLE = bytes(value & (REVEALED | FLAG) for value in range(256))  # таблица удаления мин при вытеснении
+
+
+@lru_cache(maxsize=4 * MAX_CHUNKS)
+def chunk_mines(seed, cx, cy):
+    # Расстановка мин во фрагменте (cx, cy): зависит только от общего зерна и координат фрагмента, поэтому
+    # фрагмент можно создать в любой момент и в любом порядке; возвращает байты с битом MINE для каждой ячейки
+    # Квадрат 3x3 вокруг начальной ячейки (0, 0) всегда свободен от мин
+    rng = random.Random(f"{seed}:{cx}:{cy}")
+    cells = bytearray(CHUNK * CHUNK)
+    for index in rng.sample(range(CHUNK * CHUNK), CHUNK_MINES):
+        y, x = divmod(index, CHUNK)
+        if abs(cx * CHUNK + x) > 1 or abs(cy * CHUNK + y) > 1:
+            cells[index] = MINE
+    return bytes(cells)
+
+
+class Chunk:
+    # Фрагмент поля: состояния ячеек (с битами мин) и количество мин вокруг каждой ячейки
+    def __init__(self, cells, counts):
+        self.cells = cells
+        self.counts = counts
+        self.dirty = False  # Флаг, показывающий, что состояние изменилось после загрузки
+
+
+class InfiniteBoard:
+    # Бесконечное поле из фрагментов, создаваемых по мере того, как до них доходит обход или область просмотра
+    # Ячейки адресуются координатами (x, y), которые могут быть отрицательными
+    def __init__(self, seed=None, max_chunks=MAX_CHUNKS, cache_dir=CACHE_DIR):
+        self.seed = random.randrange(2 ** 63) if seed is None else seed
+        self.max_chunks = max_chunks
+        self.spill_dir = os.path.join(cache_dir, str(self.seed))  # Каталог вытесненных фрагментов этой игры
+        shutil.rmtree(self.spill_dir, ignore_errors=True)  # Остатки незавершенной игры с тем же зерном
+        self.chunks = OrderedDict()  # (cx, cy) -> Chunk в порядке последнего использования
+        self.revealed_count = 0  # Количество открытых ячеек
+        self.flags_count = 0  # Количество установленных флажков
+        self.lost = False  # Флаг поражения (была открыта мина)
+        self.frontier = deque()  # Открытые пустые ячейки, соседи которых еще не открыты (обход прерван лимитом)
+
+    def spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key[0]}_{key[1]}.chunk")
+
+    def load_chunk(self, key):
+        # Создание фрагмента: мины по зерну, счетчики по минам фрагмента и его соседей,
+        # открытые ячейки и флажки - из кэша на диске, если фрагмент уже вытеснялся
+        cx, cy = key
+        around = {(dx, dy): chunk_mines(self.seed, cx + dx, cy + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)}
+        # Мины фрагмента с рамкой из крайних ячеек соседних фрагментов, по байту на ячейку
+        padded = bytearray()
+        for y in range(-1, CHUNK + 1):
+            dy, row = divmod(y, CHUNK)
+            start = row * CHUNK
+            padded += around[(-1, dy)][start + CHUNK - 1:start + CHUNK]
+            padded += around[(0, dy)][start:start + CHUNK]
+            padded += around[(1, dy)][start:start + 1]
+        # Суммы по квадрату 3x3 сдвигами одного большого числа, как в Board.square_sums (рамка не дает
+        # значениям переходить между строками внутренней части)
+        mines = int.from_bytes(padded, 'little')
+        rows = mines + (mines << 8) + (mines >> 8)
+        sums = (rows + (rows << 8 * SIDE) + (rows >> 8 * SIDE)).to_bytes(SIDE * SIDE + 2 * SIDE + 1, 'little')
+        counts = bytearray(b"".join(sums[(y + 1) * SIDE + 1:(y + 1) * SIDE + 1 + CHUNK] for y in range(CHUNK)))
+        cells = around[(0, 0)]
+        try:
+            with open(self.spill_path(key), "rb") as file:
+                # В кэше хранятся только открытые ячейки и флажки; мины восстанавливаются по зерну
+                spilled = file.read()
+            cells = (int.from_bytes(cells, 'little') | int.from_bytes(spilled, 'little')).to_bytes(len(cells), 'little')
+        except FileNotFoundError:
+            pass
+        return Chunk(bytearray(cells), counts)
+
+    def chunk(self, cx, cy):
+        # Фрагмент с заданными координатами; при превышении лимита вытесняется давно не использованный
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+        chunk = self.chunks[key] = self.load_chunk(key)
+        while len(self.chunks) > self.max_chunks:
+            self.evict(*self.chunks.popitem(last=False))
+        return chunk
+
+    def evict(self, key, chunk):
+        # Сохранение измененного фрагмента на диск (без мин) при вытеснении из памяти
+        if chunk.dirty:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(self.spill_path(key), "wb") as file:
+                file.write(chunk.cells.translate(SPILL_TABLE))
+
+    def close(self):
+        # Удаление кэша этой игры на диске
+        self.chunks.clear()
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def locate(self, x, y):
+        # Фрагмент ячейки и ее индекс внутри фрагмента
+        return self.chunk(x // CHUNK, y // CHUNK), y % CHUNK * CHUNK + x % CHUNK
+
+    def state(self, x, y):
+        # Состояние ячейки (биты MINE/REVEALED/FLAG)
+        chunk, index = self.locate(x, y)
+        return chunk.cells[index]
+
+    def adjacent_mines(self, x, y):
+        chunk, index = self.locate(x, y)
+        return chunk.counts[index]
+
+    def neighbors(self, x, y):
+        # Соседи ячейки (без самой ячейки); у бесконечного поля нет краев
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                if dx or dy:
+                    yield x + dx, y + dy
+
+    def flags_around(self, x, y):
+        return sum(1 for nx, ny in self.neighbors(x, y) if self.state(nx, ny) & FLAG)
+
+    def toggle_flag(self, x, y):
+        # Установка или снятие флажка; возвращает True/False или None, если ячейка уже открыта
+        chunk, index = self.locate(x, y)
+        if chunk.cells[index] & REVEALED:
+            return None
+        chunk.cells[index] ^= FLAG
+        chunk.dirty = True
+        placed = chunk.cells[index] & FLAG != 0
+        self.flags_count += 1 if placed else -1
+        return placed
+
+    def reveal(self, x, y):
+        # Открытие ячейки и поиск в ширину по пустым ячейкам через границы фрагментов
+        # Возвращает список (x, y, количество мин вокруг) вновь открытых ячеек; при мине - флаг поражения
+        opened = []
+        chunk, index = self.locate(x, y)
+        if chunk.cells[index] & (REVEALED | FLAG):
+            return opened
+        if chunk.cells[index] & MINE:
+            self.lost = True
+            return opened
+        self.open_cell(chunk, index, x, y, opened)
+        self.frontier.append((x, y))
+        return self.expand(opened)
+
+    def expand(self, opened=None):
+        # Продолжение обхода: открытие соседей пустых ячеек из очереди, пока за ход открыто меньше FLOOD_LIMIT
+        # Ячейка уходит из очереди только после открытия всех ее соседей, поэтому прерванный лимитом обход
+        # продолжается со следующего хода или из обработчика простоя, и открытый "0" не остается среди закрытых
+        opened = [] if opened is None else opened
+        frontier = self.frontier
+        while frontier and len(opened) < FLOOD_LIMIT:
+            cx, cy = frontier[0]
+            if not self.adjacent_mines(cx, cy):
+                for nx, ny in self.neighbors(cx, cy):
+                    chunk, index = self.locate(nx, ny)
+                    if not chunk.cells[index] & (REVEALED | FLAG):
+                        self.open_cell(chunk, index, nx, ny, opened)
+                        frontier.append((nx, ny))
+            frontier.popleft()
+        return opened
+
+    def open_cell(self, chunk, index, x, y, opened):
+        chunk.cells[index] |= REVEALED
+        chunk.dirty = True
+        self.revealed_count += 1
+        opened.append((x, y, chunk.counts[index]))
+
+    def chord(self, x, y):
+        # Открытие нефлажкованных соседей открытой цифры, если число флажков вокруг равно числу мин
+        opened = []
+        if not self.state(x, y) & REVEALED or self.adjacent_mines(x, y) != self.flags_around(x, y):
+            return opened
+        for nx, ny in self.neighbors(x, y):
+            opened.extend(self.reveal(nx, ny))
+            if self.lost:
+                break
+        return opened
@@ -0,0 +1,151 @@
+import argparse  # Импорт разбора аргументов командной строки
+import heapq  # Импорт кучи для ограниченного числа лучших результатов и слияния отсортированных списков
+import math  # Импорт проверки чисел на конечность
+import os  # Импорт функций для работы с файлами и количеством процессоров
+import time  # Импорт модуля для работы со временем
+from concurrent.futures import ProcessPoolExecutor  # Импорт пула процессов для параллельного разбора файлов
+from itertools import repeat  # Импорт повторения аргумента для всех заданий пула
+
+import records  # Импорт хранилища рекордов
+
+TOP_N = 10  # количество лучших результатов каждого режима в общей таблице по умолчанию
+MAX_TIME = 30 * 86400  # время прохождения больше этого (в секундах) считается ошибкой записи
+CLOCK_SKEW = 86400  # насколько момент завершения может быть в будущем из-за неверных часов машины
+
+
+class Top:
+    # Ограниченный набор лучших результатов одного режима без повторов: куча из не более size элементов
+    # (-время, -момент завершения), на вершине худший результат
+    # Повтором считается рекорд с тем же временем и моментом завершения; у рекордов старых версий формата
+    # момент завершения неизвестен (0), и одинаковое время у них - разные победы, а не повторы
+    def __init__(self, size):
+        self.size = size
+        self.heap = []
+        self.keys = set()  # (время, момент завершения) результатов в куче для отбрасывания повторов
+        self.duplicates = 0
+
+    def push(self, time_taken, finished_at, metrics):
+        heap = self.heap
+        if len(heap) == self.size and (time_taken, finished_at) > (-heap[0][0], -heap[0][1]):
+            return  # Хуже всех лучших результатов (повтор худшего проверяется ниже)
+        key = (time_taken, finished_at)
+        if finished_at and key in self.keys:
+            self.duplicates += 1
+            return
+        self.keys.add(key)
+        if len(heap) < self.size:
+            heapq.heappush(heap, (-time_taken, -finished_at, metrics))
+        else:
+            worst_time, worst_finished, _ = heapq.heapreplace(heap, (-time_taken, -finished_at, metrics))
+            self.keys.discard((-worst_time, -worst_finished))
+
+    def sorted(self):
+        # Результаты по возрастанию времени: [(время, момент завершения, сложность поля)]
+        return sorted((-time_taken, -finished_at, metrics) for time_taken, finished_at, metrics in self.heap)
+
+
+def valid(width, height, mines_count, time_taken, finished_at, now):
+    # Проверка рекорда на правдоподобие (поврежденные и подделанные записи отбрасываются)
+    return (width > 0 and height > 0 and 0 < mines_count < width * height
+            and math.isfinite(time_taken) and 0 < time_taken <= MAX_TIME
+            and math.isfinite(finished_at) and 0 <= finished_at <= now + CLOCK_SKEW)
+
+
+def scan_file(path, size):
+    # Задание для процесса пула: лучшие результаты каждого режима в одном файле (файлы любой версии формата
+    # читаются без перевода в текущую, чтобы не изменять собранные файлы)
+    # Возвращает (путь, {режим: [(время, момент завершения, сложность)] по возрастанию}, прочитано, отброшено,
+    # повторов, ошибка чтения или None)
+    now = time.time()
+    tops = {}
+    count = invalid = 0
+    try:
+        for chunk in records.read_chunks(path):
+            for width, height, mines_count, time_taken, finished_at, *metrics in chunk:
+                count += 1
+                if not valid(width, height, mines_count, time_taken, finished_at, now):
+                    invalid += 1
+                    continue
+                top = tops.get((width, height, mines_count))
+                if top is None:
+                    top = tops[(width, height, mines_count)] = Top(size)
+                top.push(time_taken, finished_at, tuple(metrics))
+    except (OSError, ValueError) as error:
+        # Нечитаемый файл не прерывает слияние остальных
+        return path, {}, count, invalid, 0, str(error)
+    return path, {mode: top.sorted() for mode, top in tops.items()}, count, invalid, \
+        sum(top.duplicates for top in tops.values()), None
+
+
+def merge_tops(results, size):
+    # Слияние отсортированных списков всех файлов по каждому режиму (k-way merge через кучу)
+    # с отбрасыванием одинаковых рекордов из разных файлов; возвращает ({режим: [(время, момент, номер файла,
+    # сложность)]}, количество повторов)
+    modes = {}
+    for number, (_, tops, *_) in enumerate(results):
+        for mode, entries in tops.items():
+            modes.setdefault(mode, []).append([(time_taken, finished_at, number, metrics)
+                                               for time_taken, finished_at, metrics in entries])
+    merged = {}
+    duplicates = 0
+    for mode, lists in modes.items():
+        best = []
+        previous = None
+        # Одинаковые рекорды идут в слиянии подряд: списки отсортированы по (время, момент завершения);
+        # рекорды без момента завершения (старые версии формата) повторами не считаются
+        for entry in heapq.merge(*lists):
+            if entry[1] and entry[:2] == previous:
+                duplicates += 1
+                continue
+            previous = entry[:2]
+            best.append(entry)
+            if len(best) == size:
+                break
+        merged[mode] = best
+    return merged, duplicates
+
+
+def merge(paths, size=TOP_N, workers=None):
+    # Общая таблица лучших результатов по файлам рекордов; файлы разбираются параллельно
+    with ProcessPoolExecutor(workers) as pool:
+        results = list(pool.map(scan_file, paths, repeat(size)))
+    merged, duplicates = merge_tops(results, size)
+    return results, merged, duplicates + sum(result[4] for result in results)
+
+
+def main():
+    # Запуск из командной строки: python merge.py файлы... [-n лучших] [-o общий файл рекордов] [-w процессов]
+    parser = argparse.ArgumentParser(description="Общая таблица рекордов по файлам рекордов с разных машин")
+    parser.add_argument("paths", nargs="+", help="файлы рекордов")
+    parser.add_argument("-n", "--top", type=int, default=TOP_N, help="лучших результатов на режим")
+    parser.add_argument("-o", "--output", help="файл рекордов, в который записывается общая таблица")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="количество процессов")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results, merged, duplicates = merge(args.paths, args.top, args.workers)
+    for path, _, count, invalid, _, error in results:
+        if error:
+            print(f"{path}: ошибка чтения ({error})")
+        elif invalid:
+            print(f"{path}: отброшено некорректных рекордов {invalid} из {count}")
+    for (width, height, mines_count), entries in sorted(merged.items()):
+        print(f"\n{width}x{height}, {mines_count} мин:")
+        for place, (time_taken, finished_at, number, metrics) in enumerate(entries, start=1):
+            finished = time.strftime("%Y-%m-%d %H:%M", time.localtime(finished_at)) if finished_at else "неизвестно"
+            rate = f"{metrics[0] / time_taken:6.2f} 3BV/с" if metrics[0] else " " * 12
+            print(f"  {place:>3}. {time_taken:10.3f}с  {rate}  {finished}  {results[number][0]}")
+    total = sum(result[2] for result in results)
+    print(f"\nФайлов: {len(results)}, рекордов: {total}, повторов отброшено: {duplicates}, "
+          f"за {time.perf_counter() - started:.2f}с")
+    if args.output:
+        # Рекорды общей таблицы записываются в порядке завершения, как они дописывались бы в игре
+        entries = sorted((finished_at, mode, time_taken, metrics) for mode, best in merged.items()
+                         for time_taken, finished_at, _, metrics in best)
+        written = records.write_records(((mode, time_taken, finished_at, metrics)
+                                         for finished_at, mode, time_taken, metrics in entries), args.output)
+        print(f"Записано рекордов в {args.output}: {written}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,20 @@
 from tkinter import messagebox  # Импорт функциональности для вывода диалоговых окон
 import tkinter as tk  # Импорт библиотеки для создания графического интерфейса
-import random  # Импорт модуля для генерации случайных чисел
-import struct  # Импорт модуля для упаковки и распаковки данных в бинарном формате
-import math  # Импорт модуля для математических операций
+import os  # Импорт доступа к переменным окружения
 import time  # Импорт модуля для работы со временем
+from collections import OrderedDict  # Импорт словаря с порядком для вытеснения давно не видимых ячеек
+
+from animation import Animator  # Импорт общего цикла анимации
+from board import ACTION_CHORD, ACTION_FLAG, ACTION_REVEAL, Board, FLAG, MINE, REVEALED  # Импорт игровой логики, не зависящей от интерфейса
+from hints import HintEngine  # Импорт фонового анализа позиции для подсказок
+from history import History  # Импорт истории позиций для отмены ходов
+from infinite import InfiniteBoard  # Импорт бесконечного поля из фрагментов
+from profiler import Profiler  # Импорт замеров производительности интерфейса
+from sprites import SpriteAtlas  # Импорт готовых изображений значков ячеек
+import no_guess  # Импорт генератора полей без угадывания
+import records  # Импорт хранилища рекордов
+import replay  # Импорт записи ходов для проверки рекордов
+import savegame  # Импорт сохранения и продолжения начатой игры
 
 CELL_SIZE = 36  # размер ячеек
 BG_COLOR = "#222222"  # цвет заднего фона (темно-серый)
@@ -12,6 +23,71 @@ CLICKED_COLOR = "#222222"  # цвет нажатых/пустых ячеек (т
 NUMBER_COLORS = "#e3e3e3"  # цвет чисел (белый)
 TEMP_BLANK_COLOR = "#aaaaaa"  # цвет соседних ячеек при нажатии на цифру (светло-серый)
 IMPOSSIBLE_COLOR = "#503333"  # цвет невозможных ходов (красный)
+FLAGGED_COLOR = "#666666"  # цвет ячеек с флажком (серый)
+HINT_SAFE_COLOR = "#5a9c4f"  # цвет безопасных ячеек в подсказке (зеленый)
+HINT_GUESS_COLOR = "#c9b037"  # цвет ячейки с наименьшей вероятностью мины в подсказке (желтый)
+
+MIN_CELL_SIZE = 8  # минимальный размер ячеек при масштабировании
+MAX_CELL_SIZE = 72  # максимальный размер ячеек при масштабировании
+MAX_CUSTOM_SIDE = 2000  # максимальная ширина и высота поля в режиме своего размера
+DRAWN_CELLS_LIMIT = 20000  # сколько нарисованных ячеек хранится на холсте, прежде чем вытеснять невидимые
+REGION_LABEL_LIMIT = 250000  # до какого размера поля пустые области размечаются заранее
+NO_GUESS_LIMIT = 10000  # до какого размера поля доступен режим без угадывания
+HINT_POLL_MS = 25  # интервал проверки готовности подсказки в миллисекундах
+FINAL_BATCH = 400  # сколько ячеек перерисовывается за один вызов при показе поля в конце игры
+FINAL_FADE = True  # плавный переход цвета всех открытых в конце игры ячеек одной анимацией
+FINAL_TAG = "final"  # тег прямоугольников ячеек, открытых в конце игры
+INFINITE_VIEW = (30, 20)  # размер области просмотра бесконечного поля в ячейках
+
+# Конфигурация уровней сложности: название, ширина, высота, количество мин
+MODES = [
+    ("Легкий", 13, 13, 10),
+    ("Средний", 16, 16, 40),
+    ("Сложный", 30, 16, 99)
+]
+
+# Кэш таблицы рекордов, общий для всех окон игры (переживает возврат в главное меню)
+LEADERBOARD = records.LeaderboardCache()
+
+# Фоновая запись рекордов, общая для всех окон игры; создается при первом рекорде, а не при импорте:
+# процессы пулов no_guess и replay, запущенные через spawn, заново импортируют главный модуль
+WIN_WRITER = None
+
+# Обработчики, время которых замеряется при включенном профилировании; все открытия ячеек, флажки
+# и аккорды на поле проходят через apply_actions, поэтому его время включает работу поля и отрисовку ходов
+PROFILED_HANDLERS = ("cell_click", "apply_actions", "place_flag", "on_hover", "game_over", "update_viewport",
+                     "redraw")
+# Обработчики ввода, для которых дополнительно замеряется задержка до отрисовки
+PROFILED_INPUT = ("on_canvas_click", "on_canvas_release", "on_canvas_right_click")
+
+# Настройки, сохраняющиеся при возврате в главное меню (профилирование также включается
+# переменной окружения MINESWEEPER_PROFILE=1)
+SETTINGS = {"no_guess": False, "profile": os.environ.get("MINESWEEPER_PROFILE") == "1", "practice": False}
+
+# Фоновый анализ позиций для подсказок, общий для всех окон игры (поток создается при первой подсказке)
+HINT_ENGINE = None
+
+
+def win_writer():
+    # Общий поток записи рекордов (при создании восстанавливает файл рекордов после сбоя)
+    global WIN_WRITER
+    if WIN_WRITER is None:
+        WIN_WRITER = records.RecordWriter()
+    return WIN_WRITER
+
+
+def flush_wins():
+    # Ожидание записи поставленных в очередь рекордов; возвращает текст ошибки или None
+    return None if WIN_WRITER is None else WIN_WRITER.flush()
+
+
+def hint_engine():
+    # Общий поток анализа позиций
+    global HINT_ENGINE
+    if HINT_ENGINE is None:
+        HINT_ENGINE = HintEngine()
+    return HINT_ENGINE
+
 
 class Minesweeper:
     def __init__(self, master):
@@ -19,14 +95,32 @@ class Minesweeper:
         self.master = master  # Ссылка на главное окно
         self.start_time = None  # Время начала игры
         self.game_active = False  # Флаг, показывающий, активна ли игра в данный момент
-        self.buttons = []  # Список кнопок на игровом поле
-        self.scheduled_tasks = []  # Список запланированных задач (таймеров)
-        self.mines = set()  # Множество координат мин
-        self.revealed = set()  # Множество координат открытых ячеек
-        self.flags = set()  # Множество координат установленных флажков
-        self.temp_blanks = set()  # Множество координат временных пустых ячеек
-        self.first_click = True  # Флаг, показывающий, был ли совершен первый клик в игре
+        self.canvas = None  # Холст, на котором рисуется видимая часть игрового поля
+        self.scrollbars = None  # Полосы прокрутки холста (создаются, когда поле не помещается на холсте)
+        self.cell_size = CELL_SIZE  # Текущий размер ячеек (меняется при масштабировании)
+        # Идентификаторы прямоугольников нарисованных ячеек в порядке последнего попадания в видимую область
+        self.cell_items = OrderedDict()
+        self.cell_overlays = {}  # Идентификаторы цифр и мин, нарисованных поверх ячеек
+        self.flag_items = {}  # Идентификаторы элементов флажков, нарисованных поверх ячеек
+        self.hover_cell = None  # Ячейка, над которой находится курсор
+        self.viewport_pending = False  # Флаг, показывающий, что обновление видимой области уже запланировано
+        self.final_state = None  # Итог игры для отображения мин ("win" или "loss"), None - игра не окончена
+        self.animator = Animator(master, self.apply_cell_color)  # Общий цикл анимации ячеек
+        self.sprites = SpriteAtlas(master)  # Изображения флажка и мины для каждого размера ячеек
+        self.board = None  # Игровое поле (состояние мин, флажков и открытых ячеек)
+        self.temp_blanks = set()  # Множество индексов временных пустых ячеек
+        self.dirty_cells = set()  # Индексы ячеек, которые нужно перерисовать по их текущему состоянию
+        self.redraw_pending = False  # Флаг, показывающий, что перерисовка изменившихся ячеек уже запланирована
+        self.hint_token = None  # Метка последнего запроса подсказки; результаты других запросов отбрасываются
+        self.hint_cells = {}  # Подсвеченные подсказкой ячейки: индекс -> цвет подсветки
+        self.recorder = None  # Запись ходов текущей игры (None до первого клика, в тренировке и для продолженных
+        # игр, сохраненных без записи ходов)
+        self.practice = False  # Режим тренировки: ходы можно отменять, рекорды не сохраняются
+        self.history = None  # История позиций для отмены и повтора ходов (только в режиме тренировки)
+        self.explosions = {}  # Версия истории -> мины, на которые попал игрок в режиме тренировки
+        self.profiler = None  # Замеры производительности (создаются при начале игры, если профилирование включено)
         self.master.configure(bg=BG_COLOR)  # Настройка фона главного окна
+        self.master.protocol("WM_DELETE_WINDOW", self.on_close)  # Сохранение игры при закрытии окна
         self.show_menu()  # Отображение главного меню игры
 
     def recenter_window(self):
@@ -56,21 +150,62 @@ class Minesweeper:
                                font=("Arial", 14, "bold"))
         title_label.pack(pady=(0, 20))
 
-        # Конфигурация уровней сложности
-        modes = [
-            ("Легкий", 13, 13, 10),
-            ("Средний", 16, 16, 40),
-            ("Сложный", 30, 16, 99)
-        ]
+        # Кнопка продолжения сохраненной игры (если она есть)
+        if savegame.exists():
+            resume_btn = tk.Button(self.menu_frame, text="Продолжить", bg=UNCLICKED_COLOR, fg=NUMBER_COLORS,
+                                   font=("Arial", 12, "bold"), relief="flat", command=self.resume_game)
+            resume_btn.pack(pady=(0, 10))
+
         buttons_frame = tk.Frame(self.menu_frame, bg=BG_COLOR)
         buttons_frame.pack()
 
         # Создание кнопок для каждого уровня сложности
-        for index, mode in enumerate(modes):
+        for index, mode in enumerate(MODES):
             btn = tk.Button(buttons_frame, text=mode[0], bg=UNCLICKED_COLOR, fg=NUMBER_COLORS,
                             font=("Arial", 12, "bold"), relief="flat",
                             command=lambda m=mode: self.start_game(*m[1:]))
             btn.grid(row=0, column=index, padx=5, pady=5)
+        infinite_btn = tk.Button(buttons_frame, text="Бесконечный", bg=UNCLICKED_COLOR, fg=NUMBER_COLORS,
+                                 font=("Arial", 12, "bold"), relief="flat", command=self.start_infinite)
+        infinite_btn.grid(row=0, column=len(MODES), padx=5, pady=5)
+
+        # Поля для выбора своего размера поля и количества мин
+        custom_frame = tk.Frame(self.menu_frame, bg=BG_COLOR)
+        custom_frame.pack(pady=(10, 0))
+        self.custom_entries = []
+        for index, (text, default) in enumerate((("Ширина", 100), ("Высота", 100), ("Мины", 1500))):
+            tk.Label(custom_frame, text=text, bg=BG_COLOR, fg=NUMBER_COLORS).grid(row=0, column=index, padx=5)
+            entry = tk.Entry(custom_frame, width=6, justify="center")
+            entry.insert(0, str(default))
+            entry.grid(row=1, column=index, padx=5)
+            self.custom_entries.append(entry)
+        custom_btn = tk.Button(custom_frame, text="Свой", bg=UNCLICKED_COLOR, fg=NUMBER_COLORS,
+                               font=("Arial", 12, "bold"), relief="flat", command=self.start_custom_game)
+        custom_btn.grid(row=1, column=3, padx=5)
+
+        # Переключатель режима полей, проходимых без угадывания
+        self.no_guess_var = tk.BooleanVar(value=SETTINGS["no_guess"])
+        no_guess_check = tk.Checkbutton(self.menu_frame, text="Без угадывания", variable=self.no_guess_var,
+                                        bg=BG_COLOR, fg=NUMBER_COLORS, selectcolor=BG_COLOR,
+                                        activebackground=BG_COLOR, activeforeground=NUMBER_COLORS,
+                                        command=lambda: SETTINGS.update(no_guess=self.no_guess_var.get()))
+        no_guess_check.pack(pady=(10, 0))
+
+        # Переключатель замеров производительности (окно статистики и выгрузка гистограмм в конце сессии)
+        self.profile_var = tk.BooleanVar(value=SETTINGS["profile"])
+        profile_check = tk.Checkbutton(self.menu_frame, text="Профилирование", variable=self.profile_var,
+                                       bg=BG_COLOR, fg=NUMBER_COLORS, selectcolor=BG_COLOR,
+                                       activebackground=BG_COLOR, activeforeground=NUMBER_COLORS,
+                                       command=lambda: SETTINGS.update(profile=self.profile_var.get()))
+        profile_check.pack()
+
+        # Переключатель режима тренировки (отмена и повтор ходов, попадание на мину можно отменить)
+        self.practice_var = tk.BooleanVar(value=SETTINGS["practice"])
+        practice_check = tk.Checkbutton(self.menu_frame, text="Тренировка", variable=self.practice_var,
+                                        bg=BG_COLOR, fg=NUMBER_COLORS, selectcolor=BG_COLOR,
+                                        activebackground=BG_COLOR, activeforeground=NUMBER_COLORS,
+                                        command=lambda: SETTINGS.update(practice=self.practice_var.get()))
+        practice_check.pack()
 
         # Дополнительные кнопки
         other_label = tk.Label(self.menu_frame, text="Другое", bg=BG_COLOR, fg=NUMBER_COLORS,
@@ -112,64 +247,20 @@ class Minesweeper:
         highscores_window.title("Рекорды")
         highscores_window.resizable(False, False)
 
-        # Словарь с уровнями сложности и их описанием
-        difficulties = {
-            "Легкий": "9x9 - 10 Mines",
-            "Средний": "16x16 - 40 Mines",
-            "Сложный": "30x16 - 99 Mines"
-        }
-
         # Создание фрейма для размещения рекордов
         highscores_frame = tk.Frame(highscores_window, bg=BG_COLOR)
         highscores_frame.pack(pady=(10, 5))
-
-        # Отображение названий уровней сложности в верхней части окна
-        for index, difficulty in enumerate(difficulties.keys()):
-            tk.Label(highscores_frame, text=difficulty, bg=BG_COLOR, fg=NUMBER_COLORS, font=("Arial", 16, "bold")).grid(
-                row=0, column=index, padx=20)
-
-        # Чтение рекордов из файла
-        records = []
-        try:
-            with open("minesweeper.wins", "rb") as file:
-                while True:
-                    length_bytes = file.read(4)
-                    if not length_bytes:
-                        break  # Конец файла
-                    length = struct.unpack('I', length_bytes)[0]
-                    mode_bytes = file.read(length)
-                    mode = mode_bytes.decode('utf-8')
-                    time_taken_bytes = file.read(4)
-                    time_taken = struct.unpack('f', time_taken_bytes)[0]
-                    records.append((mode, time_taken))
-        except FileNotFoundError:
-            pass
-
-        # Сортировка рекордов по времени
-        records.sort(key=lambda x: float(x[1]))
-
-        # Группировка рекордов по уровням сложности
-        records_by_difficulty = {difficulty: [] for difficulty in difficulties.keys()}
-        for record in records:
-            for difficulty, format in difficulties.items():
-                if format in record[0]:
-                    records_by_difficulty[difficulty].append(record)
-                    break
-
-        # Отображение топ-5 рекордов для каждого уровня сложности
-        for index, (difficulty, records) in enumerate(records_by_difficulty.items()):
-            if not records:
-                tk.Label(highscores_frame, text="Нет рекорда!", bg=BG_COLOR, fg=NUMBER_COLORS).grid(row=1,
-                                                                                                    column=index,
-                                                                                                    padx=20)
-                continue
-            top_records = records[:5]
-            for row, record in enumerate(top_records, start=1):
-                # Форматирование времени и его отображение в соответствующей ячейке
-                formatted_time = self.format_time(record[1])
-                tk.Label(highscores_frame, text=formatted_time, bg=BG_COLOR, fg=NUMBER_COLORS).grid(row=row,
-                                                                                                    column=index,
-                                                                                                    padx=20)
+        flush_wins()  # Только что выигранная игра должна попасть в таблицу
+        self.fill_highscores(highscores_frame, False)
+
+        # Переключение сортировки: по времени или по 3BV/с (время, деленное на сложность поля, сравнимо между
+        # полями одного режима, а сырое время - нет)
+        by_rate = tk.BooleanVar(value=False)
+        rate_check = tk.Checkbutton(highscores_window, text="По 3BV/с", variable=by_rate,
+                                    bg=BG_COLOR, fg=NUMBER_COLORS, selectcolor=BG_COLOR,
+                                    activebackground=BG_COLOR, activeforeground=NUMBER_COLORS,
+                                    command=lambda: self.fill_highscores(highscores_frame, by_rate.get()))
+        rate_check.pack(pady=(0, 10))
 
         # Обновление размеров окна и центрирование его на экране
         highscores_window.update_idletasks()
@@ -185,6 +276,29 @@ class Minesweeper:
 
         highscores_window.geometry(f'+{center_x}+{center_y}')
 
+    def fill_highscores(self, highscores_frame, by_rate):
+        # Отображение названий уровней сложности в верхней части окна и топ-5 рекордов для каждого из них
+        for widget in highscores_frame.winfo_children():
+            widget.destroy()
+        for index, (difficulty, width, height, mines) in enumerate(MODES):
+            tk.Label(highscores_frame, text=difficulty, bg=BG_COLOR, fg=NUMBER_COLORS, font=("Arial", 16, "bold")).grid(
+                row=0, column=index, padx=20)
+
+            # Лучшие результаты берутся из кэша; файл перечитывается, только если он изменился
+            if by_rate:
+                results = [f"{rate:.2f} 3BV/с" for rate in LEADERBOARD.top_rates(width, height, mines, 5)]
+            else:
+                results = [self.format_time(time_taken) for time_taken in LEADERBOARD.top(width, height, mines, 5)]
+            if not results:
+                tk.Label(highscores_frame, text="Нет рекорда!", bg=BG_COLOR, fg=NUMBER_COLORS).grid(row=1,
+                                                                                                    column=index,
+                                                                                                    padx=20)
+                continue
+            for row, text in enumerate(results, start=1):
+                # Отображение результата в соответствующей ячейке
+                tk.Label(highscores_frame, text=text, bg=BG_COLOR, fg=NUMBER_COLORS).grid(row=row, column=index,
+                                                                                           padx=20)
+
     def show_help(self):
         # Создание окна справки
         help_window = tk.Toplevel(self.master, bg=BG_COLOR)
@@ -203,6 +317,7 @@ class Minesweeper:
         - Щелкните левой кнопкой мыши, чтобы открыть ячейку.
         - Щелкните правой кнопкой мыши, чтобы установить или удалить флажок в ячейке.
         - Зажмите левую кнопку мыши на цифре, чтобы посмотреть соседей ячейки.
+        - В режиме тренировки Ctrl+Z отменяет ход, Ctrl+Y возвращает его.
 
         Подсказки:
         - Первое нажатие всегда безопасен.
@@ -231,34 +346,124 @@ class Minesweeper:
         help_window.geometry(f'+{center_x}+{center_y}')
 
     def show_main_menu(self):
-        # Открытие главного меню
+        # Сохранение начатой игры и открытие главного меню
+        self.save_game()
+        self.export_profile()
         self.master.destroy()
         main()
 
+    def on_close(self):
+        # Сохранение начатой игры, ожидание записи рекордов и закрытие окна
+        self.save_game()
+        self.export_profile()
+        error = flush_wins()
+        if error:
+            messagebox.showerror("Сапер", f"Не удалось сохранить рекорд: {error}")
+        self.master.destroy()
+
+    def start_profiler(self):
+        # Замена обработчиков этого окна обертками с замером времени
+        self.profiler = Profiler(self.master, self.animator)
+        self.profiler.instrument(self, PROFILED_HANDLERS)
+        self.profiler.instrument_input(self, PROFILED_INPUT)
+        self.profiler.instrument_frames()
+
+    def export_profile(self):
+        # Выгрузка гистограмм сессии профилирования
+        if self.profiler is not None:
+            self.profiler.export()
+
+    def show_message(self, text):
+        # Информационное окно; время ожидания его закрытия не учитывается замерами обработчиков
+        if self.profiler is None:
+            messagebox.showinfo("Сапер", text)
+        else:
+            with self.profiler.paused():
+                messagebox.showinfo("Сапер", text)
+
+    def save_game(self):
+        # Сохранение игры, если она начата и еще не окончена (тренировочные игры не сохраняются: иначе
+        # продолженная игра с отмененными ходами могла бы попасть в рекорды)
+        if self.game_active and not self.board.first_click and not self.practice:
+            savegame.save(self.board, time.time() - self.start_time,
+                          moves=None if self.recorder is None else self.recorder.data)
+
+    def resume_game(self):
+        # Продолжение сохраненной игры; сохранение удаляется, чтобы одну игру нельзя было продолжить дважды
+        try:
+            loaded = savegame.load(region_label_limit=REGION_LABEL_LIMIT)
+        except (ValueError, OSError) as error:
+            messagebox.showerror("Сапер", f"Не удалось загрузить сохранение: {error}")
+            loaded = None
+        savegame.discard()
+        if loaded is None:
+            self.menu_frame.destroy()
+            self.show_menu()
+            return
+        self.board, elapsed, moves = loaded
+        self.menu_frame.destroy()
+        self.create_widgets()
+        self.update_flag_counter()
+        self.start_time = time.time() - elapsed
+        # Запись ходов продолжается с места сохранения; игра без записи (старое сохранение) не попадает в рекорды
+        try:
+            self.recorder = None if moves is None else replay.Recorder(self.board, self.start_time, moves)
+        except ValueError:
+            self.recorder = None
+        self.game_active = True
+        self.update_time_elapsed()
+        self.recenter_window()
+
+    def start_custom_game(self):
+        # Чтение и проверка размеров поля и количества мин из полей ввода
+        try:
+            width, height, mines = (int(entry.get()) for entry in self.custom_entries)
+        except ValueError:
+            messagebox.showerror("Сапер", "Введите целые числа.")
+            return
+        if not (1 <= width <= MAX_CUSTOM_SIDE and 1 <= height <= MAX_CUSTOM_SIDE):
+            messagebox.showerror("Сапер", f"Ширина и высота должны быть от 1 до {MAX_CUSTOM_SIDE}.")
+            return
+        if not 1 <= mines < width * height:
+            messagebox.showerror("Сапер", f"Количество мин должно быть от 1 до {max(1, width * height - 1)}.")
+            return
+        self.start_game(width, height, mines)
+
+    def new_board(self, width, height, mines):
+        # Создание игрового поля; на очень больших полях пустые области не размечаются заранее
+        return Board(width, height, mines, label_regions=width * height <= REGION_LABEL_LIMIT)
+
     def start_game(self, width, height, mines):
-        # Установка размеров поля и количества мин
-        global GRID_WIDTH, GRID_HEIGHT, MINES_COUNT
-        GRID_WIDTH, GRID_HEIGHT, MINES_COUNT = width, height, mines
+        # Создание игрового поля с заданными размерами и количеством мин
+        self.board = self.new_board(width, height, mines)
 
         # Удаление фрейма меню
         self.menu_frame.destroy()
 
-        # Создание двумерного списка для хранения кнопок игрового поля
-        self.buttons = [[None for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-
-        # Создание кнопок для игрового поля
+        # Создание панели информации и холста игрового поля
         self.create_widgets()
 
         # Центрирование окна
         self.recenter_window()
 
+    def start_infinite(self):
+        # Начало игры на бесконечном поле в этом же окне
+        self.menu_frame.destroy()
+        InfiniteView(self.master)
+        self.recenter_window()
+
     def create_widgets(self):
+        # Включение замеров производительности при первом начале игры в этом окне
+        if SETTINGS["profile"] and self.profiler is None:
+            self.start_profiler()
+        self.practice = SETTINGS["practice"]
+
         # Создание фрейма для отображения информации о количестве флажков и времени
         self.info_frame = tk.Frame(self.master, bg=BG_COLOR, height=CELL_SIZE)
-        self.info_frame.grid(row=0, column=0, columnspan=GRID_WIDTH, sticky="nsew")
+        self.info_frame.grid(row=0, column=0, columnspan=2, sticky="nsew")
 
         # Создание метки для отображения количества установленных флажков
-        self.flag_counter_label = tk.Label(self.info_frame, text=f"Флажков: 0/{MINES_COUNT}", bg=BG_COLOR,
+        self.flag_counter_label = tk.Label(self.info_frame, text=f"Флажков: 0/{self.board.mines_count}", bg=BG_COLOR,
                                            fg=NUMBER_COLORS, font=("Arial", int(CELL_SIZE / 2.5), "bold"))
         self.flag_counter_label.pack(side="left", padx=(10, 0))
 
@@ -274,296 +479,635 @@ class Minesweeper:
                                      command=self.show_main_menu)
         self.menu_button.pack(side="left", expand=True, padx=10)
 
+        # Создание кнопки "Подсказка"
+        self.hint_button = tk.Button(self.info_frame, text="Подсказка", bg=UNCLICKED_COLOR, fg=NUMBER_COLORS,
+                                     font=("Arial", int(CELL_SIZE / 2.5), "bold"), relief="flat",
+                                     command=self.request_hint)
+        self.hint_button.pack(side="left", expand=True, padx=10)
+
+        # Кнопки отмены и повтора хода в режиме тренировки (также Ctrl+Z и Ctrl+Y)
+        if self.practice:
+            self.undo_button = tk.Button(self.info_frame, text="Отменить", bg=UNCLICKED_COLOR, fg=NUMBER_COLORS,
+                                         font=("Arial", int(CELL_SIZE / 2.5), "bold"), relief="flat",
+                                         command=self.undo_move)
+            self.undo_button.pack(side="left", expand=True, padx=10)
+            self.redo_button = tk.Button(self.info_frame, text="Вернуть", bg=UNCLICKED_COLOR, fg=NUMBER_COLORS,
+                                         font=("Arial", int(CELL_SIZE / 2.5), "bold"), relief="flat",
+                                         command=self.redo_move)
+            self.redo_button.pack(side="left", expand=True, padx=10)
+            self.master.bind("<Control-z>", self.undo_move)
+            self.master.bind("<Control-y>", self.redo_move)
+            if not self.board.first_click:
+                self.history = History(self.board)  # Продолженная игра: отмена ходов начиная с этой позиции
+            self.update_history_buttons()
+
         # Создание метки для отображения прошедшего времени
         self.time_elapsed_label = tk.Label(self.info_frame, text="Время: 0с", bg=BG_COLOR, fg=NUMBER_COLORS,
                                            font=("Arial", int(CELL_SIZE / 2.5), "bold"))
         self.time_elapsed_label.pack(side="right", padx=(0, 10))
 
-        # Создание кнопок-клеток игрового поля
-        for row in range(1, GRID_HEIGHT + 1):  # Размещение кнопок начиная со второй строки
-            for col in range(GRID_WIDTH):
-                button = tk.Canvas(self.master, width=CELL_SIZE, height=CELL_SIZE, bg=UNCLICKED_COLOR,
-                                   highlightthickness=0)
-                button.grid(row=row, column=col, sticky="nsew")
-                # Привязка событий к кнопкам
-                button.bind("<Button-1>", lambda e, r=row, c=col: self.cell_click(r - 1, c, e))
-                button.bind("<ButtonRelease-1>", lambda e, r=row, c=col: self.hide_temporary_blanks(r - 1, c, e))
-                button.bind("<Button-3>", lambda e, r=row, c=col: self.place_flag(r - 1, c))
-                button.bind("<Enter>", lambda e, r=row, c=col: self.on_hover(e, r - 1, c))
-                button.bind("<Leave>", lambda e, r=row, c=col: self.on_leave(e, r - 1, c))
-                self.buttons[row - 1][col] = button
+        # Создание метки для отображения результата подсказки
+        self.hint_label = tk.Label(self.info_frame, text="", bg=BG_COLOR, fg=NUMBER_COLORS,
+                                   font=("Arial", int(CELL_SIZE / 3.5)))
+        self.hint_label.pack(side="right", padx=(0, 10))
+
+        # Создание холста игрового поля; если поле не помещается на экране, холст прокручивается
+        board_width, board_height = self.board.width * self.cell_size, self.board.height * self.cell_size
+        viewport_width = min(board_width, self.master.winfo_screenwidth() - 100)
+        viewport_height = min(board_height, self.master.winfo_screenheight() - 200)
+        self.canvas = tk.Canvas(self.master, width=viewport_width, height=viewport_height, bg=UNCLICKED_COLOR,
+                                highlightthickness=0)
+        self.canvas.grid(row=1, column=0, sticky="nsew")
+        self.scrollbars = None
+        if viewport_width < board_width or viewport_height < board_height:
+            self.show_scrollbars()
+        # Прокрутка колесом мыши (Shift - по горизонтали) и масштабирование с зажатым Ctrl
+        self.canvas.bind("<MouseWheel>", lambda e: self.on_wheel(e, "y", -e.delta))
+        self.canvas.bind("<Shift-MouseWheel>", lambda e: self.on_wheel(e, "x", -e.delta))
+        self.canvas.bind("<Control-MouseWheel>", lambda e: self.zoom(e, e.delta > 0))
+        self.canvas.bind("<Button-4>", lambda e: self.on_wheel(e, "y", -1))
+        self.canvas.bind("<Button-5>", lambda e: self.on_wheel(e, "y", 1))
+        self.canvas.bind("<Shift-Button-4>", lambda e: self.on_wheel(e, "x", -1))
+        self.canvas.bind("<Shift-Button-5>", lambda e: self.on_wheel(e, "x", 1))
+        self.canvas.bind("<Control-Button-4>", lambda e: self.zoom(e, True))
+        self.canvas.bind("<Control-Button-5>", lambda e: self.zoom(e, False))
+        self.canvas.bind("<Configure>", lambda e: self.schedule_viewport_update())
+        self.draw_board()
+
+    def show_scrollbars(self):
+        # Полосы прокрутки и возможность изменять размер окна, когда поле не помещается на холсте
+        # (большое поле или увеличенный масштаб); создаются один раз для холста
+        if self.scrollbars is not None:
+            return
+        x_scrollbar = tk.Scrollbar(self.master, orient="horizontal", command=self.canvas.xview)
+        x_scrollbar.grid(row=2, column=0, sticky="ew")
+        y_scrollbar = tk.Scrollbar(self.master, orient="vertical", command=self.canvas.yview)
+        y_scrollbar.grid(row=1, column=1, sticky="ns")
+        self.canvas.config(xscrollcommand=lambda *args: self.on_scroll(x_scrollbar, *args),
+                           yscrollcommand=lambda *args: self.on_scroll(y_scrollbar, *args))
+        self.master.rowconfigure(1, weight=1)
+        self.master.columnconfigure(0, weight=1)
+        self.master.resizable(True, True)
+        self.scrollbars = x_scrollbar, y_scrollbar
+
+    def draw_board(self):
+        # Очистка холста, привязка событий и рисование видимой части поля
+        self.canvas.delete("all")
+        self.cell_items.clear()
+        self.cell_overlays.clear()
+        self.flag_items.clear()
+        self.hover_cell = None
+        self.final_state = None
+        self.hint_cells.clear()
+        self.dirty_cells.clear()
+        self.canvas.config(scrollregion=(0, 0, self.board.width * self.cell_size, self.board.height * self.cell_size),
+                           xscrollincrement=self.cell_size, yscrollincrement=self.cell_size)
+        # События обрабатываются холстом и передаются ячейке по координатам курсора
+        self.canvas.bind("<Button-1>", self.on_canvas_click)
+        self.canvas.bind("<ButtonRelease-1>", self.on_canvas_release)
+        self.canvas.bind("<Button-3>", self.on_canvas_right_click)
+        self.canvas.bind("<Motion>", self.on_canvas_motion)
+        self.canvas.bind("<Leave>", self.on_canvas_leave)
+        self.update_viewport()
+
+    def on_scroll(self, scrollbar, first, last):
+        # Синхронизация полосы прокрутки с холстом и дорисовка ставших видимыми ячеек
+        scrollbar.set(first, last)
+        self.schedule_viewport_update()
+
+    def on_wheel(self, event, axis, delta):
+        # Прокрутка холста колесом мыши на несколько строк или столбцов
+        units = 3 if delta > 0 else -3
+        if axis == "y":
+            self.canvas.yview_scroll(units, "units")
+        else:
+            self.canvas.xview_scroll(units, "units")
+
+    def zoom(self, event, zoom_in):
+        # Изменение размера ячеек с сохранением точки поля под курсором
+        new_size = min(MAX_CELL_SIZE, self.cell_size + 4) if zoom_in else max(MIN_CELL_SIZE, self.cell_size - 4)
+        if new_size == self.cell_size:
+            return
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        scale = new_size / self.cell_size
+        self.cell_size = new_size
+        # Все ячейки перерисовываются в новом размере
+        self.canvas.delete("all")
+        self.cell_items.clear()
+        self.cell_overlays.clear()
+        self.flag_items.clear()
+        board_width, board_height = self.board.width * new_size, self.board.height * new_size
+        self.canvas.config(scrollregion=(0, 0, board_width, board_height), xscrollincrement=new_size,
+                           yscrollincrement=new_size)
+        # Увеличенное поле может перестать помещаться на холсте: без полос прокрутки часть поля была бы недоступна
+        if board_width > self.canvas.winfo_width() or board_height > self.canvas.winfo_height():
+            self.show_scrollbars()
+        self.canvas.xview_moveto((x * scale - event.x) / board_width)
+        self.canvas.yview_moveto((y * scale - event.y) / board_height)
+        self.update_viewport()
+        self.schedule_viewport_update()  # Полосы прокрутки могли изменить размер холста
+
+    def schedule_viewport_update(self):
+        # Объединение нескольких событий прокрутки в одно обновление видимой области
+        if not self.viewport_pending:
+            self.viewport_pending = True
+            self.master.after_idle(self.update_viewport)
+
+    def visible_range(self):
+        # Диапазоны строк и столбцов, видимых на холсте
+        left, top = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        right = left + self.canvas.winfo_width()
+        bottom = top + self.canvas.winfo_height()
+        size = self.cell_size
+        rows = range(max(0, int(top // size)), min(self.board.height, int(bottom // size) + 1))
+        cols = range(max(0, int(left // size)), min(self.board.width, int(right // size) + 1))
+        return rows, cols
+
+    def update_viewport(self):
+        # Рисование видимых ячеек, которых еще нет на холсте, и вытеснение давно не видимых
+        self.viewport_pending = False
+        rows, cols = self.visible_range()
+        width = self.board.width
+        for row in rows:
+            for col in cols:
+                index = row * width + col
+                if index in self.cell_items:
+                    self.cell_items.move_to_end(index)
+                else:
+                    self.paint_cell(index)
+        limit = max(DRAWN_CELLS_LIMIT, 2 * len(rows) * len(cols))
+        while len(self.cell_items) > limit:
+            # Первыми в словаре находятся ячейки, которые дольше всего не попадали в видимую область
+            self.drop_cell(next(iter(self.cell_items)))
+
+    def cell_color(self, index):
+        # Цвет ячейки, соответствующий ее текущему состоянию
+        row, col = divmod(index, self.board.width)
+        if self.board.is_revealed(row, col):
+            return IMPOSSIBLE_COLOR if self.board.is_impossible(row, col) else CLICKED_COLOR
+        if self.board.is_flagged(row, col) or (self.final_state == "win" and self.board.is_mine(row, col)):
+            return FLAGGED_COLOR
+        if index in self.temp_blanks:
+            return TEMP_BLANK_COLOR
+        return self.hint_cells.get(index, UNCLICKED_COLOR)
+
+    def paint_cell(self, index):
+        # Рисование ячейки по ее текущему состоянию (используется при появлении ячейки в видимой области)
+        row, col = divmod(index, self.board.width)
+        size = self.cell_size
+        self.cell_items[index] = self.canvas.create_rectangle(col * size, row * size, (col + 1) * size,
+                                                              (row + 1) * size, fill=self.cell_color(index), width=0)
+        if self.board.is_revealed(row, col):
+            mines_count = self.board.adjacent_mines(row, col)
+            if mines_count:
+                self.draw_number(index, mines_count)
+        elif self.board.is_flagged(row, col) or (self.final_state == "win" and self.board.is_mine(row, col)):
+            self.draw_flag(row, col)
+        elif (self.final_state == "loss" or index in self.exploded()) and self.board.is_mine(row, col):
+            self.draw_mine(row, col)
+
+    def drop_cell(self, index):
+        # Удаление всех элементов ячейки с холста
+        self.canvas.delete(self.cell_items.pop(index), *self.cell_overlays.pop(index, ()),
+                           *self.flag_items.pop(index, ()))
+
+    def cell_at(self, event):
+        # Определение ячейки по координатам курсора; None, если курсор вне поля
+        row = int(self.canvas.canvasy(event.y) // self.cell_size)
+        col = int(self.canvas.canvasx(event.x) // self.cell_size)
+        if 0 <= row < self.board.height and 0 <= col < self.board.width:
+            return row, col
+        return None
+
+    def on_canvas_click(self, event):
+        # Нажатие левой кнопкой мыши на ячейку
+        cell = self.cell_at(event)
+        if cell is not None:
+            self.cell_click(*cell, event)
+
+    def on_canvas_release(self, event):
+        # Отпускание левой кнопки мыши (курсор может оказаться за пределами поля)
+        row, col = self.cell_at(event) or (None, None)
+        self.hide_temporary_blanks(row, col, event)
+
+    def on_canvas_right_click(self, event):
+        # Нажатие правой кнопкой мыши на ячейку
+        cell = self.cell_at(event)
+        if cell is not None:
+            self.place_flag(*cell)
+
+    def on_canvas_motion(self, event):
+        # Смена подсветки только при переходе курсора на другую ячейку
+        cell = self.cell_at(event)
+        if cell != self.hover_cell:
+            if self.hover_cell is not None:
+                self.on_leave(event, *self.hover_cell)
+            self.hover_cell = cell
+            if cell is not None:
+                self.on_hover(event, *cell)
+
+    def on_canvas_leave(self, event):
+        # Уход курсора за пределы холста
+        if self.hover_cell is not None:
+            self.on_leave(event, *self.hover_cell)
+            self.hover_cell = None
+
+    def set_cell_color(self, row, col, color):
+        # Изменение цвета ячейки на холсте, если она нарисована
+        item = self.cell_items.get(row * self.board.width + col)
+        if item is not None:
+            self.canvas.itemconfig(item, fill=color)
 
     def restart_game(self):
-        # Отмена всех запланированных задач
-        for task_id in self.scheduled_tasks:
-            self.master.after_cancel(task_id)
-        self.scheduled_tasks.clear()  # Очистка списка идентификаторов задач
-
-        # Очистка текущего состояния игры
-        for row in self.buttons:
-            for button in row:
-                button.destroy()
-        self.buttons.clear()
-        self.mines.clear()
-        self.revealed.clear()
-        self.flags.clear()
+        # Отмена всех анимаций и запланированных действий
+        self.animator.cancel_all()
+
+        # Очистка текущего состояния игры и начало новой игры с теми же настройками
+        self.board = self.new_board(self.board.width, self.board.height, self.board.mines_count)
+        self.recorder = None
+        self.history = None
+        self.explosions.clear()
         self.temp_blanks.clear()
-        self.first_click = True
         self.game_active = False
-        # Начало новой игры с теми же настройками
-        self.start_game(GRID_WIDTH, GRID_HEIGHT, MINES_COUNT)
-
+        self.flag_counter_label.config(text=f"Флажков: 0/{self.board.mines_count}")
+        self.time_elapsed_label.config(text="Время: 0с")
+        self.clear_hint()
+        self.draw_board()
+        if self.practice:
+            self.update_history_buttons()
 
     def place_flag(self, row, col, event=None):
-        # Если это первый клик или клетка уже открыта, прервать выполнение функции
-        if self.first_click or (row, col) in self.revealed:
+        # Установка или снятие флажка; если это первый клик или клетка уже открыта, прервать выполнение функции
+        # После попадания на мину в режиме тренировки доступны только отмена и повтор хода
+        if self.board.first_click or self.board.is_revealed(row, col) or self.board.lost:
             return
-        button = self.buttons[row][col]
-        if (row, col) in self.flags:  # Если флажок уже установлен, удалить его
-            self.flags.remove((row, col))
-            button.delete("flag")  # Удалить изображение флага с кнопки
-            button.config(bg=UNCLICKED_COLOR)  # Вернуть цвет клетки по умолчанию
-            self.on_hover(None, row, col)  # Показать подсказку при наведении на кнопку
-        else:
-            self.flags.add((row, col))  # Добавить координаты клетки в множество установленных флажков
-            button.config(bg="#666666")  # Изменить цвет клетки на серый для обозначения флага
-            self.draw_flag(button)  # Нарисовать изображение флага на кнопке
-            self.on_hover(None, row, col)  # Показать подсказку при наведении на кнопку
-
-        self.update_flag_counter()  # Обновить счетчик флажков
-        self.update_adjacent_cells_status(row, col)  # Обновить статус смежных клеток
+        self.clear_hint()  # Позиция изменилась, подсказка устарела
+        # Флажок, цвет ячейки и отметки невозможности у соседей перерисовываются общей перерисовкой
+        self.apply_actions([(ACTION_FLAG, row, col)])
 
     def cell_click(self, row, col, event):
-        if self.first_click:  # Если это первый клик
-            # Установить флаг первого клика как False и начать отсчет времени
-            self.first_click = False
+        if self.board.lost:
+            return  # Режим тренировки после попадания на мину: ход нужно отменить
+        self.clear_hint()  # Любой ход делает подсказку устаревшей
+        if self.board.first_click:  # Если это первый клик
+            # В режиме без угадывания поле выбирается из проверенных решателем
+            if SETTINGS["no_guess"] and self.board.size <= NO_GUESS_LIMIT:
+                self.choose_no_guess_board(row, col)
+            # Начать отсчет времени и запись ходов (зерно поля к этому моменту окончательно выбрано)
             self.start_time = time.time()
+            # Тренировочные игры не записываются: они не попадают в рекорды
+            self.recorder = None if self.practice else replay.Recorder(self.board, self.start_time)
             self.game_active = True
             self.update_time_elapsed()  # Обновить отображение времени на экране
             # Разместить мины после первого клика и открыть клетку, на которой был сделан первый клик
-            self.place_mines(row, col)
-            self.reveal_cell(row, col)
-        elif (row, col) not in self.flags and (row, col) not in self.revealed:
-            if (row, col) in self.mines:  # Если на клетке есть мина
-                self.game_over(False)  # Игра заканчивается поражением
-            else:
-                self.reveal_cell(row, col)  # Открыть клетку
-                if self.check_win():  # Проверить, выиграна ли игра
-                    self.game_over(True)  # Если да, завершить игру с победой
-        elif (row, col) in self.revealed:
+            self.apply_actions([(ACTION_REVEAL, row, col)])
+            # История позиций начинается после первого клика (расстановка мин не отменяется)
+            if self.practice:
+                self.history = History(self.board)
+                self.update_history_buttons()
+        elif not self.board.is_flagged(row, col) and not self.board.is_revealed(row, col):
+            self.apply_actions([(ACTION_REVEAL, row, col)])  # Открыть клетку (при мине - поражение)
+        elif self.board.is_revealed(row, col):
             self.chord_or_show_temp_blanks(row, col)  # Открыть соседние клетки или показать временные пустоты
 
-    def reveal_cell(self, row, col):
-        # Инициализация очереди для BFS (поиск в ширину)
-        queue = [(row, col)]
-        while queue:
-            current_row, current_col = queue.pop(0)
-            # Если клетка уже открыта или на ней установлен флаг, пропустить ее
-            if (current_row, current_col) in self.revealed or (current_row, current_col) in self.flags:
+    def apply_actions(self, actions):
+        # Применение пакета действий (тип, row, col) к полю за один проход: открытые ячейки анимируются,
+        # остальные изменившиеся ячейки перерисовываются один раз в общей перерисовке, затем проверяется конец игры
+        for action, row, col in actions:
+            self.record_action(action, row, col)
+        was_lost = self.board.lost
+        opened, changed = self.board.apply(actions)
+        if self.history is not None:
+            self.history.commit()
+            self.update_history_buttons()
+        self.show_revealed(opened)
+        width = self.board.width
+        self.mark_dirty(changed.difference(row * width + col for row, col, _ in opened))
+        if any(action == ACTION_FLAG for action, _, _ in actions):
+            self.update_flag_counter()
+        if self.board.lost and self.history is not None:
+            # Мина показывается только при попадании этим пакетом действий
+            if not was_lost:
+                self.show_practice_loss(actions)
+        elif self.board.lost:
+            self.game_over(False)
+        elif self.board.check_win():
+            self.game_over(True)
+
+    def mark_dirty(self, indexes):
+        # Отметка ячеек для перерисовки; перерисовка выполняется один раз, когда цикл событий освободится
+        self.dirty_cells.update(indexes)
+        if self.dirty_cells and not self.redraw_pending:
+            self.redraw_pending = True
+            self.master.after_idle(self.redraw)
+
+    def redraw(self):
+        # Перерисовка всех отмеченных ячеек по их текущему состоянию (цвет и флажок)
+        self.redraw_pending = False
+        cells, self.dirty_cells = self.dirty_cells, set()
+        if self.final_state is not None:
+            return  # Итоговое поле рисуется отдельно
+        width = self.board.width
+        for index in cells:
+            item = self.cell_items.get(index)
+            if item is None:
+                continue  # Невидимые ячейки будут нарисованы по состоянию при прокрутке к ним
+            self.canvas.itemconfig(item, fill=self.cell_color(index))
+            flagged = self.board.cells[index] & FLAG
+            if flagged and index not in self.flag_items:
+                self.draw_flag(*divmod(index, width))
+            elif not flagged and index in self.flag_items:
+                self.canvas.delete(*self.flag_items.pop(index))
+        # Подсветка ячейки под курсором сохраняется
+        if self.hover_cell is not None and self.hover_cell[0] * width + self.hover_cell[1] in cells:
+            self.on_hover(None, *self.hover_cell)
+
+    def show_practice_loss(self, actions):
+        # В режиме тренировки попадание на мину не заканчивает игру: мина показывается до отмены хода
+        board = self.board
+        exploded = set()
+        for action, row, col in actions:
+            index = row * board.width + col
+            if action == ACTION_REVEAL:
+                exploded.add(index)
+            elif action == ACTION_CHORD:
+                exploded.update(board.neighbor_indices(index))
+        exploded = {index for index in exploded if board.cells[index] & (MINE | REVEALED | FLAG) == MINE}
+        self.explosions[self.history.current] = exploded
+        self.repaint_cells(exploded)
+        self.hint_label.config(text="Мина! Отмените ход (Ctrl+Z)")
+
+    def exploded(self):
+        # Мины, на которые попал игрок в текущей позиции режима тренировки
+        if self.history is None:
+            return ()
+        return self.explosions.get(self.history.current, ())
+
+    def repaint_cells(self, indexes):
+        # Полная перерисовка нарисованных ячеек по их текущему состоянию (цвет, цифра, флажок, мина)
+        for index in indexes:
+            if index in self.cell_items:
+                self.drop_cell(index)
+                self.paint_cell(index)
+
+    def undo_move(self, event=None):
+        # Отмена последнего хода (режим тренировки)
+        if self.history is not None and self.game_active:
+            self.show_history_move(self.history.undo)
+
+    def redo_move(self, event=None):
+        # Повтор отмененного хода (режим тренировки)
+        if self.history is not None and self.game_active:
+            self.show_history_move(self.history.redo)
+
+    def show_history_move(self, move):
+        # Переход по истории позиций: поле переводится в другую версию изменением только отличающихся ячеек,
+        # и перерисовываются только они (вместе с минами, показанными в старой и новой позициях)
+        exploded = set(self.exploded())
+        changed = move()
+        if changed is None:
+            return
+        self.clear_hint()
+        changed.update(exploded, self.exploded())
+        self.animator.cancel(changed)
+        self.repaint_cells(changed)
+        if self.hover_cell is not None and self.hover_cell[0] * self.board.width + self.hover_cell[1] in changed:
+            self.on_hover(None, *self.hover_cell)
+        self.update_flag_counter()
+        self.update_history_buttons()
+        if self.board.lost:
+            self.hint_label.config(text="Мина! Отмените ход (Ctrl+Z)")
+
+    def update_history_buttons(self):
+        # Кнопки отмены и повтора доступны, только если есть что отменять или повторять
+        can_undo = self.history is not None and self.history.can_undo()
+        can_redo = self.history is not None and self.history.can_redo()
+        self.undo_button.config(state="normal" if can_undo else "disabled")
+        self.redo_button.config(state="normal" if can_redo else "disabled")
+
+    def record_action(self, action, row, col):
+        # Добавление хода в запись текущей игры
+        if self.recorder is not None:
+            self.recorder.record(action, row, col, time.time())
+
+    def choose_no_guess_board(self, row, col):
+        # Выбор зерна поля, проходимого без угадывания от первого клика, из кэша на диске; генерация в окне
+        # не ждется: если кэш пуст, игра начинается с обычным полем, а кэш пополняется в фоне
+        mode = (self.board.width, self.board.height, self.board.mines_count)
+        seed = no_guess.take_seed(*mode, (row, col))
+        if seed is not None:
+            self.board.seed = seed
+        else:
+            self.hint_label.config(text="Поле без угадывания не готово, обычное поле")
+        # Пополнение кэша до нужного запаса, чтобы следующая игра с тем же первым кликом началась сразу
+        no_guess.refill_in_background(*mode, (row, col))
+
+    def request_hint(self):
+        # Запрос подсказки: копия поля без мин анализируется в фоновом потоке, окно при этом не блокируется
+        if not self.game_active or self.board.first_click:
+            self.hint_label.config(text="Сначала откройте ячейку")
+            return
+        self.clear_hint()
+        self.hint_token = object()
+        hint_engine().request(self.board.visible_copy(), self.hint_token)
+        self.hint_label.config(text="Анализ...")
+        self.master.after(HINT_POLL_MS, self.poll_hint, self.hint_token)
+
+    def poll_hint(self, token):
+        # Проверка готовности подсказки; результаты устаревших запросов пропускаются
+        if token is not self.hint_token:
+            return
+        engine = hint_engine()
+        result = engine.poll()
+        while result is not None and result[0] is not token:
+            result = engine.poll()
+        if result is None and not engine.thread.is_alive():
+            self.hint_label.config(text="Анализ недоступен")  # Поток анализа завершился, ждать нечего
+        elif result is None:
+            self.master.after(HINT_POLL_MS, self.poll_hint, token)
+        else:
+            self.show_hint(result[1])
+
+    def show_hint(self, hint):
+        # Подсветка заведомо безопасных ячеек, а если их нет - ячейки с наименьшей вероятностью мины
+        elapsed = f"{hint.elapsed * 1000:.0f} мс"
+        if hint.error is not None:
+            self.hint_label.config(text=f"Ошибка анализа: {hint.error}")
+            return
+        if hint.safe:
+            cells = {index: HINT_SAFE_COLOR for index in hint.safe}
+            text = f"Безопасных: {len(hint.safe)} ({elapsed})"
+        else:
+            # Ячейка вне границы выбирается, если вероятность мины в ней меньше, чем на границе
+            guess = hint.best_guess()
+            interior = hint.interior_probability
+            if interior is not None and (guess is None or interior < guess[1]):
+                index = next(index for index in range(self.board.size)
+                             if not self.board.is_revealed(*divmod(index, self.board.width))
+                             and not self.board.is_flagged(*divmod(index, self.board.width))
+                             and index not in hint.probabilities and index not in hint.mines)
+                guess = index, interior
+            if guess is None:
+                self.hint_label.config(text=f"Нет подсказки ({elapsed})")
+                return
+            cells = {guess[0]: HINT_GUESS_COLOR}
+            suffix = "" if hint.complete else ", неполный перебор"
+            text = f"Мина: {guess[1]:.0%} ({elapsed}{suffix})"
+        self.hint_cells = cells
+        self.mark_dirty(cells)
+        self.hint_label.config(text=text)
+
+    def clear_hint(self):
+        # Снятие подсветки подсказки и отмена ожидания результата
+        self.hint_token = None
+        cells, self.hint_cells = self.hint_cells, {}
+        self.mark_dirty(cells)
+        self.hint_label.config(text="")
+
+    def show_revealed(self, opened):
+        # Отображение вновь открытых ячеек
+        for current_row, current_col, mines_count in opened:
+            index = current_row * self.board.width + current_col
+            # Ячейки вне видимой области будут нарисованы в открытом виде при прокрутке к ним
+            if index not in self.cell_items:
                 continue
-            # Добавить клетку в множество открытых клеток
-            self.revealed.add((current_row, current_col))
-            button = self.buttons[current_row][current_col]
 
-            # Анимация изменения цвета клетки от UNCLICKED_COLOR к CLICKED_COLOR
+            # Анимация изменения цвета клетки от UNCLICKED_COLOR к CLICKED_COLOR в общем цикле кадров
             steps = 10
-            for i in range(steps + 1):
-                factor = i / steps
-                color = self.interpolate_color(UNCLICKED_COLOR, CLICKED_COLOR, factor)  # Интерполяция цвета
-                # Запланировать задачу изменения цвета клетки через некоторое время
-                task_id = self.master.after(int(i * 50), lambda b=button, c=color: b.config(bg=c))
-                self.scheduled_tasks.append(task_id)
-
-            # Подсчет количества мин в соседних клетках
-            mines_count = self.adjacent_mines(current_row, current_col)
-            if mines_count == 0:
-                # Если рядом с клеткой нет мин, добавить соседние клетки в очередь для дальнейшего открытия
-                for r in range(max(0, current_row - 1), min(GRID_HEIGHT, current_row + 2)):
-                    for c in range(max(0, current_col - 1), min(GRID_WIDTH, current_col + 2)):
-                        if (r, c) not in self.revealed and (r, c) not in self.flags:
-                            queue.append((r, c))
-            else:
+            self.animator.fade(index, UNCLICKED_COLOR, CLICKED_COLOR, steps, 50)
+
+            if mines_count != 0:
                 # Если рядом с клеткой есть мины, отобразить количество мин на клетке
-                self.master.after(steps * 10,
-                                  lambda b=button, mc=mines_count: b.create_text(CELL_SIZE // 2, CELL_SIZE // 2,
-                                                                                 text=str(mc), fill=NUMBER_COLORS,
-                                                                                 font=("Arial", int(CELL_SIZE / 2.7),
-                                                                                       "bold")))
+                self.animator.schedule(steps * 10, self.draw_number, index, mines_count)
+
+    def apply_cell_color(self, index, color):
+        # Применение цвета к ячейке по ее индексу (вызывается циклом анимации)
+        item = self.cell_items.get(index)
+        if item is not None:
+            self.canvas.itemconfig(item, fill=color)
+
+    def draw_number(self, index, mines_count):
+        # Отображение количества мин вокруг ячейки в ее центре (если ячейка нарисована, цифры на ней еще нет
+        # и ячейка все еще открыта - в режиме тренировки ход могли отменить до окончания анимации)
+        if index not in self.cell_items or index in self.cell_overlays or not self.board.cells[index] & REVEALED:
+            return
+        row, col = divmod(index, self.board.width)
+        size = self.cell_size
+        item = self.canvas.create_text(col * size + size // 2, row * size + size // 2,
+                                       text=str(mines_count), fill=NUMBER_COLORS, font=self.sprites.font(size))
+        self.cell_overlays[index] = [item]
 
     def update_flag_counter(self, flags=None):
         # Если количество флажков не указано, оно равно текущему количеству установленных флажков
         if flags is None:
-            flags = len(self.flags)
+            flags = self.board.flags_count
         # Обновление текста метки счетчика флажков
-        self.flag_counter_label.config(text=f"Flagged: {flags}/{MINES_COUNT}")
-
-    def draw_flag(self, button):
-        # Цвет флага
-        flag_color = BG_COLOR
-        # Общая ширина флага и его высота
-        total_flag_width = CELL_SIZE / 3
-        flag_height = CELL_SIZE / 3
-        # Толщина линий
-        line_thickness = flag_height / 5
-        # Размеры квадрата и прямоугольника на флаге
-        square_side = flag_height / 2
-        rectangle_height = square_side
-        rectangle_length = square_side * 0.8
-        rectangle_y_offset = square_side * 0.3
-
-        # Координаты начала рисования каждой части флага
-        flag_x_start = (CELL_SIZE - total_flag_width) / 2
-        line_y_start = (CELL_SIZE - flag_height) / 2
-        square_x_start = flag_x_start + line_thickness
-        rectangle_x_start = square_x_start + square_side
-        rectangle_y_start = line_y_start + rectangle_y_offset
-
-        # Рисование вертикальной линии
-        button.create_rectangle(flag_x_start, line_y_start, flag_x_start + line_thickness, line_y_start + flag_height,
-                                tags="flag", fill=flag_color, outline=flag_color)
-        # Рисование квадрата
-        button.create_rectangle(square_x_start, line_y_start, square_x_start + square_side, line_y_start + square_side,
-                                tags="flag", fill=flag_color, outline=flag_color)
-        # Рисование прямоугольника
-        button.create_rectangle(rectangle_x_start, rectangle_y_start, rectangle_x_start + rectangle_length,
-                                rectangle_y_start + rectangle_height, tags="flag", fill=flag_color, outline=flag_color)
-
-    def update_adjacent_cells_status(self, row, col):
-        # Обновление статуса соседних ячеек вокруг ячейки с координатами (row, col)
-        for r in range(max(0, row - 1), min(GRID_HEIGHT, row + 2)):
-            for c in range(max(0, col - 1), min(GRID_WIDTH, col + 2)):
-                # Проверка, является ли соседняя ячейка ранее открытой
-                if (r, c) in self.revealed:
-                    # Получение количества мин вокруг соседней ячейки
-                    num = self.adjacent_mines(r, c)
-                    # Подсчет количества флажков вокруг соседней ячейки
-                    flags_around = sum(
-                        (rr, cc) in self.flags for rr in range(max(0, r - 1), min(GRID_HEIGHT, r + 2)) for cc in
-                        range(max(0, c - 1), min(GRID_WIDTH, c + 2)))
-                    # Если количество флажков вокруг превышает количество мин, окрасить ячейку в цвет невозможного
-                    if flags_around > num:
-                        self.buttons[r][c].config(bg=IMPOSSIBLE_COLOR)
-                    # Иначе окрасить ячейку в цвет открытой
-                    else:
-                        self.buttons[r][c].config(bg=CLICKED_COLOR)
-
-    def adjacent_mines(self, row, col):
-        # Возвращает количество мин, соседствующих с ячейкой по координатам (row, col)
-        return sum((r, c) in self.mines for r in range(max(0, row - 1), min(GRID_HEIGHT, row + 2)) for c in
-                   range(max(0, col - 1), min(GRID_WIDTH, col + 2)))
-
-    def fade_out_cell(self, button, steps, final_color, callback=None):
-        # Плавное затухание цвета ячейки кнопки
-        current_color = button.cget('bg')  # Текущий цвет кнопки
-        r1, g1, b1 = self.master.winfo_rgb(current_color)  # Конвертация текущего цвета в RGB
-        r2, g2, b2 = self.master.winfo_rgb(final_color)  # Конвертация конечного цвета в RGB
-
-        # Рассчитываем изменение компонент цвета для каждого шага анимации
-        delta_r = (r2 - r1) / steps
-        delta_g = (g2 - g1) / steps
-        delta_b = (b2 - b1) / steps
-
-        # Внутренняя функция для выполнения анимации затухания
-        def fade(step=0):
-            nonlocal r1, g1, b1  # Используем nonlocal, чтобы изменять значения переменных из внешней области видимости
-            if step < steps:
-                # Вычисляем новые значения компонент цвета
-                r1, g1, b1 = r1 + delta_r, g1 + delta_g, b1 + delta_b
-                # Формируем новый цвет на основе новых значений RGB
-                next_color = f'#{int(r1 / 256):02x}{int(g1 / 256):02x}{int(b1 / 256):02x}'
-                # Применяем новый цвет к кнопке
-                button.config(bg=next_color)
-                # Запускаем следующий шаг анимации через 25 миллисекунд
-                self.master.after(25, lambda: fade(step + 1))
-            else:
-                # Если достигнут последний шаг анимации, вызываем обратный вызов (если он был предоставлен)
-                if callback:
-                    callback()
-
-        # Запускаем анимацию затухания
-        fade()
-
-    def interpolate_color(self, start_color, end_color, factor):
-        # Интерполирует цвет между начальным и конечным цветами с заданным коэффициентом
-        start_r, start_g, start_b = self.master.winfo_rgb(start_color)  # Получаем компоненты RGB начального цвета
-        end_r, end_g, end_b = self.master.winfo_rgb(end_color)  # Получаем компоненты RGB конечного цвета
-
-        # Вычисляем новые значения компонент цвета на основе коэффициента интерполяции
-        r = int(start_r + (end_r - start_r) * factor)
-        g = int(start_g + (end_g - start_g) * factor)
-        b = int(start_b + (end_b - start_b) * factor)
+        self.flag_counter_label.config(text=f"Flagged: {flags}/{self.board.mines_count}")
 
-        # Формируем новый цвет в формате HEX
-        return f'#{r >> 8:02x}{g >> 8:02x}{b >> 8:02x}'
+    def draw_flag(self, row, col):
+        # Флаг рисуется только на ячейках, нарисованных на холсте (одно готовое изображение на ячейку)
+        index = row * self.board.width + col
+        if index not in self.cell_items:
+            return
+        size = self.cell_size
+        self.flag_items[index] = [self.canvas.create_image(col * size, row * size, anchor="nw",
+                                                           image=self.sprites.sprite("flag", size, BG_COLOR))]
 
     def game_over(self, win):
         # Устанавливает флаг окончания игры и блокирует кнопки на игровом поле
         self.game_active = False
 
-        # Удаляет все привязки к кнопкам для предотвращения дальнейших действий игрока
-        for row in range(GRID_HEIGHT):
-            for col in range(GRID_WIDTH):
-                self.buttons[row][col].unbind("<Button-1>")
-                self.buttons[row][col].unbind("<Button-3>")
-                self.buttons[row][col].unbind("<Enter>")
-                self.buttons[row][col].unbind("<Leave>")
-
-        # Если игра закончилась поражением
-        if not win:
-            # Отображает все мины и неверно установленные флаги
-            for r, c in self.mines:
-                if (r, c) not in self.flags:
-                    button = self.buttons[r][c]
-                    button.config(bg=UNCLICKED_COLOR)
-                    self.draw_mine(button)
-
-            # Показывает все ячейки, которые не были открыты
-            for row in range(GRID_HEIGHT):
-                for col in range(GRID_WIDTH):
-                    if (row, col) not in self.mines:
-                        self.reveal_cell(row, col)
-        # Если игра закончилась победой
-        else:
-            # Отображает все мины, если они не помечены флагами
-            for r, c in self.mines:
-                if (r, c) not in self.flags:
-                    button = self.buttons[r][c]
-                    button.config(bg="#666666")
-                    self.draw_flag(button)
+        # Удаляет привязки событий холста для предотвращения дальнейших действий игрока
+        for sequence in ("<Button-1>", "<Button-3>", "<Motion>", "<Leave>"):
+            self.canvas.unbind(sequence)
 
-            # Обновляет счетчик флагов до общего количества мин
-            self.update_flag_counter(MINES_COUNT)
+        # Запоминает итог игры, чтобы ячейки, появляющиеся при прокрутке, рисовались с минами (при поражении)
+        # или флажками на минах (при победе)
+        self.final_state = "win" if win else "loss"
+        self.show_final_board()
 
-        # Выводит сообщение о победе или поражении и, при победе, сохраняет рекорд
+        # При победе счетчик флагов показывает общее количество мин
         if win:
+            self.update_flag_counter(self.board.mines_count)
+
+        # Выводит сообщение о победе или поражении и, при победе, сохраняет рекорд (кроме режима тренировки)
+        if win and self.practice:
+            self.show_message(f"Поле пройдено (тренировка, рекорд не сохраняется)\n"
+                              f"Время: {self.format_time(time.time() - self.start_time)}")
+        elif win and self.recorder is None:
+            # Продолженная игра без записи ходов: рекорд нельзя было бы проверить повтором
+            self.show_message(f"Поле пройдено (игра продолжена без записи ходов, рекорд не сохраняется)\n"
+                              f"Время: {self.format_time(time.time() - self.start_time)}")
+        elif win:
             end_time = time.time()
             time_taken = end_time - self.start_time
+            # Место в таблице рекордов определяется по кэшу до записи рекорда: сам рекорд записывается в фоне,
+            # и сообщение не ждет диска
+            place = LEADERBOARD.place(self.board.width, self.board.height, self.board.mines_count, time_taken)
             self.store_win_record(time_taken)
-            messagebox.showinfo("Сапер", "Поздравляем! Ты выиграл!")
+            bbbv, openings, islands = self.board.difficulty()
+            message = (f"Поздравляем! Ты выиграл!\nВремя: {self.format_time(time_taken)}\n"
+                       f"3BV: {bbbv} (пустых областей: {openings}, "
+                       f"островов: {islands}), 3BV/с: {bbbv / time_taken:.2f}")
+            if place is not None:
+                message += f"\nМесто в рекордах: {place}"
+            self.show_message(message)
         else:
-            messagebox.showinfo("Сапер", "Сожалеем. Ты проиграл.")
+            self.show_message("Сожалеем. Ты проиграл.")
+
+    def show_final_board(self):
+        # Показ итогового поля: состояние вычисляется одним проходом по полю, а перерисовываются только видимые
+        # ячейки, пачками, чтобы окно с сообщением появилось сразу (остальные нарисуются при прокрутке)
+        self.animator.cancel_all()
+        rows, cols = self.visible_range()
+        width = self.board.width
+        visible = [row * width + col for row in rows for col in cols]
+        # Ячейки, которые откроются сейчас (без мин, флажков и не открытые ранее), для общей анимации
+        fading = {index for index in visible if not self.board.cells[index] & (MINE | REVEALED | FLAG)} if FINAL_FADE else set()
+        if self.final_state == "loss":
+            self.board.reveal_all()
+        # Нарисованные, но невидимые ячейки удаляются и будут нарисованы заново при прокрутке
+        visible_set = set(visible)
+        for index in [index for index in self.cell_items if index not in visible_set]:
+            self.drop_cell(index)
+        self.repaint_final(visible, fading, 0)
+
+    def repaint_final(self, cells, fading, start):
+        # Перерисовка одной пачки ячеек итогового поля; следующая пачка - в следующем вызове цикла событий
+        for index in cells[start:start + FINAL_BATCH]:
+            if index in self.cell_items:
+                self.drop_cell(index)
+            self.paint_cell(index)
+            if index in fading and self.cell_color(index) == CLICKED_COLOR:
+                self.canvas.itemconfig(self.cell_items[index], fill=UNCLICKED_COLOR, tags=(FINAL_TAG,))
+        if start + FINAL_BATCH < len(cells):
+            self.master.after(1, self.repaint_final, cells, fading, start + FINAL_BATCH)
+        elif fading:
+            # Одна анимация для всех открытых в конце игры ячеек: цвет меняется у всех элементов с тегом
+            self.animator.fade(FINAL_TAG, UNCLICKED_COLOR, CLICKED_COLOR, 10, 50,
+                               apply=lambda tag, color: self.canvas.itemconfig(tag, fill=color))
 
     def on_hover(self, event, row, col):
         # Проверка, является ли ячейка непоказанной
-        if (row, col) not in self.revealed:
+        if not self.board.is_revealed(row, col):
             # Проверка, установлен ли флажок в ячейке
-            if (row, col) in self.flags:
+            if self.board.is_flagged(row, col):
                 # Изменение цвета кнопки на серый
-                self.buttons[row][col].config(bg="#7e7e7e")
+                self.set_cell_color(row, col, "#7e7e7e")
             else:
                 # Изменение цвета кнопки при наведении на оранжевый
-                self.buttons[row][col].config(bg="#e89b53")
+                self.set_cell_color(row, col, "#e89b53")
 
     def on_leave(self, event, row, col):
         # Проверка, является ли ячейка непоказанной
-        if (row, col) not in self.revealed:
+        if not self.board.is_revealed(row, col):
             # Проверка, установлен ли флажок в ячейке
-            if (row, col) in self.flags:
+            if self.board.is_flagged(row, col):
                 # Изменение цвета кнопки на серый при уходе курсора
-                self.buttons[row][col].config(bg="#666666")
+                self.set_cell_color(row, col, FLAGGED_COLOR)
             else:
-                # Изменение цвета кнопки на изначальный цвет при уходе курсора
-                self.buttons[row][col].config(bg=UNCLICKED_COLOR)
+                # Изменение цвета кнопки на изначальный цвет (или цвет подсказки) при уходе курсора
+                self.set_cell_color(row, col, self.hint_cells.get(row * self.board.width + col, UNCLICKED_COLOR))
 
     def update_time_elapsed(self):
         # Проверка, активна ли игра
@@ -579,122 +1123,245 @@ class Minesweeper:
 
     def chord_or_show_temp_blanks(self, row, col):
         # Определение числа мин вокруг ячейки
-        num = self.adjacent_mines(row, col)
+        num = self.board.adjacent_mines(row, col)
 
         # Определение числа флажков вокруг ячейки
-        flags_around = sum(
-            (r, c) in self.flags
-            for r in range(max(0, row - 1), min(GRID_HEIGHT, row + 2))
-            for c in range(max(0, col - 1), min(GRID_WIDTH, col + 2))
-        )
+        flags_around = self.board.flags_around(row, col)
 
         # Если число мин вокруг ячейки равно числу флажков вокруг неё
         if num == flags_around:
-            # Открытие всех нефлажкованных ячеек вокруг текущей ячейки
-            for r in range(max(0, row - 1), min(GRID_HEIGHT, row + 2)):
-                for c in range(max(0, col - 1), min(GRID_WIDTH, col + 2)):
-                    if (r, c) not in self.flags:
-                        # Если обнаружена мина, игра заканчивается
-                        if (r, c) in self.mines:
-                            self.game_over(False)
-                            return
-                        self.reveal_cell(r, c)
-
-            # Проверка на победу после открытия ячеек
-            if self.check_win():
-                self.game_over(True)
-
-        # Если число флажков превышает число мин вокруг ячейки
+            # Открытие всех нефлажкованных ячеек вокруг текущей ячейки одним действием с общей перерисовкой
+            # (при мине - поражение, после открытия - проверка на победу)
+            self.apply_actions([(ACTION_CHORD, row, col)])
+
+        # Если число флажков превышает число мин вокруг ячейки, ячейка перерисовывается цветом невозможного
         elif flags_around > num:
-            self.buttons[row][col].config(bg=IMPOSSIBLE_COLOR)
+            self.mark_dirty([row * self.board.width + col])
 
         # В противном случае показ временных пустых ячеек вокруг ячейки
         else:
             self.show_temporary_blanks(row, col)
 
     def show_temporary_blanks(self, row, col):
-        # Перебор всех соседних ячеек вокруг указанной ячейки
-        for r in range(max(0, row - 1), min(GRID_HEIGHT, row + 2)):
-            for c in range(max(0, col - 1), min(GRID_WIDTH, col + 2)):
-                # Если ячейка не была открыта и не помечена флажком
-                if (r, c) not in self.revealed and (r, c) not in self.flags:
-                    # Изменение цвета кнопки этой ячейки на цвет временных пустых ячеек
-                    self.buttons[r][c].config(bg=TEMP_BLANK_COLOR)
-                    # Добавление ячейки во временные пустые ячейки
-                    self.temp_blanks.add((r, c))
+        # Соседние ячейки, которые не открыты и не помечены флажком, показываются цветом временных пустых ячеек
+        index = row * self.board.width + col
+        self.temp_blanks.update(neighbor for neighbor in self.board.neighbor_indices(index)
+                                if not self.board.cells[neighbor] & (REVEALED | FLAG))
+        self.mark_dirty(self.temp_blanks)
 
     def hide_temporary_blanks(self, row, col, event):
-        # Перебор всех временных пустых ячеек
-        for r, c in self.temp_blanks:
-            # Восстановление исходного цвета кнопки этой ячейки
-            self.buttons[r][c].config(bg=UNCLICKED_COLOR)
-        # Очистка множества временных пустых ячеек
+        # Временные пустые ячейки перерисовываются в свой обычный цвет
+        self.mark_dirty(self.temp_blanks)
         self.temp_blanks.clear()
 
-    def place_mines(self, start_row, start_col):
-        # Определение безопасной зоны вокруг начального хода
-        safe_zone = {(start_row + i, start_col + j) for i in range(-1, 2) for j in range(-1, 2)}
-
-        # Добавление мин на поле, пока не будет достигнуто требуемое количество мин
-        while len(self.mines) < MINES_COUNT:
-            # Генерация случайной позиции для мины
-            r, c = random.randint(0, GRID_HEIGHT - 1), random.randint(0, GRID_WIDTH - 1)
-            # Проверка, что мина не попадает в безопасную зону и не повторяется
-            if (r, c) not in safe_zone and (r, c) not in self.mines:
-                # Добавление мины на поле
-                self.mines.add((r, c))
-
-    def check_win(self):
-        # Проверка, что количество открытых ячеек равно общему числу ячеек минус количество мин
-        if len(self.revealed) == GRID_WIDTH * GRID_HEIGHT - MINES_COUNT:
-            return True
-        return False
-
     def store_win_record(self, time_taken):
-        # Формирование строки режима и его кодирование в байты
-        mode = f"{GRID_WIDTH}x{GRID_HEIGHT} - {MINES_COUNT} Mines"
-        mode_encoded = mode.encode('utf-8')
-
-        # Упаковка рекорда в бинарный формат
-        record = struct.pack('I', len(mode_encoded)) + mode_encoded + struct.pack('f', time_taken)
-
-        # Запись рекорда в файл
-        with open("minesweeper.wins", "ab") as file:
-            file.write(record)
-
-    def draw_mine(self, button):
-        # Определение размеров внешнего и внутреннего кругов, а также размера ножки мины
-        outer_circle_radius = CELL_SIZE * 0.2
-        inner_circle_radius = CELL_SIZE * 0.07
-        leg_size = CELL_SIZE * 0.1
-
-        # Нарисовать внешний круг мины
-        button.create_oval(
-            CELL_SIZE / 2 - outer_circle_radius, CELL_SIZE / 2 - outer_circle_radius,
-            CELL_SIZE / 2 + outer_circle_radius, CELL_SIZE / 2 + outer_circle_radius,
-            fill=BG_COLOR, outline=BG_COLOR
-        )
-
-        # Нарисовать внутренний круг мины
-        button.create_oval(
-            CELL_SIZE / 2 - inner_circle_radius, CELL_SIZE / 2 - inner_circle_radius,
-            CELL_SIZE / 2 + inner_circle_radius, CELL_SIZE / 2 + inner_circle_radius,
-            fill=UNCLICKED_COLOR, outline=UNCLICKED_COLOR
-        )
-
-        # Нарисовать ножки мины
-        for angle in range(0, 360, 45):
-            radian = angle * (math.pi / 180)
-
-            x_center = CELL_SIZE / 2 + (outer_circle_radius + leg_size / 2) * math.cos(radian)
-            y_center = CELL_SIZE / 2 + (outer_circle_radius + leg_size / 2) * math.sin(radian)
-
-            x = x_center - leg_size / 2
-            y = y_center - leg_size / 2
-            button.create_rectangle(
-                x, y, x + leg_size, y + leg_size,
-                fill=BG_COLOR, outline=BG_COLOR
-            )
+        # Постановка рекорда в очередь фоновой записи (режим определяется размерами поля и количеством мин)
+        # Вместе со временем сохраняется сложность поля (вычисляется здесь, а не на первом клике), а запись ходов
+        # сохраняется с номером рекорда для последующей проверки, когда рекорд записан
+        recorder = self.recorder
+        on_stored = None if recorder is None else lambda record_number: replay.store(record_number, recorder)
+        win_writer().submit(self.board.width, self.board.height, self.board.mines_count, time_taken,
+                          self.board.difficulty(), on_stored)
+
+    def draw_mine(self, row, col):
+        # Мина рисуется только на ячейках, нарисованных на холсте (одно готовое изображение на ячейку)
+        index = row * self.board.width + col
+        if index not in self.cell_items:
+            return
+        size = self.cell_size
+        self.cell_overlays.setdefault(index, []).append(self.canvas.create_image(
+            col * size, row * size, anchor="nw", image=self.sprites.sprite("mine", size, BG_COLOR, UNCLICKED_COLOR)))
+
+
+class InfiniteView:
+    # Игра на бесконечном поле: холст показывает окно вокруг текущей позиции, ячейки рисуются по мере
+    # попадания в область просмотра, а фрагменты поля создаются при первом обращении к ним
+    def __init__(self, master):
+        self.master = master
+        self.board = InfiniteBoard()
+        self.cell_size = CELL_SIZE
+        self.game_active = True
+        self.sprites = SpriteAtlas(master)  # Изображения флажка и мины (общие с обычным полем)
+        self.cell_items = OrderedDict()  # (x, y) -> прямоугольник ячейки в порядке последнего попадания в вид
+        self.overlays = {}  # (x, y) -> элементы поверх ячейки (цифра, флажок или мина)
+        self.viewport_pending = False
+        self.flood_pending = False  # Флаг, показывающий, что продолжение прерванного лимитом обхода уже запланировано
+
+        # Панель информации: открытые ячейки, флажки, фрагменты в памяти и кнопка меню
+        font = ("Arial", int(CELL_SIZE / 2.5), "bold")
+        self.info_frame = tk.Frame(master, bg=BG_COLOR)
+        self.info_frame.grid(row=0, column=0, sticky="nsew")
+        self.score_label = tk.Label(self.info_frame, text="Открыто: 0", bg=BG_COLOR, fg=NUMBER_COLORS, font=font)
+        self.score_label.pack(side="left", padx=(10, 0))
+        self.flag_label = tk.Label(self.info_frame, text="Флажков: 0", bg=BG_COLOR, fg=NUMBER_COLORS, font=font)
+        self.flag_label.pack(side="left", padx=(10, 0))
+        menu_button = tk.Button(self.info_frame, text="Меню", bg=UNCLICKED_COLOR, fg=NUMBER_COLORS, font=font,
+                                relief="flat", command=self.show_main_menu)
+        menu_button.pack(side="left", expand=True, padx=10)
+        self.chunks_label = tk.Label(self.info_frame, text="", bg=BG_COLOR, fg=NUMBER_COLORS,
+                                     font=("Arial", int(CELL_SIZE / 3.5)))
+        self.chunks_label.pack(side="right", padx=(0, 10))
+
+        # Холст без ограничения прокрутки: координаты ячеек могут быть отрицательными
+        view_width, view_height = INFINITE_VIEW
+        self.canvas = tk.Canvas(master, width=view_width * CELL_SIZE, height=view_height * CELL_SIZE,
+                                bg=UNCLICKED_COLOR, highlightthickness=0, confine=False,
+                                xscrollincrement=CELL_SIZE, yscrollincrement=CELL_SIZE)
+        self.canvas.grid(row=1, column=0, sticky="nsew")
+        # Начальная ячейка (0, 0) в центре области просмотра
+        self.canvas.xview_scroll(-(view_width // 2), "units")
+        self.canvas.yview_scroll(-(view_height // 2), "units")
+
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<Button-3>", self.on_right_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self.scroll(0, -3 if e.delta > 0 else 3))
+        self.canvas.bind("<Shift-MouseWheel>", lambda e: self.scroll(-3 if e.delta > 0 else 3, 0))
+        self.canvas.bind("<Button-4>", lambda e: self.scroll(0, -3))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll(0, 3))
+        self.canvas.bind("<Shift-Button-4>", lambda e: self.scroll(-3, 0))
+        self.canvas.bind("<Shift-Button-5>", lambda e: self.scroll(3, 0))
+        self.canvas.bind("<Configure>", lambda e: self.schedule_viewport_update())
+        for key, dx, dy in (("<Left>", -1, 0), ("<Right>", 1, 0), ("<Up>", 0, -1), ("<Down>", 0, 1)):
+            master.bind(key, lambda e, dx=dx, dy=dy: self.scroll(dx * 3, dy * 3))
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Начальная ячейка всегда пуста, игра начинается с открытой области вокруг нее
+        self.update_viewport()
+        self.show_opened(self.board.reveal(0, 0))
+
+    def scroll(self, dx, dy):
+        # Прокрутка на заданное количество ячеек; новые фрагменты создаются при отрисовке
+        if dx:
+            self.canvas.xview_scroll(dx, "units")
+        if dy:
+            self.canvas.yview_scroll(dy, "units")
+        self.schedule_viewport_update()
+
+    def schedule_viewport_update(self):
+        # Объединение нескольких событий прокрутки в одно обновление видимой области
+        if not self.viewport_pending:
+            self.viewport_pending = True
+            self.master.after_idle(self.update_viewport)
+
+    def visible_cells(self):
+        # Координаты ячеек, видимых на холсте
+        size = self.cell_size
+        left, top = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        right = left + self.canvas.winfo_width()
+        bottom = top + self.canvas.winfo_height()
+        return [(x, y) for y in range(int(top // size), int(bottom // size) + 1)
+                for x in range(int(left // size), int(right // size) + 1)]
+
+    def update_viewport(self):
+        # Рисование видимых ячеек, которых еще нет на холсте, и удаление давно не видимых
+        self.viewport_pending = False
+        visible = self.visible_cells()
+        for cell in visible:
+            if cell in self.cell_items:
+                self.cell_items.move_to_end(cell)
+            else:
+                self.paint_cell(cell)
+        while len(self.cell_items) > max(DRAWN_CELLS_LIMIT, 2 * len(visible)):
+            self.drop_cell(next(iter(self.cell_items)))
+        self.update_labels()
+
+    def paint_cell(self, cell):
+        # Рисование ячейки по ее состоянию на поле
+        x, y = cell
+        size = self.cell_size
+        state = self.board.state(x, y)
+        revealed = state & REVEALED
+        color = CLICKED_COLOR if revealed else FLAGGED_COLOR if state & FLAG else UNCLICKED_COLOR
+        self.cell_items[cell] = self.canvas.create_rectangle(x * size, y * size, (x + 1) * size, (y + 1) * size,
+                                                             fill=color, width=0)
+        items = []
+        if revealed and self.board.adjacent_mines(x, y):
+            items.append(self.canvas.create_text(x * size + size / 2, y * size + size / 2,
+                                                 text=str(self.board.adjacent_mines(x, y)), fill=NUMBER_COLORS,
+                                                 font=self.sprites.font(size)))
+        elif state & FLAG:
+            items.append(self.canvas.create_image(x * size, y * size, anchor="nw",
+                                                  image=self.sprites.sprite("flag", size, BG_COLOR)))
+        elif not self.game_active and state & MINE:
+            items.append(self.canvas.create_image(x * size, y * size, anchor="nw",
+                                                  image=self.sprites.sprite("mine", size, BG_COLOR, UNCLICKED_COLOR)))
+        if items:
+            self.overlays[cell] = items
+
+    def drop_cell(self, cell):
+        # Удаление всех элементов ячейки с холста
+        self.canvas.delete(self.cell_items.pop(cell), *self.overlays.pop(cell, ()))
+
+    def repaint(self, cell):
+        # Перерисовка ячейки, если она нарисована
+        if cell in self.cell_items:
+            self.drop_cell(cell)
+            self.paint_cell(cell)
+
+    def cell_at(self, event):
+        # Координаты ячейки под курсором
+        return int(self.canvas.canvasx(event.x) // self.cell_size), int(self.canvas.canvasy(event.y) // self.cell_size)
+
+    def on_click(self, event):
+        # Открытие закрытой ячейки или аккорд на открытой цифре
+        if not self.game_active:
+            return
+        x, y = self.cell_at(event)
+        if self.board.state(x, y) & REVEALED:
+            opened = self.board.chord(x, y)
+        else:
+            opened = self.board.reveal(x, y)
+        self.show_opened(opened)
+        if self.board.lost:
+            self.game_over()
+
+    def on_right_click(self, event):
+        # Установка или снятие флажка
+        if not self.game_active:
+            return
+        cell = self.cell_at(event)
+        if self.board.toggle_flag(*cell) is not None:
+            self.repaint(cell)
+            self.update_labels()
+
+    def show_opened(self, opened):
+        # Перерисовка вновь открытых ячеек, видимых на холсте (остальные нарисуются при прокрутке)
+        for x, y, _ in opened:
+            self.repaint((x, y))
+        self.update_labels()
+        # Обход, прерванный лимитом FLOOD_LIMIT, продолжается порциями в обработчике простоя
+        if self.board.frontier and not self.flood_pending:
+            self.flood_pending = True
+            self.master.after_idle(self.continue_flood)
+
+    def continue_flood(self):
+        self.flood_pending = False
+        if self.game_active:
+            self.show_opened(self.board.expand())
+
+    def update_labels(self):
+        self.score_label.config(text=f"Открыто: {self.board.revealed_count}")
+        self.flag_label.config(text=f"Флажков: {self.board.flags_count}")
+        self.chunks_label.config(text=f"Фрагментов в памяти: {len(self.board.chunks)}")
+
+    def game_over(self):
+        # Поражение: показ мин в видимой области и итог игры
+        self.game_active = False
+        for cell in list(self.cell_items):
+            if self.board.state(*cell) & MINE:
+                self.repaint(cell)
+        messagebox.showinfo("Сапер", f"Игра окончена.\nОткрыто ячеек: {self.board.revealed_count}")
+
+    def show_main_menu(self):
+        # Удаление кэша поля и возврат в главное меню
+        self.board.close()
+        self.master.destroy()
+        main()
+
+    def on_close(self):
+        self.board.close()
+        flush_wins()  # Рекорды игр, сыгранных до перехода на бесконечное поле
+        self.master.destroy()
 
 
 def main():
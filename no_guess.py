@@ -0,0 +1,167 @@
+import os  # Импорт функций для работы с файлами
+import random  # Импорт модуля для генерации случайных чисел
+import sys  # Импорт доступа к аргументам командной строки
+import threading  # Импорт потока пополнения кэша и блокировки создания пула
+import time  # Импорт модуля для работы со временем
+from array import array  # Импорт компактных массивов чисел
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait  # Импорт пула процессов
+
+from records import locked  # Импорт рекомендательной блокировки файлов
+from solver import solve  # Импорт логического решателя
+
+CACHE_DIR = "board_cache"  # каталог кэша проверенных полей
+BATCH_SIZE = 16  # количество кандидатов, проверяемых одним процессом за одно задание
+STOCK_TARGET = 4  # сколько зерен держать в кэше для каждого режима и первого клика
+REFILL_TIMEOUT = 60.0  # наибольшее время одного пополнения кэша в секундах
+# Сколько пачек подряд без единого подходящего поля прерывают поиск: при такой плотности мин поля без
+# угадывания практически не встречаются (например, 350 мин на поле 30x16)
+EMPTY_BATCH_LIMIT = 64
+
+executor = None  # Общий пул процессов, создается при первом использовании
+executor_lock = threading.Lock()  # Пул может впервые понадобиться одновременно в нескольких потоках
+refill_thread = None  # Поток фонового пополнения кэша (работает не больше одного)
+refill_lock = threading.Lock()
+hopeless = set()  # Режимы и первые клики, для которых пополнение не нашло ни одного поля (в этом процессе)
+
+
+def get_executor():
+    # Пул процессов создается один раз и переиспользуется для всех генераций
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ProcessPoolExecutor()
+        return executor
+
+
+def cache_path(width, height, mines_count, first_click):
+    # Файл кэша для режима и первого клика; в нем хранятся зерна проверенных полей по 8 байт
+    return os.path.join(CACHE_DIR, f"{width}x{height}_{mines_count}_{first_click[0]}_{first_click[1]}.seeds")
+
+
+def check_candidates(width, height, mines_count, first_click, seeds):
+    # Проверка пачки кандидатов в отдельном процессе; возвращает зерна полей, проходимых без угадывания
+    return [seed for seed in seeds if solve(width, height, mines_count, seed, first_click)]
+
+
+def generate(width, height, mines_count, first_click, count=1, timeout=None, empty_limit=None):
+    # Поиск зерен полей без угадывания в пуле процессов; возвращает найденные зерна (возможно, меньше count,
+    # если истекло время ожидания или empty_limit проверенных пачек подряд не дали ни одного поля)
+    pool = get_executor()
+    rng = random.Random()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    found = []
+    pending = set()
+    empty = 0  # Пачек подряд без подходящих полей
+    try:
+        while len(found) < count and (empty_limit is None or empty < empty_limit):
+            # Пул загружается заданиями так, чтобы каждый процесс был занят
+            while len(pending) < 2 * (os.cpu_count() or 1):
+                seeds = [rng.randrange(2 ** 63) for _ in range(BATCH_SIZE)]
+                pending.add(pool.submit(check_candidates, width, height, mines_count, first_click, seeds))
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                seeds = future.result()
+                found.extend(seeds)
+                empty = 0 if seeds else empty + 1
+    finally:
+        for future in pending:
+            future.cancel()
+    return found[:count]
+
+
+def store_seeds(width, height, mines_count, first_click, seeds):
+    # Добавление зерен в конец файла кэша (под блокировкой файла: зерно могут одновременно извлекать
+    # игра или другая копия программы)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(cache_path(width, height, mines_count, first_click), "ab") as file, locked(file):
+        array('Q', seeds).tofile(file)
+
+
+def take_seed(width, height, mines_count, first_click):
+    # Извлечение одного зерна из кэша (последнего в файле, файл укорачивается); None, если кэш пуст
+    path = cache_path(width, height, mines_count, first_click)
+    try:
+        with open(path, "r+b") as file, locked(file):
+            size = os.fstat(file.fileno()).st_size // 8 * 8
+            if size == 0:
+                return None
+            file.seek(size - 8)
+            seed = array('Q', file.read(8))[0]
+            file.truncate(size - 8)
+            return seed
+    except FileNotFoundError:
+        return None
+
+
+def stock(width, height, mines_count, first_click):
+    # Количество зерен в кэше для режима и первого клика
+    try:
+        return os.path.getsize(cache_path(width, height, mines_count, first_click)) // 8
+    except FileNotFoundError:
+        return 0
+
+
+def no_guess_seed(width, height, mines_count, first_click, timeout=5.0):
+    # Зерно поля без угадывания: из кэша, а при его отсутствии - генерация в пуле процессов
+    # Возвращает None, если за отведенное время подходящее поле не найдено
+    seed = take_seed(width, height, mines_count, first_click)
+    if seed is not None:
+        return seed
+    seeds = generate(width, height, mines_count, first_click, count=1, timeout=timeout)
+    return seeds[0] if seeds else None
+
+
+def refill(width, height, mines_count, first_click, count=4, timeout=REFILL_TIMEOUT):
+    # Пополнение кэша для режима и первого клика (вызывается в фоновом потоке после начала игры)
+    # Поиск ограничен по времени и по числу пустых пачек подряд; если не найдено ни одного поля, режим
+    # запоминается как безнадежный и больше не пополняется; возвращает количество добавленных зерен
+    seeds = generate(width, height, mines_count, first_click, count=count, timeout=timeout,
+                     empty_limit=EMPTY_BATCH_LIMIT)
+    if seeds:
+        store_seeds(width, height, mines_count, first_click, seeds)
+    else:
+        hopeless.add((width, height, mines_count, first_click))
+    return len(seeds)
+
+
+def refill_in_background(width, height, mines_count, first_click, target=STOCK_TARGET):
+    # Пополнение кэша до target зерен в фоновом потоке, если запас меньше; одновременно работает не больше
+    # одного пополнения, поэтому частые игры не плодят потоки и не раздувают кэш
+    # Возвращает True, если пополнение запущено
+    global refill_thread
+    with refill_lock:
+        if refill_thread is not None and refill_thread.is_alive():
+            return False
+        if (width, height, mines_count, first_click) in hopeless:
+            return False
+        missing = target - stock(width, height, mines_count, first_click)
+        if missing <= 0:
+            return False
+        refill_thread = threading.Thread(target=refill, args=(width, height, mines_count, first_click, missing),
+                                         daemon=True)
+        refill_thread.start()
+        return True
+
+
+def main():
+    # Заполнение кэша из командной строки: python no_guess.py ширина высота мины [полей на клик]
+    # Кэш пополняется для всех возможных первых кликов; если для клика не найдено ни одного поля,
+    # режим считается безнадежным и заполнение прекращается
+    if len(sys.argv) < 4:
+        print("Использование: python no_guess.py ширина высота мины [полей на клик]")
+        return
+    width, height, mines_count = (int(value) for value in sys.argv[1:4])
+    per_click = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+    for row in range(height):
+        for col in range(width):
+            if not refill(width, height, mines_count, (row, col), per_click):
+                print(f"Поля без угадывания для клика ({row}, {col}) не найдены, заполнение прекращено")
+                return
+        print(f"Строка {row + 1}/{height} готова")
+
+
+if __name__ == "__main__":
+    main()
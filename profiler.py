@@ -0,0 +1,173 @@
+import json  # Импорт записи статистики в машиночитаемом виде
+import os  # Импорт функций для работы с файлами
+import time  # Импорт модуля для работы со временем
+import tkinter as tk  # Импорт библиотеки графического интерфейса для окна статистики
+from contextlib import contextmanager  # Импорт создания контекстных менеджеров
+
+PROFILE_DIR = "profiles"  # каталог, в который выгружается статистика сессий
+SAMPLE_MS = 500  # интервал замера очереди таймеров и обновления окна статистики в миллисекундах
+
+
+class Histogram:
+    # Гистограмма с логарифмическими корзинами: корзина b содержит значения от 2^(b-1) до 2^b - 1
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        value = int(value)
+        bucket = value.bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        # Верхняя граница корзины, в которую попадает заданный процентиль
+        target = self.count * percent / 100
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(self.max, 2 ** bucket - 1)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+            # Корзины в виде [нижняя граница, верхняя граница, количество]
+            "buckets": [[2 ** (bucket - 1) if bucket else 0, 2 ** bucket - 1, self.buckets[bucket]]
+                        for bucket in sorted(self.buckets)],
+        }
+
+
+class Profiler:
+    # Замеры времени обработчиков, задержки от ввода до отрисовки, глубины очереди таймеров Tk и кадров анимации
+    # Времена хранятся в микросекундах
+    def __init__(self, master, animator):
+        self.master = master
+        self.animator = animator
+        self.started_at = time.time()
+        self.histograms = {}  # Название замера -> гистограмма
+        self.frames = []  # Накопленное время пауз для каждого выполняемого сейчас замера (вложенные вызовы)
+        self.paused_total = 0.0  # Общее время пауз за сессию (для задержки от ввода до отрисовки)
+        self.last_frame = None  # Момент предыдущего кадра анимации для замера интервала между кадрами
+        self.window = tk.Toplevel(master)
+        self.window.title("Профилирование")
+        self.label = tk.Label(self.window, font=("Courier", 10), justify="left", anchor="w")
+        self.label.pack(padx=10, pady=10)
+        self.master.after(SAMPLE_MS, self.sample)
+
+    def record(self, name, value):
+        # Добавление значения в гистограмму замера
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.add(value)
+
+    def timed(self, name, func):
+        # Обертка, замеряющая время выполнения функции без учета пауз (например, модальных окон)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            self.frames.append(0.0)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                paused = self.frames.pop()
+                self.record(name, (time.perf_counter() - started - paused) * 1e6)
+        return wrapper
+
+    def instrument(self, target, names, prefix=""):
+        # Замена методов объекта обертками с замером времени (только у этого экземпляра)
+        for name in names:
+            setattr(target, name, self.timed(prefix + name, getattr(target, name)))
+
+    def instrument_input(self, target, names):
+        # Обертки обработчиков ввода: кроме времени обработчика замеряется задержка до отрисовки изменений
+        # (проверка ставится в очередь простоя после обработчика и сама дорисовывает все, что осталось в очереди)
+        # Паузы внутри обработчика (например, сообщение об окончании игры) сдвигают момент начала замера
+        for name in names:
+            handler = self.timed(name, getattr(target, name))
+
+            def wrapper(*args, handler=handler):
+                started = time.perf_counter()
+                paused_before = self.paused_total
+                try:
+                    return handler(*args)
+                finally:
+                    self.master.after_idle(self.painted, started + self.paused_total - paused_before)
+            setattr(target, name, wrapper)
+
+    def instrument_frames(self):
+        # Замер длительности кадров анимации и интервалов между ними
+        tick = self.timed("animation_frame", self.animator.tick)
+
+        def wrapper():
+            now = time.perf_counter()
+            if self.last_frame is not None and now - self.last_frame < 1.0:
+                self.record("frame_interval", (now - self.last_frame) * 1e6)
+            self.last_frame = now
+            tick()
+        self.animator.tick = wrapper
+
+    def painted(self, started):
+        # Вызывается из очереди простоя после обработчика ввода: перерисовку холста Tk ставит в очередь простоя
+        # при изменении элементов, в том числе из отложенных перерисовок самой игры, и она выполнилась бы
+        # уже после этой проверки, поэтому оставшаяся очередь простоя выполняется здесь до замера
+        self.master.update_idletasks()
+        self.record("input_to_paint", (time.perf_counter() - started) * 1e6)
+
+    @contextmanager
+    def paused(self):
+        # Время внутри блока (например, ожидание закрытия диалога) не учитывается выполняемыми замерами
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - started
+            self.paused_total += duration
+            for i in range(len(self.frames)):
+                self.frames[i] += duration
+
+    def sample(self):
+        # Периодический замер количества запланированных вызовов after и обновление окна статистики
+        try:
+            pending = len(self.master.tk.splitlist(self.master.tk.call("after", "info")))
+        except tk.TclError:
+            return
+        self.record("after_queue_depth", pending)
+        self.record("animator_pending", self.animator.pending())
+        self.update_overlay()
+        self.master.after(SAMPLE_MS, self.sample)
+
+    def update_overlay(self):
+        # Вывод процентилей всех замеров в окно статистики
+        lines = [f"{'замер':<24}{'кол-во':>8}{'p50':>9}{'p99':>9}{'max':>9}"]
+        for name in sorted(self.histograms):
+            histogram = self.histograms[name]
+            lines.append(f"{name:<24}{histogram.count:>8}{histogram.percentile(50):>9}"
+                         f"{histogram.percentile(99):>9}{histogram.max:>9}")
+        lines.append("Времена в мкс, очереди - в штуках")
+        self.label.config(text="\n".join(lines))
+
+    def export(self):
+        # Выгрузка гистограмм сессии в файл; возвращает путь к файлу или None, если замеров нет
+        if not self.histograms:
+            return None
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, time.strftime("session_%Y%m%d_%H%M%S.json",
+                                                       time.localtime(self.started_at)))
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({
+                "started_at": self.started_at,
+                "finished_at": time.time(),
+                "histograms": {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())},
+            }, file, ensure_ascii=False, indent=2)
+        return path
@@ -0,0 +1,561 @@
+import heapq  # Импорт кучи для хранения ограниченного числа лучших результатов
+import mmap  # Импорт отображения файла в память для чтения без загрузки всего файла
+import os  # Импорт функций для работы с файлами
+import queue  # Импорт потокобезопасной очереди рекордов для фоновой записи
+import re  # Импорт регулярных выражений для разбора строк режимов старого формата
+import shutil  # Импорт копирования файла перед переводом в новый формат
+import struct  # Импорт модуля для упаковки и распаковки данных в бинарном формате
+import threading  # Импорт потока фоновой записи рекордов
+import time  # Импорт модуля для работы со временем
+from contextlib import contextmanager  # Импорт создания менеджеров контекста из генераторов
+
+try:
+    import fcntl  # Импорт блокировок файлов (POSIX)
+except ImportError:
+    fcntl = None
+    import msvcrt  # Импорт блокировок файлов (Windows)
+
+WINS_FILE = "minesweeper.wins"  # файл рекордов по умолчанию
+
+MAGIC = b"MSWR"  # сигнатура файла рекордов нового формата
+VERSION = 2  # версия формата (2 - сложность поля в рекорде и индекс лучших результатов по 3BV/с)
+MAX_MODES = 256  # максимальное количество различных режимов (размер поля и количество мин) в таблице режимов
+TOP_N = 10  # количество лучших результатов, хранимых в индексе для каждого режима
+NO_MODE = 0xFFFF  # идентификатор режима для рекордов, не поместившихся в таблицу режимов
+CHUNK_RECORDS = 65536  # количество рекордов в одном блоке при потоковом чтении файла
+
+# Заголовок: сигнатура, версия, размер таблицы режимов, размер индекса, количество режимов, количество рекордов
+HEADER = struct.Struct("<4sHHHHI")
+# Запись таблицы режимов: ширина, высота, количество мин
+MODE_ENTRY = struct.Struct("<HHI")
+# Запись индекса лучших результатов: время (или 3BV/с) и номер рекорда
+TOP_ENTRY = struct.Struct("<dI")
+# Рекорд фиксированной длины: идентификатор режима, ширина, высота, количество мин, время прохождения,
+# момент завершения игры (размеры хранятся и в самом рекорде, чтобы рекорд читался без таблицы режимов),
+# 3BV, количество пустых областей и островов поля (0 - сложность неизвестна)
+RECORD = struct.Struct("<HHHIddIII")
+RECORD_V1 = struct.Struct("<HHHIdd")  # рекорд версии 1 (без сложности поля)
+
+MODES_OFFSET = HEADER.size  # смещение таблицы режимов
+TOP_OFFSET = MODES_OFFSET + MAX_MODES * MODE_ENTRY.size  # смещение индекса лучших результатов по времени
+RATE_OFFSET = TOP_OFFSET + MAX_MODES * TOP_N * TOP_ENTRY.size  # смещение индекса лучших результатов по 3BV/с
+RECORDS_OFFSET = RATE_OFFSET + MAX_MODES * TOP_N * TOP_ENTRY.size  # смещение первого рекорда
+RECORDS_OFFSET_V1 = RATE_OFFSET  # в версии 1 индекса по 3BV/с не было
+NO_METRICS = (0, 0, 0)  # сложность поля для рекордов, у которых она неизвестна
+
+LEGACY_MODE = re.compile(r"(\d+)x(\d+) - (\d+) Mines")  # строка режима старого формата
+
+
+@contextmanager
+def locked(file, shared=False):
+    # Рекомендательная блокировка файла рекордов на время операции: рекорды нескольких копий игры не
+    # перемешиваются, а читатели не видят наполовину записанный заголовок (в Windows блокировка всегда
+    # исключительная и ставится на первый байт файла)
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield file
+        finally:
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+        return
+    position = file.tell()
+    file.seek(0)
+    msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+    file.seek(position)
+    try:
+        yield file
+    finally:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def locked_path(path, shared=False, create=False):
+    # Открытие файла рекордов по пути под блокировкой (create - файл создается, если его нет)
+    # Перевод в текущий формат заменяет файл целиком, поэтому, если пока эта копия игры ждала блокировку,
+    # другая заменила файл, блокировка старого файла ничего не защищает: тогда открывается новый файл
+    while True:
+        if create:
+            file = open(os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644), "r+b")
+        else:
+            file = open(path, "rb" if shared else "r+b")
+        with file, locked(file, shared):
+            try:
+                replaced = not os.path.samestat(os.fstat(file.fileno()), os.stat(path))
+            except FileNotFoundError:
+                replaced = True
+            if not replaced:
+                yield file
+                return
+
+
+def empty_header():
+    # Заголовочная область пустого файла: заголовок, пустая таблица режимов и пустой индекс
+    return HEADER.pack(MAGIC, VERSION, MAX_MODES, TOP_N, 0, 0) + bytes(RECORDS_OFFSET - HEADER.size)
+
+
+def read_legacy(data):
+    # Разбор старого формата (длина строки режима, строка режима, время в float32); обрезанный хвост пропускается
+    offset = 0
+    while offset + 4 <= len(data):
+        length = struct.unpack_from('I', data, offset)[0]
+        if offset + 4 + length + 4 > len(data):
+            break
+        mode = data[offset + 4:offset + 4 + length].decode('utf-8', errors='replace')
+        time_taken = struct.unpack_from('f', data, offset + 4 + length)[0]
+        offset += 4 + length + 4
+        match = LEGACY_MODE.search(mode)
+        if match:
+            yield tuple(int(value) for value in match.groups()), time_taken
+
+
+def read_top(data, offset, mode_count):
+    # Разбор индекса лучших результатов: для каждого режима список (значение, номер рекорда)
+    top = []
+    for mode_id in range(mode_count):
+        entries = (TOP_ENTRY.unpack_from(data, offset + (mode_id * TOP_N + i) * TOP_ENTRY.size) for i in range(TOP_N))
+        # Пустые позиции индекса имеют номер рекорда 0 (нумерация рекордов начинается с 1)
+        top.append([entry for entry in entries if entry[1]])
+    return top
+
+
+class Index:
+    # Заголовочная область файла рекордов, разобранная в память: таблица режимов и лучшие результаты по режимам
+    # (по времени - по возрастанию, по 3BV/с - по убыванию)
+    def __init__(self, data):
+        magic, version, max_modes, top_n, mode_count, record_count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION or max_modes != MAX_MODES or top_n != TOP_N:
+            raise ValueError("неизвестный формат файла рекордов")
+        self.record_count = record_count
+        self.modes = [MODE_ENTRY.unpack_from(data, MODES_OFFSET + i * MODE_ENTRY.size) for i in range(mode_count)]
+        self.mode_ids = {mode: mode_id for mode_id, mode in enumerate(self.modes)}
+        self.top = read_top(data, TOP_OFFSET, mode_count)
+        self.top_rate = read_top(data, RATE_OFFSET, mode_count)
+
+    def pack(self):
+        # Упаковка заголовочной области обратно в байты
+        data = bytearray(empty_header())
+        HEADER.pack_into(data, 0, MAGIC, VERSION, MAX_MODES, TOP_N, len(self.modes), self.record_count)
+        for mode_id, mode in enumerate(self.modes):
+            MODE_ENTRY.pack_into(data, MODES_OFFSET + mode_id * MODE_ENTRY.size, *mode)
+            for offset, top in ((TOP_OFFSET, self.top), (RATE_OFFSET, self.top_rate)):
+                for i, entry in enumerate(top[mode_id]):
+                    TOP_ENTRY.pack_into(data, offset + (mode_id * TOP_N + i) * TOP_ENTRY.size, *entry)
+        return bytes(data)
+
+    def mode_id(self, mode, create=False):
+        # Идентификатор режима (ширина, высота, мины); новый режим добавляется в таблицу, если в ней есть место
+        mode_id = self.mode_ids.get(mode)
+        if mode_id is None and create and len(self.modes) < MAX_MODES:
+            mode_id = len(self.modes)
+            self.modes.append(mode)
+            self.mode_ids[mode] = mode_id
+            self.top.append([])
+            self.top_rate.append([])
+        return NO_MODE if mode_id is None else mode_id
+
+    def add(self, mode_id, time_taken, bbbv=0):
+        # Учет нового рекорда в индексах лучших результатов; возвращает номер рекорда
+        self.record_count += 1
+        if mode_id != NO_MODE:
+            top = self.top[mode_id]
+            top.append((time_taken, self.record_count))
+            top.sort()
+            del top[TOP_N:]
+            # Рекорды с неизвестной сложностью поля в индекс по 3BV/с не попадают
+            if bbbv and time_taken > 0:
+                top = self.top_rate[mode_id]
+                top.append((bbbv / time_taken, self.record_count))
+                top.sort(key=lambda entry: (-entry[0], entry[1]))
+                del top[TOP_N:]
+        return self.record_count
+
+
+def current_format(path):
+    # Проверка, что файл записан в текущей версии формата
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+    return len(header) == HEADER.size and header[:4] == MAGIC and HEADER.unpack(header)[1] == VERSION
+
+
+def migrate(path=WINS_FILE):
+    # Перевод файла старого формата или предыдущей версии в текущую; исходный файл сохраняется
+    # с расширением .bak и читается потоком, поэтому память не зависит от количества рекордов
+    # Проверка формата, копирование и замена файла выполняются под исключительной блокировкой: две копии игры
+    # не переводят файл одновременно (и не пишут в одни и те же .bak и .tmp), а вторая видит уже новый файл
+    with locked_path(path):
+        if current_format(path):
+            return False
+        backup = path + ".bak"
+        shutil.copyfile(path, backup)
+        write_records((((width, height, mines), time_taken, finished_at, metrics)
+                       for chunk in read_chunks(backup)
+                       for width, height, mines, time_taken, finished_at, *metrics in chunk), path)
+    return True
+
+
+def write_records(entries, path=WINS_FILE):
+    # Запись нового файла рекордов из ((ширина, высота, мины), время, момент завершения, (3BV, пустые области,
+    # острова)) в заданном порядке; файл пишется во временный и затем заменяет старый; возвращает количество
+    # записанных рекордов
+    index = Index(empty_header())
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(index.pack())
+        for mode, time_taken, finished_at, metrics in entries:
+            mode_id = index.mode_id(mode, create=True)
+            index.add(mode_id, time_taken, metrics[0])
+            file.write(RECORD.pack(mode_id, *mode, time_taken, finished_at, *metrics))
+        file.seek(0)
+        file.write(index.pack())
+    os.replace(temp_path, path)
+    return index.record_count
+
+
+def open_index(path=WINS_FILE):
+    # Чтение заголовочной области через отображение файла в память; None, если рекордов еще нет
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return None
+    if size == 0:
+        return None
+    if not current_format(path):
+        # Файл без сигнатуры или предыдущей версии записан старой версией игры
+        migrate(path)
+    with locked_path(path, shared=True) as file:
+        if os.fstat(file.fileno()).st_size < RECORDS_OFFSET:
+            return None
+        with mmap.mmap(file.fileno(), RECORDS_OFFSET, access=mmap.ACCESS_READ) as data:
+            return Index(data)
+
+
+def top_times(width, height, mines, count=5, path=WINS_FILE):
+    # Лучшие времена для режима; стоимость не зависит от количества сохраненных рекордов
+    index = open_index(path)
+    if index is None:
+        return []
+    mode_id = index.mode_id((width, height, mines))
+    if mode_id == NO_MODE:
+        return []
+    return [time_taken for time_taken, _ in index.top[mode_id][:count]]
+
+
+def store_win(width, height, mines, time_taken, metrics=NO_METRICS, path=WINS_FILE):
+    # Добавление одного рекорда; возвращает номер рекорда
+    # metrics - сложность поля: (3BV, количество пустых областей, количество островов)
+    return store_wins([((width, height, mines), time_taken, time.time(), metrics)], path)[0]
+
+
+def store_wins(entries, path=WINS_FILE):
+    # Добавление пакета рекордов ((ширина, высота, мины), время, момент завершения, сложность) в конец файла
+    # под блокировкой; возвращает номера рекордов
+    # Сначала рекорды и таблицы индекса записываются и сбрасываются на диск, и только затем отдельной маленькой
+    # записью обновляется заголовок с количеством рекордов: при сбое в файле остается либо учтенный пакет, либо
+    # неучтенный хвост (возможно, вместе с частично записанными таблицами), который исправляет recover
+    if not entries:
+        return []
+    open_index(path)  # Перевод файла старого формата в текущий
+    with locked_path(path, create=True) as file:
+        if os.fstat(file.fileno()).st_size < RECORDS_OFFSET:
+            # Рекордов еще нет: пустая заголовочная область (файл создается под блокировкой, поэтому
+            # одновременно созданный другой копией игры файл не затирается)
+            file.write(empty_header())
+        # Хвост, оставшийся после сбоя другой копии игры, убирается до записи, иначе новые рекорды
+        # легли бы после него, а таблицы индекса могли бы оказаться частично записанными
+        recover(file)
+        file.seek(0)
+        index = Index(file.read(RECORDS_OFFSET))
+        numbers = []
+        data = bytearray()
+        for mode, time_taken, finished_at, metrics in entries:
+            mode_id = index.mode_id(mode, create=True)
+            numbers.append(index.add(mode_id, time_taken, metrics[0]))
+            data += RECORD.pack(mode_id, *mode, time_taken, finished_at, *metrics)
+        file.seek(RECORDS_OFFSET + (numbers[0] - 1) * RECORD.size)
+        file.write(data)
+        write_index(file, index)
+    return numbers
+
+
+def write_index(file, index):
+    # Запись заголовочной области в два шага: сначала таблицы режимов и лучших результатов (вместе с уже
+    # записанными рекордами) сбрасываются на диск, затем отдельно записывается заголовок - 16 байт в начале
+    # файла, которые записываются целиком; только он учитывает новые рекорды и делает запись действительной
+    packed = index.pack()
+    file.seek(HEADER.size)
+    file.write(packed[HEADER.size:])
+    file.flush()
+    os.fsync(file.fileno())
+    file.seek(0)
+    file.write(packed[:HEADER.size])
+    file.flush()
+    os.fsync(file.fileno())
+
+
+def rebuild_index(file, record_count):
+    # Индекс, построенный заново по первым record_count рекордам файла
+    index = Index(empty_header())
+    file.seek(RECORDS_OFFSET)
+    left = record_count
+    while left:
+        data = file.read(min(CHUNK_RECORDS, left) * RECORD.size)
+        data = data[:len(data) - len(data) % RECORD.size]
+        if not data:
+            break
+        for _, width, height, mines, time_taken, _, bbbv, _, _ in RECORD.iter_unpack(data):
+            index.add(index.mode_id((width, height, mines), create=True), time_taken, bbbv)
+        left -= len(data) // RECORD.size
+    return index
+
+
+def recover(file):
+    # Восстановление файла после сбоя во время записи (файл уже открыт и заблокирован); возвращает True,
+    # если файл изменен
+    # Если за последним учтенным в заголовке рекордом есть данные (недописанный пакет), таблицы индекса могли
+    # быть записаны частично, поэтому они строятся заново по учтенным рекордам, а хвост отрезается; если
+    # заголовок учитывает рекорды, которых нет в файле, индекс строится по сохранившимся целым рекордам
+    # Новый индекс записывается до укорачивания файла: сбой во время восстановления оставляет хвост,
+    # и следующее восстановление повторяется
+    size = os.fstat(file.fileno()).st_size
+    file.seek(0)
+    header = file.read(HEADER.size)
+    if len(header) < HEADER.size or header[:4] != MAGIC or HEADER.unpack(header)[1] != VERSION:
+        return False  # Пустой файл или старый формат (переводится в текущий при открытии)
+    record_count = HEADER.unpack(header)[5]
+    end = RECORDS_OFFSET + record_count * RECORD.size
+    if size == end:
+        return False
+    index = rebuild_index(file, min(record_count, max(0, size - RECORDS_OFFSET) // RECORD.size))
+    write_index(file, index)
+    file.truncate(RECORDS_OFFSET + index.record_count * RECORD.size)
+    file.flush()
+    os.fsync(file.fileno())
+    return True
+
+
+def repair(path=WINS_FILE):
+    # Восстановление файла рекордов после сбоя (при запуске фоновой записи); возвращает True, если файл изменен
+    try:
+        with locked_path(path) as file:
+            return recover(file)
+    except FileNotFoundError:
+        return False
+
+
+class RecordWriter:
+    # Запись рекордов в фоновом потоке: окно игры не ждет диска, а рекорды, поставленные в очередь почти
+    # одновременно, записываются одним пакетом (одна блокировка, один заголовок и один сброс на диск)
+    # При запуске поток восстанавливает файл после возможного сбоя предыдущей записи
+    def __init__(self, path=WINS_FILE):
+        self.path = path
+        self.queue = queue.Queue()
+        self.failed = []  # Рекорды, которые не удалось записать (повторяются со следующим пакетом)
+        self.error = None  # Текст последней ошибки записи (None - все рекорды записаны)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, width, height, mines, time_taken, metrics=NO_METRICS, on_stored=None):
+        # Постановка рекорда в очередь; момент завершения фиксируется сразу, а on_stored(номер рекорда)
+        # вызывается в потоке записи после того, как рекорд сохранен на диске
+        self.queue.put((((width, height, mines), time_taken, time.time(), metrics), on_stored))
+
+    def flush(self):
+        # Ожидание записи всех поставленных в очередь рекордов; возвращает текст ошибки или None
+        self.queue.join()
+        return self.error
+
+    def run(self):
+        # Цикл потока записи; любая ошибка (в том числе поврежденный заголовок или ошибка on_stored) только
+        # запоминается: поток продолжает работать, а каждый рекорд пакета отмечается обработанным, иначе
+        # flush ждал бы бесконечно
+        try:
+            repair(self.path)
+        except Exception as error:
+            self.error = str(error) or type(error).__name__
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.write(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def write(self, batch):
+        # Запись пакета вместе с рекордами, которые не удалось записать раньше
+        jobs = self.failed + batch
+        try:
+            numbers = store_wins([entry for entry, _ in jobs], self.path)
+        except Exception as error:
+            self.failed, self.error = jobs, str(error) or type(error).__name__
+            return
+        self.failed, self.error = [], None
+        for (_, on_stored), number in zip(jobs, numbers):
+            if on_stored is not None:
+                try:
+                    on_stored(number)
+                except Exception as error:
+                    self.error = str(error) or type(error).__name__
+
+
+def read_chunks(path=WINS_FILE, chunk_records=CHUNK_RECORDS):
+    # Потоковое чтение рекордов блоками по chunk_records рекордов (память не зависит от размера файла):
+    # каждый блок - список (ширина, высота, мины, время, момент завершения, 3BV, пустые области, острова)
+    # Читаются файлы любой версии, сам файл при этом не изменяется; обрезанный хвост пропускается
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        header = file.read(HEADER.size)
+        if size and header[:4] != MAGIC:
+            # Старый формат: время не сохраняло момента завершения и сложности поля
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                chunk = []
+                for mode, time_taken in read_legacy(data):
+                    chunk.append((*mode, time_taken, 0.0, *NO_METRICS))
+                    if len(chunk) == chunk_records:
+                        yield chunk
+                        chunk = []
+                if chunk:
+                    yield chunk
+            return
+        if len(header) < HEADER.size:
+            return
+        _, version, _, _, _, record_count = HEADER.unpack(header)
+        if version == VERSION:
+            record, offset = RECORD, RECORDS_OFFSET
+        elif version == 1:
+            record, offset = RECORD_V1, RECORDS_OFFSET_V1
+        else:
+            raise ValueError("неизвестный формат файла рекордов")
+        remaining = min(record_count * record.size, max(0, size - offset))
+        file.seek(offset)
+        while remaining > 0:
+            data = file.read(min(remaining, chunk_records * record.size))
+            data = data[:len(data) - len(data) % record.size]
+            if not data:
+                break
+            remaining -= len(data)
+            if record is RECORD_V1:
+                yield [(*row[1:], *NO_METRICS) for row in RECORD_V1.iter_unpack(data)]
+            else:
+                yield [row[1:] for row in RECORD.iter_unpack(data)]
+
+
+def read_records(path=WINS_FILE):
+    # Перебор всех рекордов: ((ширина, высота, мины), время, момент завершения, (3BV, пустые области, острова))
+    if open_index(path) is None:
+        return
+    for chunk in read_chunks(path):
+        for width, height, mines, time_taken, finished_at, *metrics in chunk:
+            yield (width, height, mines), time_taken, finished_at, tuple(metrics)
+
+
+class LeaderboardCache:
+    # Кэш лучших результатов по режимам; при изменении файла читаются только дописанные в конец рекорды
+    def __init__(self, path=WINS_FILE, size=TOP_N):
+        self.path = path
+        self.size = size  # Сколько лучших результатов хранится для каждого режима
+        self.stamp = None  # (устройство и inode, размер, время изменения) файла при последнем чтении
+        self.record_count = 0  # Количество уже учтенных рекордов
+        self.heaps = {}  # Режим -> куча из не более size элементов (-время, номер рекорда); на вершине худший
+        self.rate_heaps = {}  # Режим -> куча из не более size элементов (3BV/с, номер рекорда); на вершине худший
+
+    def push(self, mode, time_taken, record_number, bbbv=0):
+        # Добавление результата в ограниченные кучи режима (по времени и, если сложность известна, по 3BV/с)
+        heap = self.heaps.setdefault(mode, [])
+        if len(heap) < self.size:
+            heapq.heappush(heap, (-time_taken, record_number))
+        elif -heap[0][0] > time_taken:
+            heapq.heapreplace(heap, (-time_taken, record_number))
+        if bbbv and time_taken > 0:
+            self.push_rate(mode, bbbv / time_taken, record_number)
+
+    def push_rate(self, mode, rate, record_number):
+        heap = self.rate_heaps.setdefault(mode, [])
+        if len(heap) < self.size:
+            heapq.heappush(heap, (rate, -record_number))
+        elif heap[0][0] < rate:
+            heapq.heapreplace(heap, (rate, -record_number))
+
+    def reload(self):
+        # Полное перечитывание: лучшие результаты берутся из индекса файла, без чтения всех рекордов
+        self.heaps.clear()
+        self.rate_heaps.clear()
+        index = open_index(self.path)
+        self.record_count = 0 if index is None else index.record_count
+        if index is not None:
+            for mode, top, top_rate in zip(index.modes, index.top, index.top_rate):
+                for time_taken, record_number in top:
+                    self.push(mode, time_taken, record_number)
+                for rate, record_number in top_rate:
+                    self.push_rate(mode, rate, record_number)
+
+    def refresh(self):
+        # Проверка файла по размеру и времени изменения; при дописывании читается только новый хвост
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self.stamp = None
+            self.record_count = 0
+            self.heaps.clear()
+            self.rate_heaps.clear()
+            return
+        stamp = ((stat.st_dev, stat.st_ino), stat.st_size, stat.st_mtime_ns)
+        if stamp == self.stamp:
+            return
+        previous, self.stamp = self.stamp, stamp
+        # Файл заменен, укорочен или еще не читался - полное перечитывание
+        if (previous is None or previous[0] != stamp[0] or stamp[1] < previous[1]
+                or self.record_count == 0 or stamp[1] < RECORDS_OFFSET):
+            self.reload()
+            return
+        # Читаются только рекорды, учтенные в заголовке: хвост за ними может быть недописанным пакетом,
+        # который repair отрежет, а на его место будут записаны другие рекорды
+        with open(self.path, "rb") as file, locked(file, shared=True):
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size or header[:4] != MAGIC or HEADER.unpack(header)[1] != VERSION:
+                data = None
+            else:
+                header_count = HEADER.unpack(header)[5]
+                file.seek(RECORDS_OFFSET + self.record_count * RECORD.size)
+                data = file.read(max(0, header_count - self.record_count) * RECORD.size)
+        if data is None:
+            self.reload()  # Файл старого формата переводится в текущий при открытии индекса
+            return
+        data = data[:len(data) - len(data) % RECORD.size]
+        for mode_id, width, height, mines, time_taken, _, bbbv, _, _ in RECORD.iter_unpack(data):
+            self.record_count += 1
+            # Рекорды режимов, не поместившихся в таблицу режимов, не попадают в индекс файла, поэтому
+            # не учитываются и здесь (иначе результат зависел бы от того, читался файл целиком или по хвосту)
+            if mode_id != NO_MODE:
+                self.push((width, height, mines), time_taken, self.record_count, bbbv)
+
+    def top(self, width, height, mines, count=5):
+        # Лучшие времена для режима по возрастанию
+        self.refresh()
+        return sorted(-entry[0] for entry in self.heaps.get((width, height, mines), ()))[:count]
+
+    def top_rates(self, width, height, mines, count=5):
+        # Лучшие значения 3BV/с для режима по убыванию
+        self.refresh()
+        return sorted((entry[0] for entry in self.rate_heaps.get((width, height, mines), ())), reverse=True)[:count]
+
+    def place(self, width, height, mines, time_taken):
+        # Место, которое займет новый рекорд с таким временем (начиная с 1), до его записи в файл; None, если
+        # рекорд не попадет в лучшие (при равном времени выше стоит более ранний рекорд)
+        self.refresh()
+        place = 1 + sum(1 for entry in self.heaps.get((width, height, mines), ()) if -entry[0] <= time_taken)
+        return place if place <= self.size else None
+
+    def rank(self, width, height, mines, record_number):
+        # Место рекорда среди лучших результатов режима (начиная с 1); None, если рекорд не попал в лучшие
+        self.refresh()
+        ranking = sorted((-time_taken, number) for time_taken, number in self.heaps.get((width, height, mines), ()))
+        for place, (_, number) in enumerate(ranking, start=1):
+            if number == record_number:
+                return place
+        return None
@@ -0,0 +1,187 @@
+import os  # Импорт функций для работы с файлами
+import struct  # Импорт модуля для упаковки и распаковки данных в бинарном формате
+import sys  # Импорт доступа к аргументам командной строки
+from concurrent.futures import ProcessPoolExecutor  # Импорт пула процессов для пакетной проверки
+
+from board import ACTION_CHORD, ACTION_FLAG, ACTION_REVEAL, Board  # Импорт игровой логики, не зависящей от интерфейса
+import records  # Импорт хранилища рекордов
+
+REPLAYS_FILE = "minesweeper.replays"  # файл записей ходов выигранных игр по умолчанию
+
+MAGIC = b"MSRP"  # сигнатура записи ходов
+VERSION = 1  # версия формата
+# Заголовок записи: сигнатура, версия, ширина, высота, количество мин, зерно поля
+HEADER = struct.Struct("<4sHIIIQ")
+# Заголовок записи в файле записей: номер рекорда и длина записи в байтах
+ENTRY = struct.Struct("<II")
+
+# Типы действий (хранятся в двух младших битах номера ячейки)
+REVEAL = ACTION_REVEAL  # открытие закрытой ячейки (в том числе первый клик)
+FLAG = ACTION_FLAG  # установка или снятие флажка
+CHORD = ACTION_CHORD  # открытие соседей открытой цифры
+
+TIME_TOLERANCE = 1.0  # на сколько секунд время рекорда может превышать время последнего хода в записи
+VERIFY_CHUNK = 64  # количество записей, проверяемых одним процессом за одно задание
+
+
+def write_varint(data, value):
+    # Запись неотрицательного числа переменной длины: по 7 бит в байте, старший бит - признак продолжения
+    while value >= 0x80:
+        data.append(value & 0x7F | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def read_varint(data, offset):
+    # Чтение числа переменной длины; возвращает (число, смещение после него)
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class Recorder:
+    # Запись ходов одной игры: заголовок поля и действия с интервалами между ними в миллисекундах
+    # data - запись продолжаемой сохраненной игры: новые ходы дописываются к ней, а интервал отсчитывается
+    # от ее последнего хода (started_at - начало игры с учетом времени, прошедшего до сохранения)
+    def __init__(self, board, started_at, data=None):
+        self.data = bytearray(HEADER.pack(MAGIC, VERSION, board.width, board.height, board.mines_count, board.seed))
+        self.width = board.width
+        self.last_ms = round(started_at * 1000)  # Момент предыдущего действия (первое действие - начало игры)
+        if data is not None:
+            try:
+                mode, events = read_events(data)
+            except (struct.error, IndexError):
+                raise ValueError("запись ходов повреждена")
+            if mode != (board.width, board.height, board.mines_count, board.seed):
+                raise ValueError("запись ходов не соответствует полю")
+            self.data = bytearray(data)
+            if events:
+                self.last_ms += events[-1][2]
+
+    def record(self, action, row, col, at):
+        # Добавление действия: номер ячейки вместе с типом действия и интервал от предыдущего действия
+        now_ms = max(self.last_ms, round(at * 1000))
+        write_varint(self.data, (row * self.width + col) << 2 | action)
+        write_varint(self.data, now_ms - self.last_ms)
+        self.last_ms = now_ms
+
+
+def read_events(data):
+    # Разбор записи: (ширина, высота, мины, зерно) и список действий (тип, индекс ячейки, момент в мс от начала)
+    magic, version, width, height, mines_count, seed = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("неизвестный формат записи ходов")
+    events = []
+    offset = HEADER.size
+    elapsed = 0
+    while offset < len(data):
+        packed, offset = read_varint(data, offset)
+        delta, offset = read_varint(data, offset)
+        elapsed += delta
+        events.append((packed & 3, packed >> 2, elapsed))
+    return (width, height, mines_count, seed), events
+
+
+def replay(data):
+    # Повтор записи на поле без интерфейса; возвращает (режим, итог, время последнего хода в секундах, 3BV поля)
+    # Итог: "win", "loss", "unfinished" или "invalid" (недопустимое действие или действия после конца игры)
+    (width, height, mines_count, seed), events = read_events(data)
+    # Пустые области не размечаются заранее: при однократном повторе разметка не окупается
+    board = Board(width, height, mines_count, label_regions=False, seed=seed)
+    mode = (width, height, mines_count)
+    outcome = "unfinished"
+    elapsed = 0
+    for action, index, elapsed in events:
+        if (outcome != "unfinished" or index >= board.size or action not in (REVEAL, FLAG, CHORD)
+                or (board.first_click and action != REVEAL)):
+            return mode, "invalid", elapsed / 1000, board.difficulty()[0]
+        board.apply([(action, *board.coords(index))])
+        if board.lost:
+            outcome = "loss"
+        elif board.check_win():
+            outcome = "win"
+    return mode, outcome, elapsed / 1000, board.difficulty()[0]
+
+
+def store(record_number, recorder, path=REPLAYS_FILE):
+    # Добавление записи ходов выигранной игры в конец файла записей
+    with open(path, "ab") as file:
+        file.write(ENTRY.pack(record_number, len(recorder.data)) + recorder.data)
+
+
+def read_replays(path=REPLAYS_FILE):
+    # Перебор записей из файла записей: (номер рекорда, запись); обрезанный хвост пропускается
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return
+    offset = 0
+    while offset + ENTRY.size <= len(data):
+        record_number, length = ENTRY.unpack_from(data, offset)
+        offset += ENTRY.size
+        if offset + length > len(data):
+            break
+        yield record_number, data[offset:offset + length]
+        offset += length
+
+
+def check(record_number, record, data):
+    # Проверка одного рекорда по записи ходов; возвращает описание несоответствия или None
+    if record is None:
+        return f"рекорд {record_number}: нет такого рекорда"
+    recorded_mode, time_taken, _, (recorded_bbbv, _, _) = record
+    try:
+        mode, outcome, elapsed, bbbv = replay(data)
+    except (ValueError, struct.error, IndexError) as error:
+        return f"рекорд {record_number}: запись повреждена ({error})"
+    if mode != recorded_mode:
+        return f"рекорд {record_number}: режим {recorded_mode}, а в записи {mode}"
+    if outcome != "win":
+        return f"рекорд {record_number}: повтор дает итог {outcome}"
+    # Сложность поля в рекорде должна совпадать со сложностью поля из записи (0 - рекорд старой версии)
+    if recorded_bbbv and recorded_bbbv != bbbv:
+        return f"рекорд {record_number}: 3BV {recorded_bbbv}, а у поля из записи {bbbv}"
+    if not elapsed - 0.001 <= time_taken <= elapsed + TIME_TOLERANCE:
+        return f"рекорд {record_number}: время {time_taken:.3f}с, а последний ход в записи на {elapsed:.3f}с"
+    return None
+
+
+def check_batch(batch):
+    # Задание для процесса пула: проверка пачки (номер рекорда, рекорд, запись)
+    return [check(*item) for item in batch]
+
+
+def verify(wins_path=records.WINS_FILE, replays_path=REPLAYS_FILE, workers=None):
+    # Пакетная проверка всех рекордов, для которых есть записи ходов
+    # Возвращает (количество проверенных записей, список несоответствий, количество рекордов без записей)
+    wins = list(records.read_records(wins_path))
+    items = [(number, wins[number - 1] if 0 < number <= len(wins) else None, data)
+             for number, data in read_replays(replays_path)]
+    batches = [items[i:i + VERIFY_CHUNK] for i in range(0, len(items), VERIFY_CHUNK)]
+    with ProcessPoolExecutor(workers) as pool:
+        problems = [problem for result in pool.map(check_batch, batches) for problem in result if problem]
+    missing = len(wins) - len({number for number, _, _ in items})
+    return len(items), problems, max(0, missing)
+
+
+def main():
+    # Проверка рекордов из командной строки: python replay.py [файл рекордов] [файл записей]
+    wins_path = sys.argv[1] if len(sys.argv) > 1 else records.WINS_FILE
+    replays_path = sys.argv[2] if len(sys.argv) > 2 else REPLAYS_FILE
+    if not os.path.exists(wins_path):
+        print(f"Файл рекордов {wins_path} не найден")
+        return
+    checked, problems, missing = verify(wins_path, replays_path)
+    for problem in problems:
+        print(problem)
+    print(f"Проверено записей: {checked}, несоответствий: {len(problems)}, рекордов без записи: {missing}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import mmap  # Импорт отображения файла в память для быстрого чтения больших снимков
+import os  # Импорт функций для работы с файлами
+import struct  # Импорт модуля для упаковки и распаковки данных в бинарном формате
+
+from board import Board, FLAG, MINE, REVEALED  # Импорт игрового поля и флагов состояния ячеек
+
+SAVE_FILE = "minesweeper.save"  # файл сохраненной игры по умолчанию
+
+MAGIC = b"MSSV"  # сигнатура файла сохранения
+VERSION = 2  # версия формата
+# Заголовок: сигнатура, версия, ширина, высота, количество мин, зерно поля, прошедшее время в секундах,
+# сложность поля (3BV, пустые области, острова; 3BV = 0 - сложность еще не вычислялась), длина записи ходов
+# в байтах (0 - записи нет); запись ходов (формат replay) идет после битовых плоскостей
+HEADER = struct.Struct("<4sHIIIQdIIII")
+HEADER_V1 = struct.Struct("<4sHIIIQd")  # заголовок версии 1 (без сложности поля), читается при загрузке
+PLANES = (MINE, REVEALED, FLAG)  # порядок битовых плоскостей после заголовка
+
+
+def plane_table(bit):
+    # Таблица перевода состояния ячейки в символ "0" или "1" для указанного бита
+    return bytes(ord("1") if value & bit else ord("0") for value in range(256))
+
+
+PACK_TABLES = {bit: plane_table(bit) for bit in PLANES}
+# Таблицы обратного перевода символов "0" и "1" в значение бита состояния
+UNPACK_TABLES = {bit: bytes(bit if value == ord("1") else 0 for value in range(256)) for bit in PLANES}
+
+
+def pack_plane(cells, bit):
+    # Упаковка одного бита состояния всех ячеек по биту на ячейку: строка из "0" и "1" переводится в число
+    # (перевод из двоичной записи линеен по длине), первая ячейка соответствует старшему биту
+    size = len(cells)
+    return int(cells.translate(PACK_TABLES[bit]), 2).to_bytes((size + 7) // 8, 'big')
+
+
+def unpack_plane(data, size, bit):
+    # Распаковка плоскости в байты по ячейке: значение bit для установленных ячеек и 0 для остальных
+    digits = format(int.from_bytes(data, 'big'), f'0{size}b').encode()
+    return digits.translate(UNPACK_TABLES[bit])
+
+
+def save(board, elapsed, path=SAVE_FILE, moves=None):
+    # Сохранение начатой игры: заголовок, три битовые плоскости (мины, открытые ячейки, флажки) и запись ходов,
+    # без которой продолженная игра не попадет в рекорды
+    # Сложность поля записывается, только если уже вычислена: сохранение ее не вычисляет
+    # Запись идет во временный файл, который затем заменяет старое сохранение
+    temp_path = path + ".tmp"
+    metrics = board.metrics or (0, 0, 0)
+    moves = moves or b""
+    with open(temp_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, board.width, board.height, board.mines_count, board.seed, elapsed,
+                               *metrics, len(moves)))
+        for bit in PLANES:
+            file.write(pack_plane(board.cells, bit))
+        file.write(moves)
+    os.replace(temp_path, path)
+
+
+def load(path=SAVE_FILE, region_label_limit=None):
+    # Загрузка сохраненной игры через отображение файла в память; возвращает (поле, прошедшее время,
+    # запись ходов или None) или None, если сохранения нет; пустые области размечаются на полях
+    # не больше region_label_limit ячеек
+    try:
+        file = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with file:
+        if os.fstat(file.fileno()).st_size < HEADER_V1.size:
+            raise ValueError("файл сохранения обрезан")
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    with data:
+        magic, version = HEADER_V1.unpack_from(data, 0)[:2]
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError("неизвестный формат файла сохранения")
+        header = HEADER if version == VERSION else HEADER_V1
+        if len(data) < header.size:
+            raise ValueError("файл сохранения обрезан")
+        magic, version, width, height, mines_count, seed, elapsed, *extra = header.unpack_from(data, 0)
+        metrics, moves_size = (tuple(extra[:3]), extra[3]) if extra else (None, 0)
+        label_regions = region_label_limit is None or width * height <= region_label_limit
+        board = Board(width, height, mines_count, label_regions=label_regions, seed=seed)
+        plane_size = (board.size + 7) // 8
+        moves_offset = header.size + len(PLANES) * plane_size
+        if len(data) < moves_offset + moves_size:
+            raise ValueError("файл сохранения обрезан")
+        moves = data[moves_offset:moves_offset + moves_size] or None
+        # Плоскости не пересекаются по битам, поэтому объединяются сложением чисел
+        state = 0
+        for number, bit in enumerate(PLANES):
+            offset = header.size + number * plane_size
+            state += int.from_bytes(unpack_plane(data[offset:offset + plane_size], board.size, bit), 'little')
+    board.restore(state.to_bytes(board.size, 'little'), metrics if metrics and metrics[0] else None)
+    return board, elapsed, moves
+
+
+def discard(path=SAVE_FILE):
+    # Удаление сохранения (после продолжения игры или ее окончания)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def exists(path=SAVE_FILE):
+    # Проверка наличия сохраненной игры
+    return os.path.exists(path)
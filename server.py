@@ -0,0 +1,275 @@
+import argparse  # Импорт разбора аргументов командной строки
+import asyncio  # Импорт асинхронного ввода-вывода для обслуживания многих соединений в одном процессе
+import itertools  # Импорт счетчика идентификаторов сессий
+import time  # Импорт модуля для работы со временем
+
+from board import Board, REVEALED, MINE, FLAG  # Импорт игровой логики, не зависящей от интерфейса
+
+PORT = 8765  # порт TCP по умолчанию
+MAX_SESSIONS = 10000  # максимальное количество одновременных сессий
+POOL_LIMIT = 1024  # сколько полей завершенных сессий хранится для повторного использования
+MAX_CELLS = 1000000  # максимальный размер поля одной сессии
+REPORT_INTERVAL = 10.0  # интервал вывода общей статистики в секундах
+BACKLOG = 1024  # длина очереди входящих соединений (ботов может подключаться сразу много)
+GAME_COMMANDS = ("OPEN", "CHORD", "CLICK", "FLAG", "VIEW", "STATE", "CLOSE")  # команды над полем сессии
+
+HELP = ("NEW W H M [SEED] | OPEN ID ROW COL | CHORD ID ROW COL | CLICK ID ROW COL | FLAG ID ROW COL | "
+        "VIEW ID | STATE ID | STATS [ID] | CLOSE ID | QUIT")
+
+
+class ProtocolError(Exception):
+    # Ошибка в команде клиента; текст отправляется клиенту в ответе ERR
+    pass
+
+
+class Session:
+    # Одна игра: поле и статистика команд
+    def __init__(self, session_id, board):
+        self.id = session_id
+        self.board = board
+        self.started = time.perf_counter()
+        self.commands = 0  # Количество обработанных команд
+        self.opened = 0  # Количество открытых ячеек
+        self.busy = 0.0  # Время обработки команд в секундах
+
+    def status(self):
+        if self.board.lost:
+            return "lost"
+        if not self.board.first_click and self.board.check_win():
+            return "won"
+        return "active"
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.started
+        return (f"commands={self.commands} opened={self.opened} elapsed={elapsed:.3f}s "
+                f"rate={self.commands / elapsed if elapsed else 0:.1f}/s busy={self.busy * 1000:.1f}ms")
+
+
+class GameServer:
+    # Сессии всех соединений и пул полей для повторного использования памяти
+    def __init__(self):
+        self.sessions = {}  # Идентификатор -> Session
+        self.pool = {}  # (ширина, высота, мины) -> список свободных полей
+        self.pooled = 0  # Количество полей в пуле
+        self.ids = itertools.count(1)
+        self.started = time.perf_counter()
+        self.commands = 0  # Всего обработанных команд
+        self.reported_commands = 0  # Количество команд на момент предыдущего отчета
+        self.reported_at = self.started
+        self.connections = 0
+
+    def new_board(self, width, height, mines, seed):
+        # Поле из пула (сброшенное) или новое
+        boards = self.pool.get((width, height, mines))
+        if boards:
+            self.pooled -= 1
+            board = boards.pop()
+            board.reset(seed)
+            return board
+        # Пустые области не размечаются заранее: сессий много, а разметка занимает память на каждую ячейку
+        return Board(width, height, mines, label_regions=False, seed=seed)
+
+    def release(self, session_id):
+        # Закрытие сессии и возврат ее поля в пул
+        session = self.sessions.pop(session_id, None)
+        if session is not None and self.pooled < POOL_LIMIT:
+            board = session.board
+            self.pool.setdefault((board.width, board.height, board.mines_count), []).append(board)
+            self.pooled += 1
+
+    def session(self, args, owned):
+        # Сессия по идентификатору из первого аргумента; доступны только сессии своего соединения
+        if not args:
+            raise ProtocolError("не указан идентификатор сессии")
+        session_id = parse_int(args[0])
+        if session_id not in owned:
+            raise ProtocolError(f"нет сессии {session_id}")
+        return self.sessions[session_id]
+
+    def cell(self, session, args):
+        # Координаты ячейки из аргументов команды
+        if len(args) != 3:
+            raise ProtocolError("ожидается ID ROW COL")
+        row, col = parse_int(args[1]), parse_int(args[2])
+        board = session.board
+        if not (0 <= row < board.height and 0 <= col < board.width):
+            raise ProtocolError("ячейка вне поля")
+        return row, col
+
+    def opened_reply(self, session, opened):
+        # Ответ на открытие: итог и вновь открытые ячейки в виде row,col,count
+        session.opened += len(opened)
+        cells = " ".join(f"{row},{col},{count}" for row, col, count in opened)
+        return f"OK {session.status()} {len(opened)} {cells}".rstrip()
+
+    def execute(self, line, owned):
+        # Выполнение одной команды; возвращает строку ответа (None - закрыть соединение)
+        parts = line.split()
+        if not parts:
+            raise ProtocolError("пустая команда")
+        command, args = parts[0].upper(), parts[1:]
+        self.commands += 1
+
+        if command == "QUIT":
+            return None
+        if command == "HELP":
+            return f"OK {HELP}"
+        if command == "NEW":
+            if len(args) not in (3, 4):
+                raise ProtocolError("ожидается NEW W H M [SEED]")
+            width, height, mines = (parse_int(value) for value in args[:3])
+            seed = parse_int(args[3]) if len(args) == 4 else None
+            if width * height > MAX_CELLS:
+                raise ProtocolError(f"поле больше {MAX_CELLS} ячеек")
+            if len(self.sessions) >= MAX_SESSIONS:
+                raise ProtocolError("слишком много сессий")
+            try:
+                board = self.new_board(width, height, mines, seed)
+            except ValueError as error:
+                raise ProtocolError(str(error))
+            session = Session(next(self.ids), board)
+            self.sessions[session.id] = session
+            owned.add(session.id)
+            return f"OK {session.id}"
+        if command == "STATS":
+            if args:
+                return f"OK {self.session(args, owned).stats()}"
+            return f"OK {self.stats()}"
+
+        if command not in GAME_COMMANDS:
+            raise ProtocolError(f"неизвестная команда {command}")
+        session = self.session(args, owned)
+        started = time.perf_counter()
+        session.commands += 1
+        try:
+            return self.game_command(command, session, args, owned)
+        finally:
+            session.busy += time.perf_counter() - started
+
+    def game_command(self, command, session, args, owned):
+        # Команды над полем сессии (правила те же, что и в окне игры)
+        board = session.board
+        if command == "CLOSE":
+            owned.discard(session.id)
+            self.release(session.id)
+            return "OK"
+        if command == "STATE":
+            return (f"OK {session.status()} {board.width} {board.height} {board.mines_count} "
+                    f"{board.revealed_count} {board.flags_count}")
+        if command == "VIEW":
+            return "OK " + view(board)
+        row, col = self.cell(session, args)
+        if session.status() != "active":
+            raise ProtocolError("игра окончена")
+        if command == "FLAG":
+            placed = board.toggle_flag(row, col)
+            return "OK " + ("ignored" if placed is None else "flag" if placed else "unflag")
+        # CLICK: открытие закрытой ячейки или аккорд на открытой, как при нажатии левой кнопкой в окне игры
+        if command == "CHORD" or (command == "CLICK" and board.is_revealed(row, col)):
+            if not board.is_revealed(row, col):
+                raise ProtocolError("аккорд возможен только на открытой ячейке")
+            return self.opened_reply(session, board.chord(row, col))
+        return self.opened_reply(session, board.click(row, col))
+
+    def stats(self):
+        # Общая статистика сервера
+        elapsed = time.perf_counter() - self.started
+        return (f"sessions={len(self.sessions)} connections={self.connections} pooled={self.pooled} "
+                f"commands={self.commands} rate={self.commands / elapsed if elapsed else 0:.1f}/s")
+
+    async def handle(self, reader, writer):
+        # Обслуживание одного соединения: команды построчно, ответ на каждую строку
+        owned = set()  # Сессии, созданные этим соединением
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = self.execute(line.decode("utf-8", errors="replace"), owned)
+                except ProtocolError as error:
+                    reply = f"ERR {error}"
+                if reply is None:
+                    break
+                writer.write(reply.encode() + b"\n")
+                # Ожидание отправки только при заполненном буфере, чтобы медленный клиент не занимал память
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            # Сессии закрытого соединения освобождаются, их поля возвращаются в пул
+            for session_id in owned:
+                self.release(session_id)
+            self.connections -= 1
+            writer.close()
+
+    async def report(self):
+        # Периодический вывод общей пропускной способности (только если были команды)
+        while True:
+            await asyncio.sleep(REPORT_INTERVAL)
+            now = time.perf_counter()
+            done = self.commands - self.reported_commands
+            if done:
+                print(f"{time.strftime('%H:%M:%S')} {done / (now - self.reported_at):.1f} команд/с, {self.stats()}")
+            self.reported_commands, self.reported_at = self.commands, now
+
+
+def parse_int(text):
+    try:
+        return int(text)
+    except ValueError:
+        raise ProtocolError(f"ожидается целое число, получено {text!r}")
+
+
+def view(board):
+    # Поле сессии одной строкой: строки поля через "/", "." - закрытая ячейка, "F" - флажок, цифра - открытая,
+    # "*" - мина (только после окончания игры)
+    finished = board.lost or (not board.first_click and board.check_win())
+    symbols = []
+    for index in range(board.size):
+        state = board.cells[index]
+        if state & REVEALED:
+            symbols.append(str(board.mine_counts[index]))
+        elif state & FLAG:
+            symbols.append("F")
+        elif finished and state & MINE:
+            symbols.append("*")
+        else:
+            symbols.append(".")
+        if index % board.width == board.width - 1 and index != board.size - 1:
+            symbols.append("/")
+    return "".join(symbols)
+
+
+async def serve(host, port, unix_path):
+    game_server = GameServer()
+    if unix_path:
+        server = await asyncio.start_unix_server(game_server.handle, path=unix_path, backlog=BACKLOG)
+        print(f"Сервер слушает {unix_path}")
+    else:
+        server = await asyncio.start_server(game_server.handle, host, port, backlog=BACKLOG)
+        print(f"Сервер слушает {host}:{port}")
+    reporter = asyncio.create_task(game_server.report())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        reporter.cancel()
+
+
+def main():
+    # Запуск: python server.py [--host адрес] [--port порт] [--unix путь к сокету]
+    parser = argparse.ArgumentParser(description="Сервер игр Сапер с построчным протоколом")
+    parser.add_argument("--host", default="127.0.0.1", help="адрес для TCP")
+    parser.add_argument("--port", type=int, default=PORT, help="порт для TCP")
+    parser.add_argument("--unix", help="путь к Unix-сокету (вместо TCP)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+from itertools import compress  # Импорт выбора элементов по маске
+
+from board import Board, FLAG, NOT_ZERO_TABLE, REVEALED, REVEALED_MASK_TABLE  # Импорт игрового поля и флагов состояния ячеек
+
+
+def constraints(board, known_mines, known_safe=frozenset()):
+    # Ограничения, заданные открытыми цифрами: (закрытые неизвестные соседи, сколько среди них мин)
+    # Учитываются только открытые ячейки, рядом с которыми есть неизвестные закрытые ячейки;
+    # известные мины и известные безопасные ячейки в число неизвестных не входят
+    result = []
+    cells = board.cells
+    counts = board.mine_counts
+    # Открытые цифры с закрытыми соседями выбираются масками по всему полю сразу, а не проверкой каждой ячейки
+    size = board.size
+    mask = (int.from_bytes(cells.translate(REVEALED_MASK_TABLE), 'little')
+            & int.from_bytes(counts.translate(NOT_ZERO_TABLE), 'little')
+            & int.from_bytes(board.hidden_counts.translate(NOT_ZERO_TABLE), 'little'))
+    for index in compress(range(size), mask.to_bytes(size, 'little')):
+        unknown = []
+        remaining = counts[index]
+        for neighbor in board.neighbor_indices(index):
+            if cells[neighbor] & REVEALED:
+                continue
+            if neighbor in known_mines:
+                remaining -= 1
+            elif neighbor not in known_safe:
+                unknown.append(neighbor)
+        if unknown:
+            result.append((frozenset(unknown), remaining))
+    return result
+
+
+def deduce(board, known_mines, known_safe=frozenset()):
+    # Поиск заведомо безопасных ячеек и заведомо мин по правилам одной цифры и вложенных множеств
+    # Возвращает (множество безопасных ячеек, множество мин); known_mines и known_safe не изменяются
+    safe, mines = set(), set()
+    rules = list(set(constraints(board, known_mines, known_safe)))
+
+    # Правило одной цифры: все соседи безопасны или все соседи - мины
+    for unknown, remaining in rules:
+        if remaining == 0:
+            safe |= unknown
+        elif remaining == len(unknown):
+            mines |= unknown
+    if safe or mines:
+        return safe, mines
+
+    # Правило вложенных множеств: если соседи A входят в соседей B, то разность B \ A содержит
+    # remaining(B) - remaining(A) мин; разность без мин безопасна, разность из одних мин - мины
+    by_cell = {}
+    for rule in rules:
+        for cell in rule[0]:
+            by_cell.setdefault(cell, []).append(rule)
+    for unknown_a, remaining_a in rules:
+        candidates = set()
+        for cell in unknown_a:
+            candidates.update(by_cell[cell])
+        for unknown_b, remaining_b in candidates:
+            if len(unknown_b) <= len(unknown_a) or not unknown_a <= unknown_b:
+                continue
+            difference = unknown_b - unknown_a
+            extra = remaining_b - remaining_a
+            if extra == 0:
+                safe |= difference
+            elif extra == len(difference):
+                mines |= difference
+    return safe, mines
+
+
+def global_rule(board, known_mines, known_safe=frozenset()):
+    # Правило общего количества мин: если все оставшиеся мины уже найдены, все неизвестные ячейки безопасны,
+    # если неизвестных ячеек ровно столько, сколько мин осталось, все они - мины
+    unknown = [index for index in range(board.size)
+               if not board.cells[index] & REVEALED and index not in known_mines and index not in known_safe]
+    remaining = board.mines_count - len(known_mines)
+    if remaining == 0:
+        return set(unknown), set()
+    if remaining == len(unknown):
+        return set(), set(unknown)
+    return set(), set()
+
+
+def solve(width, height, mines_count, seed, first_click):
+    # Проверка, что поле проходится от первого клика одной логикой, без угадывания
+    board = Board(width, height, mines_count, seed=seed)
+    board.click(*first_click)
+    known_mines = set()
+    while not board.check_win():
+        safe, mines = deduce(board, known_mines)
+        if not safe and not mines:
+            safe, mines = global_rule(board, known_mines)
+            if not safe and not mines:
+                return False
+        known_mines |= mines
+        for index in safe:
+            if not board.cells[index] & (REVEALED | FLAG):
+                board.reveal_cell(*board.coords(index))
+        if board.lost:
+            return False
+    return True
@@ -0,0 +1,88 @@
+import math  # Импорт модуля для математических операций
+import tkinter as tk  # Импорт библиотеки для создания графического интерфейса
+from tkinter import font as tkfont  # Импорт именованных шрифтов Tk
+
+
+def render_flag(image, size, color):
+    # Флажок из трех прямоугольников (древко, квадрат и прямоугольник полотнища) в координатах ячейки
+    total_flag_width = size / 3
+    flag_height = size / 3
+    line_thickness = flag_height / 5
+    square_side = flag_height / 2
+    rectangle_length = square_side * 0.8
+    rectangle_y_offset = square_side * 0.3
+    flag_x_start = (size - total_flag_width) / 2
+    line_y_start = (size - flag_height) / 2
+    square_x_start = flag_x_start + line_thickness
+    rectangle_x_start = square_x_start + square_side
+    rectangle_y_start = line_y_start + rectangle_y_offset
+    for x1, y1, x2, y2 in ((flag_x_start, line_y_start, square_x_start, line_y_start + flag_height),
+                           (square_x_start, line_y_start, rectangle_x_start, line_y_start + square_side),
+                           (rectangle_x_start, rectangle_y_start, rectangle_x_start + rectangle_length,
+                            rectangle_y_start + square_side)):
+        # Прямоугольник не уже одного пикселя, чтобы флажок был виден и на самых мелких ячейках
+        left, top = round(x1), round(y1)
+        image.put(color, to=(left, top, max(left + 1, round(x2)), max(top + 1, round(y2))))
+
+
+def render_mine(image, size, color, center_color):
+    # Мина: круг с восемью ножками и светлым кругом в центре; каждая строка изображения заполняется
+    # сериями пикселей одного цвета (пиксели вне мины остаются прозрачными)
+    outer_radius = size * 0.2
+    inner_radius = size * 0.07
+    leg_half_width = size * 0.05
+    leg_length = outer_radius + size * 0.1
+    center = size / 2
+    # Направления четырех линий через центр, дающих восемь ножек
+    directions = [(math.cos(math.radians(angle)), math.sin(math.radians(angle))) for angle in range(0, 180, 45)]
+    for y in range(size):
+        dy = y + 0.5 - center
+        runs = []  # Серии пикселей строки: [цвет, начало, конец]
+        for x in range(size):
+            dx = x + 0.5 - center
+            distance = dx * dx + dy * dy
+            if distance <= inner_radius * inner_radius:
+                pixel = center_color
+            elif distance <= outer_radius * outer_radius or any(
+                    abs(dx * sin - dy * cos) <= leg_half_width and abs(dx * cos + dy * sin) <= leg_length
+                    for cos, sin in directions):
+                pixel = color
+            else:
+                pixel = None
+            if runs and runs[-1][0] == pixel and runs[-1][2] == x:
+                runs[-1][2] = x + 1
+            elif pixel is not None:
+                runs.append([pixel, x, x + 1])
+        for pixel, start, end in runs:
+            image.put(pixel, to=(start, y, end, y + 1))
+
+
+RENDERERS = {"flag": render_flag, "mine": render_mine}  # вид значка -> функция рисования по пикселям
+
+
+class SpriteAtlas:
+    # Готовые изображения значков ячеек: каждый значок рисуется по пикселям один раз для размера ячейки
+    # и набора цветов, а на холсте ставится одним элементом-изображением вместо нескольких фигур
+    # Изображения принадлежат окну, поэтому атлас создается для каждого окна игры
+    def __init__(self, master):
+        self.master = master
+        self.images = {}  # (вид, размер ячейки, цвета) -> PhotoImage
+        self.fonts = {}  # Размер ячейки -> шрифт цифр
+
+    def sprite(self, kind, size, *colors):
+        # Изображение значка размером с ячейку (рисуется при первом запросе)
+        key = (kind, size, colors)
+        image = self.images.get(key)
+        if image is None:
+            image = self.images[key] = tk.PhotoImage(master=self.master, width=size, height=size)
+            RENDERERS[kind](image, size, *colors)
+        return image
+
+    def font(self, size):
+        # Шрифт цифр для размера ячейки: именованный шрифт создается один раз, и Tk не разбирает
+        # описание шрифта при рисовании каждой цифры
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = tkfont.Font(root=self.master, family="Arial", size=max(1, int(size / 2.7)),
+                                                  weight="bold")
+        return font